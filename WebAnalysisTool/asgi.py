@@ -2,6 +2,8 @@
 ASGI config for WebAnalysisTool project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+The /logs/ event stream and WebSocket connections are routed to the
+consumers in logAnalysis.routing; every other HTTP request goes to Django.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.0/howto/deployment/asgi/
@@ -13,4 +15,16 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'WebAnalysisTool.settings')
 
-application = get_asgi_application()
+# Set up Django before importing the routing, which imports app modules
+django_asgi_app = get_asgi_application()
+
+from channels.routing import ProtocolTypeRouter, URLRouter  # noqa: E402
+from channels.security.websocket import AllowedHostsOriginValidator  # noqa: E402
+from django.urls import re_path  # noqa: E402
+
+from logAnalysis.routing import http_urlpatterns, websocket_urlpatterns  # noqa: E402
+
+application = ProtocolTypeRouter({
+    'http': URLRouter(http_urlpatterns + [re_path(r'', django_asgi_app)]),
+    'websocket': AllowedHostsOriginValidator(URLRouter(websocket_urlpatterns)),
+})
@@ -34,12 +34,14 @@ X_FRAME_OPTIONS = 'SAMEORIGIN'
 # Application definition
 
 INSTALLED_APPS = [
+    'daphne',  # ASGI runserver, needed for the WebSocket live log tail
     'django.contrib.admin',
     'django.contrib.auth',
     'django.contrib.contenttypes',
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'channels',
     'logAnalysis',
     "django_plotly_dash",
     "dpd_static_support",
@@ -56,7 +58,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
-    "django_plotly_dash.middleware.BaseMiddleware",
+    "logAnalysis.middleware.DashContentMiddleware",  # django_plotly_dash BaseMiddleware, async capable
 ]
 
 ROOT_URLCONF = 'WebAnalysisTool.urls'
@@ -78,6 +80,7 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'WebAnalysisTool.wsgi.application'
+ASGI_APPLICATION = 'WebAnalysisTool.asgi.application'
 
 
 # Database
@@ -87,10 +90,132 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Concurrent ingests queue on SQLite's write lock (see
+        # logAnalysis.data_version.lock_data_version); wait for a whole chunk
+        'OPTIONS': {'timeout': 60},
+        # A file rather than shared-cache memory, whose table locks fail at once
+        # instead of waiting, so tests can run writers concurrently
+        'TEST': {'NAME': BASE_DIR / 'test_db.sqlite3'},
     }
 }
 
 
+# Log ingestion
+# Number of parsed log lines written per bulk_create/transaction by upload_logs
+
+LOG_INGEST_BATCH_SIZE = 5000
+
+# Parser processes for uploads large enough to be spooled to a temporary file
+# (see FILE_UPLOAD_MAX_MEMORY_SIZE). 1 parses in the request thread, 0 uses
+# one process per CPU.
+
+LOG_INGEST_WORKERS = 1
+
+# Parse uploads straight from the request chunks. Set to True to also keep a
+# copy of every newly ingested file under logs/.
+
+LOG_UPLOAD_STAGE_TO_DISK = False
+
+# Counters per Space-Saving sketch of the most requested pages (one sketch per
+# year plus one for all years, see logAnalysis.heavy_hitters)
+
+TOP_PAGES_SKETCH_SIZE = 200
+
+# Seconds of inactivity after which an IP's next request starts a new visit
+# (logAnalysis.visits). Run `manage.py rebuild_rollups` after changing it.
+
+VISIT_INACTIVITY_TIMEOUT = 30 * 60
+
+# `manage.py follow_logs` (logAnalysis.follow): seconds between polls of an idle
+# file, and seconds a read line may wait before its micro-batch is written
+# (batches are also written once LOG_INGEST_BATCH_SIZE lines are pending).
+
+LOG_FOLLOW_POLL_INTERVAL = 1.0
+LOG_FOLLOW_MAX_LATENCY = 2.0
+
+
+# Caches and channel layer
+# "dashboards" holds dashboard callback results (logAnalysis.callback_cache),
+# keyed by the data version kept in the database (logAnalysis.data_version).
+# Both caches are per-process local memory with LRU culling unless REDIS_URL is set;
+# with Redis, configure eviction on the server (maxmemory-policy allkeys-lru).
+# The channel layer carries the live log tail (logAnalysis.live_logs) and also
+# uses Redis when REDIS_URL is set, so uploads reach WebSockets in every process.
+
+REDIS_URL = os.environ.get('REDIS_URL')
+
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        },
+        'dashboards': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+            'KEY_PREFIX': 'dashboards',
+        },
+    }
+    CHANNEL_LAYERS = {
+        'default': {
+            'BACKEND': 'channels_redis.core.RedisChannelLayer',
+            'CONFIG': {'hosts': [REDIS_URL], 'capacity': 1000},
+        },
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        },
+        'dashboards': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'dashboards',
+            'OPTIONS': {'MAX_ENTRIES': 256},
+        },
+    }
+    # Only reaches WebSockets served by the same process
+    CHANNEL_LAYERS = {
+        'default': {
+            'BACKEND': 'channels.layers.InMemoryChannelLayer',
+            'CONFIG': {'capacity': 1000},
+        },
+    }
+
+# Seconds a cached callback result is kept (None keeps it until evicted or the
+# data version changes)
+
+DASHBOARD_CACHE_TIMEOUT = 60 * 60
+
+# Threads that build a dashboard's figures concurrently (logAnalysis.figure_pool).
+# 1 builds them one after another in the callback's thread. No speedup was
+# measured on one CPU with SQLite; try more with several CPUs and PostgreSQL.
+
+DASHBOARD_FIGURE_WORKERS = 1
+
+# Seconds between data version checks of an open Overview page; charts are
+# re-rendered only when new logs were ingested. 0 disables live updates.
+
+LIVE_DASHBOARD_INTERVAL = 5
+
+# Live log tail over WebSockets (logAnalysis.consumers). Each ingested chunk is
+# published once with at most LIVE_LOG_MAX_BATCH lines; every client gets at
+# most LIVE_LOG_CLIENT_RATE lines per second in frames of LIVE_LOG_FRAME_LINES
+# and buffers LIVE_LOG_CLIENT_BUFFER lines before dropping the oldest.
+
+LIVE_LOG_MAX_BATCH = 500
+LIVE_LOG_CLIENT_RATE = 50
+LIVE_LOG_FRAME_LINES = 50
+LIVE_LOG_CLIENT_BUFFER = 500
+
+# Server-sent event stream at /logs/ (logAnalysis.live_logs.stream_events):
+# lines kept per process for ?replay=N and Last-Event-ID resumes, seconds
+# between flushes to one client, and seconds between keep-alive comments.
+
+LIVE_LOG_REPLAY_LINES = 1000
+LIVE_LOG_FLUSH_INTERVAL = 0.5
+LIVE_LOG_HEARTBEAT = 15
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
 
@@ -16,7 +16,7 @@ Including another URLconf
 """
 from django.contrib import admin
 from django.urls import path, include
-from logAnalysis.views import stream_logs, dashboard,upload_logs, dashboard_view1, Salesdashboard, NewDashboard, RegionalSalesAnalysis
+from logAnalysis.views import stream_logs, dashboard,upload_logs, dashboard_view1, Salesdashboard, NewDashboard, RegionalSalesAnalysis, top_pages_api, data_version_api, follow_status_api, callback_cache_api
 from dash_app.views import dashboard_view
 from dash_app.dash_apps import app  # Import your Dash app file
 from logAnalysis.dash_apps import  geo_distribution_app
@@ -32,6 +32,10 @@ urlpatterns = [
     path('SalesDashboard/', Salesdashboard, name='SalesDashboard'),
     path("Overview/", NewDashboard, name='Overview'),
     path('RegionalSalesAnalysis/', RegionalSalesAnalysis, name='RegionalSalesAnalysis'),
+    path('api/top-pages/', top_pages_api, name='top_pages_api'),
+    path('api/data-version/', data_version_api, name='data_version_api'),
+    path('api/follow-status/', follow_status_api, name='follow_status_api'),
+    path('api/callback-cache/', callback_cache_api, name='callback_cache_api'),
 
 
 ]
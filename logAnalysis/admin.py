@@ -1,4 +1,6 @@
 from django.contrib import admin
-from logAnalysis.models import ServerLog
+from logAnalysis.models import LogFollowOffset, LogUpload, ServerLog
 
-admin.site.register(ServerLog)
\ No newline at end of file
+admin.site.register(ServerLog)
+admin.site.register(LogUpload)
+admin.site.register(LogFollowOffset)
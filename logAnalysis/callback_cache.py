@@ -0,0 +1,80 @@
+"""Result cache for Dash callbacks, keyed by their inputs and the data version.
+
+Results live in the "dashboards" cache (see settings.CACHES), so switching a
+dropdown back to a value viewed before returns the stored figures instead of
+recomputing them, until new logs are ingested.
+"""
+import functools
+import hashlib
+import json
+import logging
+import threading
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import caches
+
+from .data_version import get_data_version
+
+logger = logging.getLogger(__name__)
+
+CACHE_ALIAS = "dashboards"
+DEFAULT_TIMEOUT = 60 * 60
+
+_stats_lock = threading.Lock()
+_stats = Counter()
+
+
+def callback_cache_key(app_name, callback_name, args, data_version):
+    inputs = json.dumps(args, sort_keys=True, default=str)
+    digest = hashlib.blake2b(inputs.encode("utf-8"), digest_size=16).hexdigest()
+    return f"callback:{app_name}:{callback_name}:{data_version}:{digest}"
+
+
+def record(app_name, callback_name, outcome):
+    with _stats_lock:
+        _stats[(app_name, callback_name, outcome)] += 1
+
+
+def get_callback_cache_stats():
+    """{(app, callback): {"hits": n, "misses": n}} for this process"""
+    with _stats_lock:
+        stats = {}
+        for (app_name, callback_name, outcome), count in _stats.items():
+            stats.setdefault((app_name, callback_name), {"hits": 0, "misses": 0})[outcome] = count
+        return stats
+
+
+def to_plain(result):
+    """Turns plotly figures into plain dicts, which unpickle far faster than Figure objects"""
+    if hasattr(result, "to_plotly_json"):
+        return result.to_plotly_json()
+    if isinstance(result, (list, tuple)):
+        return type(result)(to_plain(item) for item in result)
+    return result
+
+
+def cached_callback(app_name, callback_name=None):
+    """Caches a Dash callback's return value per (app, callback, inputs, data version).
+
+    Apply below @app.callback so Dash registers the caching wrapper. Pass
+    `callback_name` when one function is registered for several outputs.
+    """
+    def decorator(func):
+        name = callback_name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args):
+            cache = caches[CACHE_ALIAS]
+            key = callback_cache_key(app_name, name, args, get_data_version())
+            result = cache.get(key)
+            if result is not None:
+                record(app_name, name, "hits")
+                return result
+            record(app_name, name, "misses")
+            result = to_plain(func(*args))
+            cache.set(key, result, getattr(settings, "DASHBOARD_CACHE_TIMEOUT", DEFAULT_TIMEOUT))
+            logger.debug("Cached %s.%s for inputs %r", app_name, name, args)
+            return result
+        return wrapper
+    return decorator
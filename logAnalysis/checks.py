@@ -0,0 +1,53 @@
+"""System checks for databases upgraded from before ingestion kept its derived data.
+
+The line digests, rollup, visit and sketch tables are filled at ingest;
+migrations only add them. Run with `manage.py migrate` and
+`manage.py check --database default`.
+"""
+from django.core.checks import Tags, Warning, register
+from django.db import DatabaseError
+
+from .models import DailyBounceRollup, DailyTrafficRollup, DailyVisitorSketch, HourlyTrafficRollup, PageHeavyHitter, ServerLog
+
+# Filled by ingestion from every stored row, so empty next to a non-empty ServerLog means not backfilled
+DERIVED_MODELS = (HourlyTrafficRollup, DailyTrafficRollup, PageHeavyHitter, DailyBounceRollup, DailyVisitorSketch)
+
+
+@register(Tags.database)
+def check_derived_tables(app_configs, databases=None, **kwargs):
+    """Warns when ServerLog has rows but a table derived from it is empty"""
+    errors = []
+    for alias in databases or ():
+        try:
+            if not ServerLog.objects.using(alias).exists():
+                continue
+            empty = [model.__name__ for model in DERIVED_MODELS if not model.objects.using(alias).exists()]
+        except DatabaseError:
+            continue  # Not migrated yet
+        if empty:
+            errors.append(Warning(
+                f"ServerLog has rows but {', '.join(empty)} {'is' if len(empty) == 1 else 'are'} empty "
+                f"in database '{alias}'; the dashboards will show no data for the stored logs.",
+                hint="Run `manage.py rebuild_rollups` once to fill them from ServerLog.",
+                id="logAnalysis.W001",
+            ))
+    return errors
+
+
+@register(Tags.database)
+def check_line_digests(app_configs, databases=None, **kwargs):
+    """Warns about ServerLog rows stored before line digests, which re-uploads would duplicate"""
+    errors = []
+    for alias in databases or ():
+        try:
+            undigested = ServerLog.objects.using(alias).filter(line_digest__isnull=True).exists()
+        except DatabaseError:
+            continue  # Not migrated yet
+        if undigested:
+            errors.append(Warning(
+                f"ServerLog rows in database '{alias}' have no line_digest; uploading "
+                f"their lines again will store them twice.",
+                hint="Run `manage.py backfill_line_digests` once to fill them.",
+                id="logAnalysis.W002",
+            ))
+    return errors
@@ -0,0 +1,113 @@
+import asyncio
+from collections import deque
+from urllib.parse import parse_qs
+
+from channels.generic.websocket import AsyncJsonWebsocketConsumer
+from django.conf import settings
+from django.http.request import split_domain_port, validate_host
+
+from .live_logs import LIVE_LOG_GROUP, stay_in_group, stream_events, stream_options
+
+
+class LiveLogConsumer(AsyncJsonWebsocketConsumer):
+    """Streams newly ingested log lines to one WebSocket client.
+
+    Lines arriving from the group go into a bounded per-client buffer and are
+    sent by a separate task at no more than LIVE_LOG_CLIENT_RATE lines per
+    second. A client that cannot keep up loses its oldest lines (reported as
+    "dropped") instead of holding up the channel layer or other clients.
+    Frames are {"lines": [...], "dropped": n}.
+    """
+
+    async def connect(self):
+        self.buffer = deque(maxlen=getattr(settings, "LIVE_LOG_CLIENT_BUFFER", 500))
+        self.rate = getattr(settings, "LIVE_LOG_CLIENT_RATE", 50)
+        self.frame_lines = getattr(settings, "LIVE_LOG_FRAME_LINES", 50)
+        self.dropped = 0
+        self.pending = asyncio.Event()
+        self.sender = self.rejoin = None
+        await self.channel_layer.group_add(LIVE_LOG_GROUP, self.channel_name)
+        await self.accept()
+        self.sender = asyncio.create_task(self.send_lines())
+        self.rejoin = asyncio.create_task(stay_in_group(self.channel_layer, self.channel_name))
+
+    async def disconnect(self, code):
+        await self.channel_layer.group_discard(LIVE_LOG_GROUP, self.channel_name)
+        for task in (self.sender, self.rejoin):
+            if task is not None:
+                task.cancel()
+
+    async def log_lines(self, event):
+        lines = event["lines"]
+        overflow = max(0, len(self.buffer) + len(lines) - self.buffer.maxlen)
+        self.dropped += overflow + event.get("skipped", 0)
+        self.buffer.extend(lines)
+        self.pending.set()
+
+    async def send_lines(self):
+        while True:
+            await self.pending.wait()
+            self.pending.clear()
+            while self.buffer or self.dropped:
+                lines = [self.buffer.popleft() for _ in range(min(len(self.buffer), self.frame_lines))]
+                dropped, self.dropped = self.dropped, 0
+                await self.send_json({"lines": lines, "dropped": dropped})
+                # Pace the client to its rate limit
+                await asyncio.sleep(len(lines) / self.rate)
+
+
+STREAM_HEADERS = [
+    (b"content-type", b"text/event-stream"),
+    (b"cache-control", b"no-cache"),
+    (b"x-accel-buffering", b"no"),
+]
+
+
+async def send_text(send, status, body):
+    await send({"type": "http.response.start", "status": status, "headers": [(b"content-type", b"text/plain")]})
+    await send({"type": "http.response.body", "body": body})
+
+
+async def wait_for_disconnect(receive):
+    while (await receive())["type"] != "http.disconnect":
+        pass
+
+
+async def log_stream_app(scope, receive, send):
+    """/logs/ server-sent event stream as a bare ASGI application.
+
+    Routed ahead of Django (see WebAnalysisTool.asgi) because Django runs the
+    sync parts of its middleware in a thread per request, which would stay
+    reserved for as long as the stream is open. Same stream as views.stream_logs.
+    """
+    query = parse_qs(scope["query_string"].decode("latin-1"))
+    headers = dict(scope["headers"])
+    # Django's middleware is skipped, so check the Host header here
+    host = split_domain_port(headers.get(b"host", b"").decode("latin-1"))[0]
+    if not validate_host(host, settings.ALLOWED_HOSTS):
+        await send_text(send, 400, b"Invalid Host header")
+        return
+    try:
+        replay, last_event_id = stream_options(
+            query.get("replay", [None])[0], headers.get(b"last-event-id", b"").decode("latin-1")
+        )
+    except ValueError:
+        await send_text(send, 400, b"replay and Last-Event-ID must be integers")
+        return
+
+    events = stream_events(replay, last_event_id)
+
+    async def pump():
+        await send({"type": "http.response.start", "status": 200, "headers": STREAM_HEADERS})
+        async for event in events:
+            await send({"type": "http.response.body", "body": event.encode("utf-8"), "more_body": True})
+
+    streaming = asyncio.ensure_future(pump())
+    disconnected = asyncio.ensure_future(wait_for_disconnect(receive))
+    try:
+        await asyncio.wait({streaming, disconnected}, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for task in (streaming, disconnected):
+            task.cancel()
+        await asyncio.gather(streaming, disconnected, return_exceptions=True)
+        await events.aclose()
@@ -1,41 +1,8 @@
-import pandas as pd
-import plotly.express as px
-from django_plotly_dash import DjangoDash
-from dash import html, dcc
-from dash.dependencies import Input, Output
-from ..models import ServerLog  # Relative import
-import pandas as pd
-import plotly.express as px
 import plotly.graph_objects as go
-from django_plotly_dash import DjangoDash
-from dash import html, dcc, Input, Output
-from datetime import datetime
-from ..models import ServerLog
-from django.db.models.functions import ExtractYear, ExtractHour
-from django.db.models import Count, Avg
-
-def filter_by_year(queryset, year):
-    if year and year != 'all':
-        return queryset.filter(timestamp__year=int(year))
-    return queryset
+from ..visits import bounce_rate as visit_bounce_rate
 
 def create_bounce_rate_gauge_chart(year):
-    logs = filter_by_year(ServerLog.objects.filter(request_method="POST"), year)
-
-    ip_data = []
-    for log in logs:
-        if log.ip_address:
-            ip_data.append(log.ip_address)
-
-    df = pd.DataFrame(ip_data, columns=["ip_address"]) if ip_data else pd.DataFrame(columns=["ip_address"])
-
-    if df.empty:
-        bounce_rate = 0
-    else:
-        ip_counts = df['ip_address'].value_counts()
-        bounces = (ip_counts == 1).sum()
-        total_ips = ip_counts.shape[0]
-        bounce_rate = (bounces / total_ips) * 100 if total_ips > 0 else 0
+    bounce_rate = visit_bounce_rate(year)
 
     target = 40  # Target bounce rate (%)
 
@@ -44,7 +11,7 @@ def create_bounce_rate_gauge_chart(year):
 
     fig = go.Figure(go.Indicator(
         mode="gauge+number",
-        value=bounce_rate - 60,
+        value=bounce_rate,
         number={'suffix': "%", 'valueformat': ",.1f"},
         #title={"text": f"Bounce Rate ({year})"},
         gauge={
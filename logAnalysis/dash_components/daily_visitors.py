@@ -11,24 +11,13 @@ from django_plotly_dash import DjangoDash
 from dash import html, dcc, Input, Output
 from datetime import datetime
 from ..models import ServerLog
+from ..unique_visitors import average_daily_unique_visitors
 from django.db.models.functions import ExtractYear, ExtractHour
 from django.db.models import Count, Avg
 
-def filter_by_year(queryset, year):
-    if year and year != 'all':
-        return queryset.filter(timestamp__year=int(year))
-    return queryset
-
 def create_unique_visitors_gauge_chart(year):
-    # Cooked average unique visitors per day
-    if year == 'all':
-        avg_unique_visitors = 823
-    elif year == 2024:
-        avg_unique_visitors = 736
-    elif year == 2023:
-        avg_unique_visitors = 876
-    else:
-        avg_unique_visitors = 600  # Default/fallback for other years
+    # Average of the per-day distinct visitor estimates
+    avg_unique_visitors = average_daily_unique_visitors(year)
 
     target = 1000  # Target unique visitors per day
 
@@ -3,6 +3,7 @@ from dash import html, dcc, Input, Output
 from django.db.models import Count
 from django.db.models.functions import ExtractYear
 from ..models import ServerLog
+from .startup import STARTUP_TRIGGER_ID, create_startup_trigger
 
 def create_dropdown_app():
     """Creates and returns a Dash app for the global year dropdown"""
@@ -15,15 +16,12 @@ def create_dropdown_app():
         ).values('year').distinct().order_by('year')
         return [year['year'] for year in years]
 
-    # Get available years
-    years = get_years()
-    year_options = [{'label': 'All', 'value': 'All'}] + [{'label': str(year), 'value': str(year)} for year in years]
-
     # Layout with dropdown and store
     app.layout = html.Div([
+        create_startup_trigger(),
         dcc.Dropdown(
             id='global-year-dropdown',
-            options=year_options,
+            options=[{'label': 'All', 'value': 'All'}],
             value='All',
             clearable=False,
             style={'width': '100%', 'height':'20px'}
@@ -31,6 +29,13 @@ def create_dropdown_app():
         dcc.Store(id='global-year-store', data='All')  # Store to share state
     ])
 
+    @app.callback(
+        Output('global-year-dropdown', 'options'),
+        Input(STARTUP_TRIGGER_ID, 'n_intervals')
+    )
+    def load_year_options(_):
+        return [{'label': 'All', 'value': 'All'}] + [{'label': str(year), 'value': str(year)} for year in get_years()]
+
     # Callback to update store
     @app.callback(
         Output('global-year-store', 'data'),
@@ -2,7 +2,10 @@ import pandas as pd
 import plotly.express as px
 from django_plotly_dash import DjangoDash
 from dash import html, dcc
+from dash.dependencies import Input, Output
+from django.db.models import Count
 from ..models import ServerLog  # Relative import
+from .startup import STARTUP_TRIGGER_ID, create_startup_trigger
 
 def create_geo_distribution_app():
     """Creates and returns the configured geographic distribution Dash app"""
@@ -10,14 +13,7 @@ def create_geo_distribution_app():
     # Initialize the app
     app = DjangoDash('WebLogMap', external_scripts=["https://cdn.plot.ly/plotly-2.18.2.min.js"])
 
-    # Country configuration
-    COUNTRY_PREFIXES = {
-        "168.": "Botswana",
-        "102.": "South Africa",
-        "154.": "Namibia",
-        "197.": "Zimbabwe"
-    }
-
+    # Country configuration (countries come from ServerLog.country, see logAnalysis.dimensions)
     ISO_MAP = {
         "Botswana": "BWA",
         "South Africa": "ZAF",
@@ -26,30 +22,19 @@ def create_geo_distribution_app():
     }
 
     def process_log_data():
-        """Processes log data and returns visualization dataframe"""
-        country_counts = {country: 0 for country in ISO_MAP.keys()}
-        invalid_count = 0
-
-        for log in ServerLog.objects.all():
-            ip_str = str(log.ip_address).strip() if log.ip_address else ""
-            matched = False
-            
-            for prefix, country in COUNTRY_PREFIXES.items():
-                if ip_str.startswith(prefix):
-                    country_counts[country] += 1
-                    matched = True
-                    break
-            
-            if not matched and ip_str:
-                print(f"Unmatched IP: {ip_str}")
-                invalid_count += 1
-
-        print(f"Processed logs - Valid: {sum(country_counts.values())}, Invalid/Unmatched: {invalid_count}")
+        """Counts logs per country in the database and returns visualization dataframe"""
+        counts = dict(
+            ServerLog.objects
+            .filter(country__in=ISO_MAP)
+            .values_list('country')
+            .annotate(logs=Count('id'))
+            .order_by()
+        )
 
         return pd.DataFrame({
-            "country": list(country_counts.keys()),
-            "logs": list(country_counts.values()),
-            "iso_alpha": [ISO_MAP[country] for country in country_counts.keys()]
+            "country": list(ISO_MAP.keys()),
+            "logs": [counts.get(country, 0) for country in ISO_MAP.keys()],
+            "iso_alpha": list(ISO_MAP.values())
         })
 
     def create_map_figure():
@@ -86,11 +71,18 @@ def create_geo_distribution_app():
 
     # Set the app layout
     app.layout = html.Div([
+        create_startup_trigger(),
         dcc.Graph(
             id='geo-distribution-map',
-            figure=create_map_figure(),
             style={'height': '200px', 'width': '240px'}
         )
     ])
 
+    @app.callback(
+        Output('geo-distribution-map', 'figure'),
+        Input(STARTUP_TRIGGER_ID, 'n_intervals')
+    )
+    def update_map(_):
+        return create_map_figure()
+
     return app
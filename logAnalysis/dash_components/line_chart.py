@@ -1,10 +1,9 @@
-import pandas as pd
 import plotly.express as px
 from django_plotly_dash import DjangoDash
 from dash import html, dcc
-from django.db.models import Count
-from ..models import ServerLog  # Relative import
-from datetime import datetime
+from dash.dependencies import Input, Output
+from ..weekdays import DAYS, weekday_averages
+from .startup import STARTUP_TRIGGER_ID, create_startup_trigger
 
 def create_daily_avg_app():
     """Creates and returns the configured day-of-week averages chart"""
@@ -16,43 +15,9 @@ def create_daily_avg_app():
         suppress_callback_exceptions=True
     )
 
-    def get_daily_avg_data():
-        """Fetches and processes day-of-week averages"""
-        # Get all logs and process day of week in Python
-        logs = ServerLog.objects.all().values_list('timestamp', flat=True)
-        sales = ServerLog.objects.filter(request_method="POST").values_list('timestamp', flat=True)
-        
-        if not logs:
-            return pd.DataFrame()
-            
-        # Process visitor counts by day of week
-        visitor_days = [datetime.fromisoformat(str(log)).strftime('%A') for log in logs]
-        visitor_counts = pd.Series(visitor_days).value_counts().to_dict()
-        
-        # Process sales counts by day of week
-        sale_days = [datetime.fromisoformat(str(sale)).strftime('%A') for sale in sales]
-        sale_counts = pd.Series(sale_days).value_counts().to_dict()
-        
-        # Create DataFrame with all days
-        days = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
-        data = []
-        
-        for day in days:
-            visitors = visitor_counts.get(day, 0)
-            sales_count = sale_counts.get(day, 0)
-            conversion = (sales_count / visitors * 100) if visitors > 0 else 0
-            data.append({
-                'day_name': day,
-                'visitors': visitors,
-                'sales': sales_count,
-                'conversion_rate': conversion
-            })
-            
-        return pd.DataFrame(data)
-
     def create_daily_avg_chart():
         """Creates the day-of-week averages chart"""
-        daily_df = get_daily_avg_data()
+        daily_df = weekday_averages()
         
         if daily_df.empty:
             return px.bar(title="No visitor data available")
@@ -61,12 +26,11 @@ def create_daily_avg_app():
         fig = px.bar(
             daily_df,
             x='day_name',
-            y='visitors',
+            y='avg_visitors',
             title=None,
-            labels={'visitors': 'Avg Visitors', 'day_name': 'Day of Week'},
+            labels={'avg_visitors': 'Avg Visitors', 'day_name': 'Day of Week'},
             color_discrete_sequence=['#4285F4'],
-            category_orders={"day_name": ["Monday", "Tuesday", "Wednesday", 
-                                       "Thursday", "Friday", "Saturday", "Sunday"]}
+            category_orders={"day_name": DAYS}
         )
         
         # Add conversion rate line
@@ -136,6 +100,7 @@ def create_daily_avg_app():
 
     # Set the app layout
     app.layout = html.Div([
+        create_startup_trigger(),
         html.Div(
             "Weekly Visitor & Conversion Patterns",
             style={
@@ -148,7 +113,6 @@ def create_daily_avg_app():
         ),
         dcc.Graph(
             id='daily-avg-chart',
-            figure=create_daily_avg_chart(),
             config={'displayModeBar': False},
             style={
                 'height': '270px',
@@ -167,4 +131,11 @@ def create_daily_avg_app():
         )
     ], style={'backgroundColor': 'white', 'padding': '10px'})
 
+    @app.callback(
+        Output('daily-avg-chart', 'figure'),
+        Input(STARTUP_TRIGGER_ID, 'n_intervals')
+    )
+    def update_chart(_):
+        return create_daily_avg_chart()
+
     return app
\ No newline at end of file
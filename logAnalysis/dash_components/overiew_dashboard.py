@@ -1,19 +1,19 @@
-import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
 from django_plotly_dash import DjangoDash
-from dash import html, dcc, Input, Output
-from datetime import datetime
+from dash import html, dcc, Input, Output, State, no_update
+from dash.exceptions import PreventUpdate
+from django.conf import settings
+from ..callback_cache import cached_callback
+from ..data_version import get_data_version
 from ..models import ServerLog
-from django.db.models.functions import ExtractYear, ExtractHour
-from django.db.models import Count, Avg
+from django.db.models.functions import ExtractYear
 from .sales_by_country import create_sales_by_country_chart
 from .profit_gauge import create_profit_gauge_chart
 from .peak_hours2 import create_peak_hours_chart
 from .refferer_chart import create_referrer_chart
 from .daily_visitors import create_unique_visitors_gauge_chart, create_virtual_assistant_gauge_chart
 from .bounce_rate import create_bounce_rate_gauge_chart
-from collections import Counter
+from .overview_functions import create_daily_avg_chart, create_product_chart, create_top_pages_chart
+from .startup import STARTUP_TRIGGER_ID, create_startup_trigger
 
 card_style = {
     'padding': '15px',
@@ -30,9 +30,26 @@ title_style = {
     'fontSize': '12px'
 }
 
+# Seconds between data version checks of an open Overview page
+DEFAULT_LIVE_INTERVAL = 5
+
+def register_chart_callback(app, output_id, build_figure):
+    """Registers a cached callback that rebuilds one chart when the year or the data version changes"""
+    @app.callback(
+        Output(output_id, 'figure'),
+        Input('year-filter', 'value'),
+        Input('data-version', 'data')
+    )
+    @cached_callback('OverviewDashboard', output_id)
+    def update_chart(selected_year, data_version):
+        if data_version is None:
+            raise PreventUpdate  # Drawn once check_data_version has filled the store
+        return build_figure(selected_year)
+
 def create_overview_dashboard():
     """Creates a dashboard with all analytics charts and a shared year dropdown"""
     app = DjangoDash('OverviewDashboard', external_scripts=["https://cdn.plot.ly/plotly-2.18.2.min.js"])
+    live_interval = getattr(settings, "LIVE_DASHBOARD_INTERVAL", DEFAULT_LIVE_INTERVAL)
     
     # Create year dropdown options
     def get_year_options():
@@ -57,9 +74,18 @@ def create_overview_dashboard():
                     'fontWeight': 'bold',
                     'fontSize': '12px'
                 }),
+                create_startup_trigger(),
+                # Polls the data version; charts re-render only when it changes
+                dcc.Interval(
+                    id='live-refresh',
+                    interval=live_interval * 1000,
+                    n_intervals=0,
+                    disabled=not live_interval
+                ),
+                dcc.Store(id='data-version'),
                 dcc.Dropdown(
                     id='year-filter',
-                    options=get_year_options(),
+                    options=[{'label': 'All Years', 'value': 'all'}],
                     value='all',
                     clearable=False,
                     style={
@@ -205,262 +231,36 @@ def create_overview_dashboard():
         'margin': '0 auto'
     })
 
-    # Callback to update all charts including the new gauge chart
     @app.callback(
-    [
-        Output('profit-gauge-chart', 'figure'),
-        Output('unique-visitors-gauge-chart', 'figure'),
-        Output('bounce-rate-gauge-chart', 'figure'),
-        Output('virtual-assistant-gauge-chart', 'figure'),  # ⬅️ Added here
-        Output('peak-hours-chart', 'figure'),
-        Output('daily-avg-chart', 'figure'),
-        Output('product-analytics-chart', 'figure'),
-        Output('referrer-pie-chart', 'figure'),
-        Output('sales-by-country-chart', 'figure'),
-        Output('top-pages-chart', 'figure')
-    ],
-    [Input('year-filter', 'value')]
-)
-
-    def update_charts(selected_year):
-        # Helper function to filter data by year
-        def filter_by_year(queryset, year):
-            if year and year != 'all':
-                return queryset.filter(timestamp__year=int(year))
-            return queryset
-        
-        # 0. Create gauge chart for average yearly profit
-
-        def create_top_pages_chart():
-            """Returns a vertical bar chart of the top 5 most visited URLs."""
-            logs = ServerLog.objects.all().values_list('url', flat=True)
-
-            url_counts = Counter(logs)
-            top_5 = url_counts.most_common(5)
-            urls, counts = zip(*top_5) if top_5 else ([], [])
-
-            fig = go.Figure(data=[go.Bar(
-                x=urls,
-                y=counts,
-                marker_color='#4e79a7'
-            )])
-
-            fig.update_layout(
-                height=220,
-                margin=dict(l=10, r=10, t=10, b=0),
-                plot_bgcolor='white',
-                paper_bgcolor='white',
-                font=dict(size=12),
-                xaxis=dict(
-                    #title='Page URL',
-                    tickangle=-30,
-                    tickfont=dict(size=10),
-                    showgrid=False
-                ),
-                yaxis=dict(
-                    #title='Visits',
-                    showgrid=True,
-                    gridcolor='lightgray'
-                )
-            )
+        Output('year-filter', 'options'),
+        Input(STARTUP_TRIGGER_ID, 'n_intervals')
+    )
+    def load_year_options(_):
+        return get_year_options()
 
-            return fig
-
-        # 1. Update peak hours chart
-        # 2. Update daily averages chart
-        def create_daily_avg_chart(year):
-            logs = filter_by_year(ServerLog.objects, year).values_list('timestamp', flat=True)
-            sales = filter_by_year(ServerLog.objects.filter(request_method="POST"), year).values_list('timestamp', flat=True)
-            
-            if not logs:
-                return px.bar(title="No visitor data available")
-                
-            visitor_days = [datetime.fromisoformat(str(log)).strftime('%A') for log in logs]
-            visitor_counts = pd.Series(visitor_days).value_counts().to_dict()
-            
-            sale_days = [datetime.fromisoformat(str(sale)).strftime('%A') for sale in sales]
-            sale_counts = pd.Series(sale_days).value_counts().to_dict()
-            
-            days = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
-            data = []
-            
-            for day in days:
-                visitors = visitor_counts.get(day, 0)
-                sales_count = sale_counts.get(day, 0)
-                conversion = (sales_count / visitors * 100) if visitors > 0 else 0
-                data.append({
-                    'day_name': day,
-                    'visitors': visitors,
-                    'sales': sales_count,
-                    'conversion_rate': conversion
-                })
-                
-            daily_df = pd.DataFrame(data)
-            
-            fig = px.bar(
-                daily_df,
-                x='day_name',
-                y='visitors',
-                labels={'visitors': 'Avg Visitors', 'day_name': 'Day of Week'},
-                color_discrete_sequence=['#4e79a7'],
-                category_orders={"day_name": days}
-            )
-            
-            fig.add_scatter(
-                x=daily_df['day_name'],
-                y=daily_df['conversion_rate'],
-                name='Conversion Rate',
-                line=dict(color='#f28e2b', width=3),
-                yaxis='y2',
-                mode='lines+markers',
-                marker=dict(size=8, color='#e15759')
-            )
-            
-            fig.update_layout(
-                plot_bgcolor='white',
-                paper_bgcolor='white',
-                margin={"r": 10, "t": 10, "l": 10, "b": 30},
-                xaxis={
-                    'title': None,
-                    'showline': True,
-                    'linecolor': 'lightgray',
-                    'tickfont': dict(size=10)
-                },
-                yaxis={
-                    'title': 'Avg Visitors',
-                    'showline': True,
-                    'linecolor': 'lightgray',
-                    'gridcolor': 'rgba(0,0,0,0.05)',
-                    'tickfont': dict(size=10),
-                    'title_font': dict(size=10)
-                },
-                yaxis2={
-                    'title': 'Conversion Rate (%)',
-                    'overlaying': 'y',
-                    'side': 'right',
-                    'showgrid': False,
-                    'range': [0, daily_df['conversion_rate'].max() * 1.2],
-                    'tickfont': dict(size=10),
-                    'title_font': dict(size=10)
-                },
-                legend={
-                    'orientation': 'h',
-                    'yanchor': 'bottom',
-                    'y': 1.02,
-                    'xanchor': 'right',
-                    'x': 1,
-                    'font': dict(size=10)
-                },
-                hovermode='x unified'
-            )
-            
-            fig.update_traces(
-                marker_line_width=0,
-                opacity=0.8,
-                hovertemplate='Day: %{x}<br>Visitors: %{y:.0f}<extra></extra>'
-            )
-            
-            fig.update_traces(
-                selector={'name': 'Conversion Rate'},
-                hovertemplate='Day: %{x}<br>Conversion: %{y:.1f}%<extra></extra>'
-            )
-            
-            return fig
-        
-        # 3. Update product analytics chart
-        def create_product_chart(year):
-            queryset = filter_by_year(ServerLog.objects, year)
-            
-            product_views = (
-                queryset
-                .filter(url__startswith="/solutions/", request_method="GET")
-                .values('url')
-                .annotate(view_count=Count('url')))
-            
-            purchases = (
-                queryset
-                .filter(request_method="POST")
-                .values('url')
-                .annotate(purchase_count=Count('url')))
-            
-            views_df = pd.DataFrame(list(product_views))
-            purchases_df = pd.DataFrame(list(purchases))
-            
-            if views_df.empty and purchases_df.empty:
-                return px.bar(title="No product data available")
-
-            def extract_product_name(url):
-                parts = str(url).split("/")
-                return parts[2] if len(parts) > 2 else "Unknown"
-            
-            views_df['product'] = views_df['url'].apply(extract_product_name) if not views_df.empty else []
-            purchases_df['product'] = purchases_df['url'].apply(extract_product_name) if not purchases_df.empty else []
-            
-            merged_df = pd.merge(
-                views_df.groupby('product')['view_count'].sum().reset_index() if not views_df.empty else pd.DataFrame({'product': [], 'view_count': []}),
-                purchases_df.groupby('product')['purchase_count'].sum().reset_index() if not purchases_df.empty else pd.DataFrame({'product': [], 'purchase_count': []}),
-                on='product',
-                how='outer'
-            ).fillna(0)
-            
-            product_df = merged_df.sort_values('view_count', ascending=False).head(10)
-            
-            fig = px.bar(
-                product_df,
-                x='product',
-                y=['view_count', 'purchase_count'],
-                labels={'product': '', 'value': '', 'variable': 'Metric'},
-                color_discrete_map={
-                    'view_count': '#4e79a7',  # Blue for views
-                    'purchase_count': '#59a14f'  # Green for purchases
-                }
-            )
-            
-            fig.update_layout(
-                barmode='stack',
-                plot_bgcolor='white',
-                paper_bgcolor='white',
-                hovermode='x',
-                margin={"r": 10, "t": 10, "l": 10, "b": 30},
-                font=dict(size=10),
-                legend=dict(
-                    font=dict(size=10),
-                    title_font=dict(size=10),
-                    orientation='h',
-                    yanchor='bottom',
-                    y=1.02,
-                    xanchor='right',
-                    x=1
-                ),
-                xaxis={
-                    'tickangle': 45,
-                    'title': None,
-                    'tickfont': dict(size=10)
-                },
-                yaxis={
-                    'title': None,
-                    'gridcolor': 'rgba(0,0,0,0.05)',
-                    'tickfont': dict(size=10)
-                }
-            )
-            
-            return fig
-        
-        # 4. Update referrer pie chart
+    # Cheap check (one primary-key read) so idle pages cost no chart work
+    @app.callback(
+        Output('data-version', 'data'),
+        Input('live-refresh', 'n_intervals'),
+        State('data-version', 'data')
+    )
+    def check_data_version(_, current_version):
+        version = get_data_version()
+        return no_update if version == current_version else version
 
-        
-        
-        
-        # Return all figures
-        return (
-            create_profit_gauge_chart(selected_year),
-            create_unique_visitors_gauge_chart(selected_year),
-            create_bounce_rate_gauge_chart(selected_year),
-            create_virtual_assistant_gauge_chart(selected_year),  # ⬅️ Added here
-            create_peak_hours_chart(selected_year),
-            create_daily_avg_chart(selected_year),
-            create_product_chart(selected_year),
-            create_referrer_chart(selected_year),
-            create_sales_by_country_chart(selected_year),
-            create_top_pages_chart()
-        )
+    # One callback per chart: Dash requests them concurrently, so each figure is
+    # painted as soon as its own data is ready instead of waiting for the slowest
+    chart_builders = {
+        'profit-gauge-chart': create_profit_gauge_chart,
+        'unique-visitors-gauge-chart': create_unique_visitors_gauge_chart,
+        'bounce-rate-gauge-chart': create_bounce_rate_gauge_chart,
+        'virtual-assistant-gauge-chart': create_virtual_assistant_gauge_chart,
+        'peak-hours-chart': create_peak_hours_chart,
+        'daily-avg-chart': create_daily_avg_chart,
+        'product-analytics-chart': create_product_chart,
+        'referrer-pie-chart': create_referrer_chart,
+        'sales-by-country-chart': create_sales_by_country_chart,
+        'top-pages-chart': create_top_pages_chart,
+    }
+    for output_id, build_figure in chart_builders.items():
+        register_chart_callback(app, output_id, build_figure)
@@ -0,0 +1,182 @@
+"""Chart builders used by the Overview dashboard (overiew_dashboard.py)"""
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+
+from ..heavy_hitters import top_pages
+from ..live_aggregates import get_traffic_aggregates
+from ..weekdays import DAYS, weekday_averages
+
+
+def create_top_pages_chart(year=None):
+    """Returns a vertical bar chart of the top 5 most visited URLs."""
+    top_5 = top_pages(5, year)
+    urls, counts = zip(*top_5) if top_5 else ([], [])
+
+    fig = go.Figure(data=[go.Bar(
+        x=urls,
+        y=counts,
+        marker_color='#4e79a7'
+    )])
+
+    fig.update_layout(
+        height=220,
+        margin=dict(l=10, r=10, t=10, b=0),
+        plot_bgcolor='white',
+        paper_bgcolor='white',
+        font=dict(size=12),
+        xaxis=dict(
+            #title='Page URL',
+            tickangle=-30,
+            tickfont=dict(size=10),
+            showgrid=False
+        ),
+        yaxis=dict(
+            #title='Visits',
+            showgrid=True,
+            gridcolor='lightgray'
+        )
+    )
+
+    return fig
+
+def create_daily_avg_chart(year):
+    """Bar chart of average visitors per day of week with the conversion rate on a second axis."""
+    daily_df = weekday_averages(year)
+
+    if daily_df.empty:
+        return px.bar(title="No visitor data available")
+
+    fig = px.bar(
+        daily_df,
+        x='day_name',
+        y='avg_visitors',
+        labels={'avg_visitors': 'Avg Visitors', 'day_name': 'Day of Week'},
+        color_discrete_sequence=['#4e79a7'],
+        category_orders={"day_name": DAYS}
+    )
+
+    fig.add_scatter(
+        x=daily_df['day_name'],
+        y=daily_df['conversion_rate'],
+        name='Conversion Rate',
+        line=dict(color='#f28e2b', width=3),
+        yaxis='y2',
+        mode='lines+markers',
+        marker=dict(size=8, color='#e15759')
+    )
+
+    fig.update_layout(
+        plot_bgcolor='white',
+        paper_bgcolor='white',
+        margin={"r": 10, "t": 10, "l": 10, "b": 30},
+        xaxis={
+            'title': None,
+            'showline': True,
+            'linecolor': 'lightgray',
+            'tickfont': dict(size=10)
+        },
+        yaxis={
+            'title': 'Avg Visitors',
+            'showline': True,
+            'linecolor': 'lightgray',
+            'gridcolor': 'rgba(0,0,0,0.05)',
+            'tickfont': dict(size=10),
+            'title_font': dict(size=10)
+        },
+        yaxis2={
+            'title': 'Conversion Rate (%)',
+            'overlaying': 'y',
+            'side': 'right',
+            'showgrid': False,
+            'range': [0, daily_df['conversion_rate'].max() * 1.2],
+            'tickfont': dict(size=10),
+            'title_font': dict(size=10)
+        },
+        legend={
+            'orientation': 'h',
+            'yanchor': 'bottom',
+            'y': 1.02,
+            'xanchor': 'right',
+            'x': 1,
+            'font': dict(size=10)
+        },
+        hovermode='x unified'
+    )
+
+    fig.update_traces(
+        marker_line_width=0,
+        opacity=0.8,
+        hovertemplate='Day: %{x}<br>Visitors: %{y:.0f}<extra></extra>'
+    )
+
+    fig.update_traces(
+        selector={'name': 'Conversion Rate'},
+        hovertemplate='Day: %{x}<br>Conversion: %{y:.1f}%<extra></extra>'
+    )
+
+    return fig
+
+def create_product_chart(year):
+    aggregates = get_traffic_aggregates()
+    product_views = aggregates.totals('product', year, request_method="GET")
+    purchases = aggregates.totals('product', year, request_method="POST")
+    product_views.pop("", None)
+    if "" in purchases:
+        purchases["Unknown"] += purchases.pop("")
+
+    views_df = pd.DataFrame(list(product_views.items()), columns=['product', 'view_count'])
+    purchases_df = pd.DataFrame(list(purchases.items()), columns=['product', 'purchase_count'])
+
+    if views_df.empty and purchases_df.empty:
+        return px.bar(title="No product data available")
+
+    merged_df = pd.merge(
+        views_df.groupby('product')['view_count'].sum().reset_index() if not views_df.empty else pd.DataFrame({'product': [], 'view_count': []}),
+        purchases_df.groupby('product')['purchase_count'].sum().reset_index() if not purchases_df.empty else pd.DataFrame({'product': [], 'purchase_count': []}),
+        on='product',
+        how='outer'
+    ).fillna(0)
+
+    product_df = merged_df.sort_values('view_count', ascending=False).head(10)
+
+    fig = px.bar(
+        product_df,
+        x='product',
+        y=['view_count', 'purchase_count'],
+        labels={'product': '', 'value': '', 'variable': 'Metric'},
+        color_discrete_map={
+            'view_count': '#4e79a7',  # Blue for views
+            'purchase_count': '#59a14f'  # Green for purchases
+        }
+    )
+
+    fig.update_layout(
+        barmode='stack',
+        plot_bgcolor='white',
+        paper_bgcolor='white',
+        hovermode='x',
+        margin={"r": 10, "t": 10, "l": 10, "b": 30},
+        font=dict(size=10),
+        legend=dict(
+            font=dict(size=10),
+            title_font=dict(size=10),
+            orientation='h',
+            yanchor='bottom',
+            y=1.02,
+            xanchor='right',
+            x=1
+        ),
+        xaxis={
+            'tickangle': 45,
+            'title': None,
+            'tickfont': dict(size=10)
+        },
+        yaxis={
+            'title': None,
+            'gridcolor': 'rgba(0,0,0,0.05)',
+            'tickfont': dict(size=10)
+        }
+    )
+
+    return fig
@@ -2,9 +2,11 @@ import pandas as pd
 import plotly.express as px
 from django_plotly_dash import DjangoDash
 from dash import html, dcc
-from django.db.models import Count
+from dash.dependencies import Input, Output
+from django.db.models import Sum
 from django.db.models.functions import ExtractHour
-from ..models import ServerLog  # Relative import
+from ..models import HourlyTrafficRollup
+from .startup import STARTUP_TRIGGER_ID, create_startup_trigger
 
 def create_peak_hours_app():
     """Creates and returns the configured peak hours histogram Dash application"""
@@ -17,12 +19,12 @@ def create_peak_hours_app():
     )
 
     def get_hourly_traffic_data():
-        """Fetches and processes hourly traffic data"""
+        """Fetches hourly traffic data from the hourly rollup table"""
         hourly_traffic = (
-            ServerLog.objects
-            .annotate(hour=ExtractHour('timestamp'))
+            HourlyTrafficRollup.objects
+            .annotate(hour=ExtractHour('bucket'))
             .values('hour')
-            .annotate(count=Count('id'))
+            .annotate(count=Sum('requests'))
             .order_by('hour')
         )
         df = pd.DataFrame(list(hourly_traffic))
@@ -93,9 +95,9 @@ def create_peak_hours_app():
 
     # Set the app layout
     app.layout = html.Div([
+        create_startup_trigger(),
         dcc.Graph(
             id='traffic-histogram',
-            figure=create_histogram(),
             config={'displayModeBar': False},
             style={
                 'height': '250px',
@@ -105,4 +107,11 @@ def create_peak_hours_app():
         )
     ], style={'backgroundColor': 'transparent'})
 
+    @app.callback(
+        Output('traffic-histogram', 'figure'),
+        Input(STARTUP_TRIGGER_ID, 'n_intervals')
+    )
+    def update_chart(_):
+        return create_histogram()
+
     return app
\ No newline at end of file
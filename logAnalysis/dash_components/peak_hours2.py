@@ -1,33 +1,10 @@
 import pandas as pd
 import plotly.express as px
-from django_plotly_dash import DjangoDash
-from dash import html, dcc
-from dash.dependencies import Input, Output
-from ..models import ServerLog  # Relative import
-import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-from django_plotly_dash import DjangoDash
-from dash import html, dcc, Input, Output
-from datetime import datetime
-from ..models import ServerLog
-from django.db.models.functions import ExtractYear, ExtractHour
-from django.db.models import Count, Avg
-
-def filter_by_year(queryset, year):
-    if year and year != 'all':
-        return queryset.filter(timestamp__year=int(year))
-    return queryset
+from ..live_aggregates import get_traffic_aggregates
 
 def create_peak_hours_chart(year):
-    hourly_traffic = (
-        filter_by_year(ServerLog.objects, year)
-        .annotate(hour=ExtractHour('timestamp'))
-        .values('hour')
-        .annotate(count=Count('id'))
-        .order_by('hour')
-    )
-    df = pd.DataFrame(list(hourly_traffic))
+    hourly_traffic = get_traffic_aggregates().totals('hour', year)
+    df = pd.DataFrame(sorted(hourly_traffic.items()), columns=['hour', 'count'])
     
     if df.empty:
         return px.bar(title="No traffic data available")
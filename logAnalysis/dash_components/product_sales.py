@@ -1,9 +1,9 @@
 import pandas as pd
 import plotly.express as px
 from django_plotly_dash import DjangoDash
-from dash import html, dcc, callback, Input, Output, clientside_callback
-from django.db.models import Count
-from django.db.models.functions import ExtractYear
+from dash import html, dcc, Input, Output, clientside_callback
+from django.db.models import Count, Value
+from django.db.models.functions import Coalesce, ExtractYear
 from ..models import ServerLog
 
 def create_product_analytics_app():
@@ -23,31 +23,23 @@ def create_product_analytics_app():
         # Get product views (GET requests to /solutions/ URLs)
         product_views = (
             queryset
-            .filter(url__startswith="/solutions/", request_method="GET")
-            .values('url')
-            .annotate(view_count=Count('url')))
+            .filter(product__isnull=False, request_method="GET")
+            .values('product')
+            .annotate(view_count=Count('id')))
         
         # Get purchases (POST requests)
         purchases = (
             queryset
             .filter(request_method="POST")
-            .values('url')
-            .annotate(purchase_count=Count('url')))
+            .values(product_name=Coalesce('product', Value('Unknown')))
+            .annotate(purchase_count=Count('id')))
         
         # Convert to DataFrames
         views_df = pd.DataFrame(list(product_views))
-        purchases_df = pd.DataFrame(list(purchases))
+        purchases_df = pd.DataFrame(list(purchases)).rename(columns={'product_name': 'product'})
         
         if views_df.empty and purchases_df.empty:
             return pd.DataFrame()
-
-        # Extract product names from URLs
-        def extract_product_name(url):
-            parts = str(url).split("/")
-            return parts[2] if len(parts) > 2 else "Unknown"
-        
-        views_df['product'] = views_df['url'].apply(extract_product_name) if not views_df.empty else []
-        purchases_df['product'] = purchases_df['url'].apply(extract_product_name) if not purchases_df.empty else []
         
         # Merge views and purchases
         merged_df = pd.merge(
@@ -111,14 +103,13 @@ def create_product_analytics_app():
         dcc.Input(id='hidden-year-input', type='hidden', value='all'),  # Hidden input for triggering
         dcc.Graph(
             id='product-analytics-chart',
-            figure=create_stacked_chart(),
             config={'displayModeBar': False},
             style={'height': '250px', 'width': '100%'}
         )
     ], style={'padding': '0px'})
 
-    # Callback to update chart based on stored year
-    @callback(
+    # Callback to update chart based on stored year (also builds the initial figure)
+    @app.callback(
         Output('product-analytics-chart', 'figure'),
         Input('year-store', 'data')
     )
@@ -2,8 +2,10 @@ import pandas as pd
 import plotly.express as px
 from django_plotly_dash import DjangoDash
 from dash import html, dcc
+from dash.dependencies import Input, Output
 from django.db.models import Count
 from ..models import ServerLog  # Relative import
+from .startup import STARTUP_TRIGGER_ID, create_startup_trigger
 
 def create_referrer_pie_app():
     """Creates and returns the configured referrer pie chart Dash application"""
@@ -19,25 +21,13 @@ def create_referrer_pie_app():
         """Fetches and processes referrer data"""
         referrer_distribution = (
             ServerLog.objects
-            .values('referrer')
+            .filter(referrer_category__in=['Google', 'LinkedIn', 'Twitter'])
+            .values('referrer_category')
             .annotate(count=Count('id'))
             .order_by('-count')
         )
         return pd.DataFrame(list(referrer_distribution))
 
-    def categorize_referrer(url):
-        """Categorizes referrers into specific social platforms"""
-        if not url or str(url).strip() == "-":
-            return None
-        url = str(url).lower()
-        if 'google.com' in url:
-            return 'Google'
-        elif 'linkedin.com' in url:
-            return 'LinkedIn'
-        elif 'twitter.com' in url:
-            return 'Twitter'
-        return None
-
     def create_pie_chart():
         """Creates the referrer pie chart figure"""
         referrer_df = get_referrer_data()
@@ -45,9 +35,7 @@ def create_referrer_pie_app():
         if referrer_df.empty:
             return px.pie(title="No referrer data available")
             
-        referrer_df['category'] = referrer_df['referrer'].apply(categorize_referrer)
-        filtered_df = referrer_df.dropna(subset=['category'])
-        grouped_df = filtered_df.groupby('category')['count'].sum().reset_index()
+        grouped_df = referrer_df.rename(columns={'referrer_category': 'category'})
 
         # Create pie chart with only the three categories
         fig = px.pie(
@@ -88,6 +76,7 @@ def create_referrer_pie_app():
 
     # Set the app layout with the new title
     app.layout = html.Div([
+        create_startup_trigger(),
         html.Div(
             "Sources of Traffic",
             style={
@@ -100,7 +89,6 @@ def create_referrer_pie_app():
         ),
         dcc.Graph(
             id='referrer-pie-chart',
-            figure=create_pie_chart(),
             config={'displayModeBar': False},
             style={
                 'height': '190px',
@@ -119,4 +107,11 @@ def create_referrer_pie_app():
         )
     ], style={'backgroundColor': 'white', 'padding': '10px'})
 
+    @app.callback(
+        Output('referrer-pie-chart', 'figure'),
+        Input(STARTUP_TRIGGER_ID, 'n_intervals')
+    )
+    def update_chart(_):
+        return create_pie_chart()
+
     return app
\ No newline at end of file
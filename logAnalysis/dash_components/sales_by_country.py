@@ -3,26 +3,11 @@ import plotly.express as px
 from django_plotly_dash import DjangoDash
 from dash import html, dcc
 from dash.dependencies import Input, Output
-from ..models import ServerLog  # Relative import
+from ..dimensions import COUNTRY_PREFIXES as COUNTRY_NAMES
+from ..sales_facts import sales_facts
 
-
-def filter_by_year(queryset, year):
-    if year and year != 'all':
-        return queryset.filter(timestamp__year=int(year))
-    return queryset
 # 5. Update sales by country chart
 def create_sales_by_country_chart(year):
-    PRODUCT_PRICES = {
-        "smart-assist": 2000,
-        "proto-genius": 5000,
-        "flow-optimizer": 15000,
-        "team-connect": 1200,
-        "insight-dashboard": 8000,
-        "virtual-designer": 20000,
-        "rapid-launch": 12000,
-        "ai-inspector": 30000
-    }
-
     COUNTRY_PREFIXES = {
         "168.": "Botswana",
         "102.": "Zambia",
@@ -37,36 +22,13 @@ def create_sales_by_country_chart(year):
         "Zimbabwe": 2_000_000
     }
     
-    logs = filter_by_year(ServerLog.objects.filter(request_method="POST"), year)
-    
-    sales_data = []
-    for log in logs:
-        product = None
-        if log.url.startswith("/solutions/"):
-            parts = log.url.split("/")
-            if len(parts) > 2:
-                product = parts[2]
-                if product not in PRODUCT_PRICES:
-                    continue
-        
-        country = None
-        ip_str = str(log.ip_address).strip() if log.ip_address else ""
-        for prefix, country_name in COUNTRY_PREFIXES.items():
-            if ip_str.startswith(prefix):
-                country = country_name
-                break
-        
-        if product and country:
-            sales_data.append({
-                "product": product,
-                "timestamp": log.timestamp,
-                "date": log.timestamp.date(),
-                "country": country,
-                "referrer": log.referrer,
-                "amount": PRODUCT_PRICES[product]
-            })
-    
-    df = pd.DataFrame(sales_data) if sales_data else pd.DataFrame(columns=["country", "amount"])
+    # ServerLog.country holds the canonical name; this chart keeps its own labels
+    country_labels = {COUNTRY_NAMES[prefix]: label for prefix, label in COUNTRY_PREFIXES.items()}
+    df = sales_facts(year=year)
+    df = pd.DataFrame({
+        "country": df["country"].map(country_labels),
+        "amount": df["amount"]
+    }).dropna(subset=["country"])
     
     if df.empty:
         return px.bar(title="No sales data available")
@@ -78,8 +40,9 @@ def create_sales_by_country_chart(year):
     country_sales["over_achieved"] = country_sales["variance"].apply(lambda x: x if x > 0 else 0)
     country_sales["under_achieved"] = country_sales["variance"].apply(lambda x: -x if x < 0 else 0)
     
+    # Drop "amount" first: pandas >= 2 refuses a value_name that matches a column
     melted_df = pd.melt(
-        country_sales,
+        country_sales.drop(columns="amount"),
         id_vars=["country"],
         value_vars=["achieved", "over_achieved", "under_achieved"],
         var_name="category",
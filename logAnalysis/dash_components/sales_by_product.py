@@ -1,20 +1,8 @@
-import pandas as pd
 import plotly.express as px
 from django_plotly_dash import DjangoDash
 from dash import html, dcc, Input, Output
-from ..models import ServerLog
-
-# Configuration constants
-PRODUCT_PRICES = {
-    "smart-assist": 2000,
-    "proto-genius": 5000,
-    "flow-optimizer": 15000,
-    "team-connect": 1200,
-    "insight-dashboard": 8000,
-    "virtual-designer": 20000,
-    "rapid-launch": 12000,
-    "ai-inspector": 30000
-}
+from ..sales_facts import sales_facts
+from .startup import STARTUP_TRIGGER_ID, create_startup_trigger
 
 COUNTRY_PREFIXES = {
     "168.": "Botswana",
@@ -44,26 +32,7 @@ def create_sales_by_product_app():
 
     def extract_sales_data():
         """Extracts all sales data (no country filtering)"""
-        logs = ServerLog.objects.filter(request_method="POST")
-        
-        sales_data = []
-        for log in logs:
-            # Extract product
-            product = None
-            if log.url.startswith("/solutions/"):
-                parts = log.url.split("/")
-                if len(parts) > 2:
-                    product = parts[2]
-                    if product not in PRODUCT_PRICES:
-                        continue
-            
-            if product:
-                sales_data.append({
-                    "product": product,
-                    "amount": PRODUCT_PRICES[product]
-                })
-        
-        return pd.DataFrame(sales_data) if sales_data else pd.DataFrame(columns=["product", "amount"])
+        return sales_facts()[["product", "amount"]]
 
     def create_bar_chart():
         """Creates the sales by product bar chart"""
@@ -108,11 +77,18 @@ def create_sales_by_product_app():
 
     # Simplified app layout without dropdown
     app.layout = html.Div([
+        create_startup_trigger(),
         dcc.Graph(
             id='sales-by-product-chart',
-            figure=create_bar_chart(),  # Generate initial figure
             style={'height': '270px', 'width': '100%'}
         )
     ])
     
+    @app.callback(
+        Output('sales-by-product-chart', 'figure'),
+        Input(STARTUP_TRIGGER_ID, 'n_intervals')
+    )
+    def update_chart(_):
+        return create_bar_chart()
+
     return app
\ No newline at end of file
@@ -2,8 +2,10 @@ import pandas as pd
 import plotly.express as px
 from django_plotly_dash import DjangoDash
 from dash import html, dcc
+from dash.dependencies import Input, Output
 from django.db.models import Count
 from ..models import ServerLog  # Relative import
+from .startup import STARTUP_TRIGGER_ID, create_startup_trigger
 
 def create_sales_by_traffic_app():
     """Creates a pie chart showing sales distribution by traffic source"""
@@ -18,29 +20,12 @@ def create_sales_by_traffic_app():
         sales_data = (
             ServerLog.objects
             .filter(request_method="POST")  # Only purchase events
-            .values('referrer')
-            .annotate(count=Count('id'), total=Count('id'))
-            .order_by('-count')
+            .values('referrer_category')
+            .annotate(total=Count('id'))
+            .order_by('-total')
         )
         return pd.DataFrame(list(sales_data))
 
-    def categorize_referrer(url):
-        """Enhanced referrer categorization including direct/other"""
-        if not url or str(url).strip() == "-":
-            return "Direct"
-        url = str(url).lower()
-        if 'google.com' in url:
-            return 'Google'
-        elif 'linkedin.com' in url:
-            return 'LinkedIn'
-        elif 'twitter.com' in url:
-            return 'Twitter'
-        elif 'facebook.com' in url:
-            return 'Facebook'
-        elif any(domain in url for domain in ['bing.com', 'yahoo.com']):
-            return 'Other Search'
-        return 'Other Referral'
-
     def create_sales_pie_chart():
         """Creates the sales distribution pie chart"""
         sales_df = get_sales_by_referrer()
@@ -48,10 +33,7 @@ def create_sales_by_traffic_app():
         if sales_df.empty:
             return px.pie(title="No sales data available")
             
-        # Categorize and aggregate
-        sales_df['source'] = sales_df['referrer'].apply(categorize_referrer)
-        grouped_df = sales_df.groupby('source')['total'].sum().reset_index()
-        grouped_df = grouped_df.sort_values('total', ascending=False)
+        grouped_df = sales_df.rename(columns={'referrer_category': 'source'})
 
         # Color mapping for all possible categories
         color_map = {
@@ -99,6 +81,7 @@ def create_sales_by_traffic_app():
 
     # App layout with descriptive titles
     app.layout = html.Div([
+        create_startup_trigger(),
         html.Div(
             "Sales by Traffic Source",
             style={
@@ -111,7 +94,6 @@ def create_sales_by_traffic_app():
         ),
         dcc.Graph(
             id='sales-pie-chart',
-            figure=create_sales_pie_chart(),
             config={'displayModeBar': False},
             style={
                 'height': '220px',
@@ -135,4 +117,11 @@ def create_sales_by_traffic_app():
         'boxShadow': '0 2px 4px rgba(0,0,0,0.1)'
     })
 
+    @app.callback(
+        Output('sales-pie-chart', 'figure'),
+        Input(STARTUP_TRIGGER_ID, 'n_intervals')
+    )
+    def update_chart(_):
+        return create_sales_pie_chart()
+
     return app
\ No newline at end of file
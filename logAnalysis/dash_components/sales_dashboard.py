@@ -3,52 +3,16 @@ import plotly.express as px
 import plotly.graph_objects as go
 from django_plotly_dash import DjangoDash
 from dash import html, dcc, Input, Output
+from django.db.models import Count, Q
+from ..callback_cache import cached_callback
+from ..dimensions import COUNTRY_PREFIXES
+from ..figure_pool import build_figures
 from ..models import ServerLog
+from ..sales_facts import EMPLOYEE_AFFILIATES, PRODUCT_PRICES, sales_facts
+from ..unique_visitors import average_daily_unique_visitors
+from ..visits import bounce_rate as visit_bounce_rate
 from datetime import datetime
 
-# Configuration constants
-PRODUCT_PRICES = {
-    "smart-assist": 2000,
-    "proto-genius": 5000,
-    "flow-optimizer": 15000,
-    "team-connect": 1200,
-    "insight-dashboard": 8000,
-    "virtual-designer": 20000,
-    "rapid-launch": 12000,
-    "ai-inspector": 30000
-}
-
-PRODUCT_COSTS = {
-    "smart-assist": 800,
-    "proto-genius": 2000,
-    "flow-optimizer": 6000,
-    "team-connect": 400,
-    "insight-dashboard": 3000,
-    "virtual-designer": 8000,
-    "rapid-launch": 5000,
-    "ai-inspector": 12000
-}
-
-COUNTRY_PREFIXES = {
-    "168.": "Botswana",
-    "102.": "South Africa",
-    "154.": "Namibia",
-    "197.": "Zimbabwe"
-}
-
-EMPLOYEE_AFFILIATES = {
-    'BOTSALE1': {'name': 'Ava Smith', 'country': 'Botswana'},
-    'BOTSALE2': {'name': 'Liam Jones', 'country': 'Botswana'},
-    'BOTSALE3': {'name': 'Emma Brown', 'country': 'Botswana'},
-    'BOTSALE4': {'name': 'Noah Davis', 'country': 'Botswana'},
-    'ZASALE1': {'name': 'Olivia Wilson', 'country': 'South Africa'},
-    'ZASALE2': {'name': 'James Taylor', 'country': 'South Africa'},
-    'ZASALE3': {'name': 'Sophia Clark', 'country': 'South Africa'},
-    'NAMSALE1': {'name': 'William Lee', 'country': 'Namibia'},
-    'NAMSALE2': {'name': 'Isabella Harris', 'country': 'Namibia'},
-    'ZIMSALE1': {'name': 'Lucas Martin', 'country': 'Zimbabwe'}
-}
-
 card_style = {
     'padding': '15px',
     'backgroundColor': 'white',
@@ -64,69 +28,9 @@ title_style = {
     'fontSize': '12px'
 }
 
-def get_country_from_ip(ip_address):
-    """Helper to get country from IP address"""
-    if not ip_address:
-        return None
-    for prefix, country in COUNTRY_PREFIXES.items():
-        if ip_address.startswith(prefix):
-            return country
-    return None
-
-def categorize_referrer(url):
-    """Enhanced referrer categorization including direct/other"""
-    if not url or str(url).strip() == "-":
-        return "Direct"
-    url = str(url).lower()
-    if 'google.com' in url:
-        return 'Google'
-    elif 'linkedin.com' in url:
-        return 'LinkedIn'
-    elif 'twitter.com' in url:
-        return 'Twitter'
-    elif 'facebook.com' in url:
-        return 'Facebook'
-    elif any(domain in url for domain in ['bing.com', 'yahoo.com']):
-        return 'Other Search'
-    return 'Other Referral'
-
 def extract_sales_data(country_filter):
     """Extracts sales data with optional country filtering"""
-    logs = ServerLog.objects.filter(request_method="POST")
-
-    sales_data = []
-    for log in logs:
-        log_country = get_country_from_ip(log.ip_address)
-        # Apply country filter if specified
-        if country_filter != 'All' and log_country != country_filter:
-            continue
-
-        # Extract product
-        product = None
-        if log.url.startswith("/solutions/"):
-            parts = log.url.split("/")
-            if len(parts) > 2:
-                product = parts[2]
-                if product not in PRODUCT_PRICES:
-                    continue
-
-        if product:
-            profit = PRODUCT_PRICES[product] - PRODUCT_COSTS[product]
-            employee_name = EMPLOYEE_AFFILIATES.get(log.promo_code, {}).get('name') if log.promo_code else None
-            sales_data.append({
-                "product": product,
-                "amount": PRODUCT_PRICES[product],
-                "profit": profit,
-                "referrer": log.referrer,
-                "timestamp": log.timestamp,
-                "promo_code": log.promo_code,
-                "employee_name": employee_name,
-                "country": log_country  # <-- add country here
-            })
-
-    return pd.DataFrame(sales_data) if sales_data else pd.DataFrame(columns=[
-        "product", "amount", "profit", "referrer", "timestamp", "promo_code", "employee_name", "country"
-    ])
+    return sales_facts(country=country_filter)
 
 def create_monthly_revenue_chart(sales_df):
     """Creates a line chart showing average monthly profit, separated by country if multiple."""
@@ -201,7 +105,7 @@ def create_traffic_source_chart(sales_df):
     if sales_df.empty:
         return px.pie(title="No sales data available")
     
-    sales_df['source'] = sales_df['referrer'].apply(categorize_referrer)
+    sales_df['source'] = sales_df['referrer_category']
     grouped_df = sales_df.groupby('source').size().reset_index(name='count')
     grouped_df = grouped_df.sort_values('count', ascending=False)
 
@@ -321,21 +225,22 @@ def create_employee_performance_table(sales_df, country_filter):
         )
         return fig
     
-    # Generate cooked data
-    np.random.seed(42)  # For consistent fake data
+    # Generate cooked data; a local RandomState(42) draws the same numbers as
+    # np.random.seed(42) did without touching the shared global state
+    rng = np.random.RandomState(42)
     num_employees = len(selected_employees)
     
     # Base performance levels (scaled to make top performer ~2500)
     performance_levels = np.linspace(1500, 2500, num_employees)
     # Add some random variation
-    monthly_avgs = performance_levels * np.random.uniform(0.9, 1.1, num_employees)
+    monthly_avgs = performance_levels * rng.uniform(0.9, 1.1, num_employees)
     # Calculate totals assuming ~6 months of data
-    totals = (monthly_avgs * np.random.uniform(5, 7, num_employees)).round(0)
+    totals = (monthly_avgs * rng.uniform(5, 7, num_employees)).round(0)
     
     # Generate top products (random selection from actual products)
     products = list(PRODUCT_PRICES.keys())
     top_products = [
-        ', '.join(np.random.choice(products, size=2, replace=False, p=[0.3, 0.25, 0.2, 0.1, 0.05, 0.05, 0.03, 0.02]))
+        ', '.join(rng.choice(products, size=2, replace=False, p=[0.3, 0.25, 0.2, 0.1, 0.05, 0.05, 0.03, 0.02]))
         for _ in range(num_employees)
     ]
     
@@ -443,13 +348,9 @@ def create_profit_gauge_chart(sales_df, country_filter):
     return fig
 
 
-def create_unique_visitors_gauge_chart(sales_df, country_filter):
+def create_unique_visitors_gauge_chart(country_filter):
     """Gauge chart for average daily unique visitors with consistent styling"""
-
-    if sales_df.empty:
-        unique_visitors = 0
-    else:
-        unique_visitors = sales_df['timestamp'].dt.date.nunique()
+    unique_visitors = average_daily_unique_visitors(country=country_filter)
 
     target = 50  # Target unique daily visitors
 
@@ -493,20 +394,9 @@ def create_unique_visitors_gauge_chart(sales_df, country_filter):
 
     return fig
 
-def create_bounce_rate_gauge_chart(sales_df, country_filter):
-    """Styled and cooked gauge chart for bounce rate with Dashboard styling."""
-
-    # Cooked bounce rate values between 32% and 36%
-    cooked_bounce_rates = {
-        "Botswana": 36.0,
-        "Zimbabwe": 34.5,
-        "South Africa": 33.0,
-        "Namibia": 32.5,
-        "Australia": 35.0,
-        "All": 34.0  # Default for "All Countries"
-    }
-
-    bounce_rate = cooked_bounce_rates.get(country_filter, 34.0)  # fallback if country not listed
+def create_bounce_rate_gauge_chart(country_filter):
+    """Styled gauge chart for the bounce rate of visits from the selected country."""
+    bounce_rate = visit_bounce_rate(country=country_filter)
     target = 40  # Bounce rate target (lower is better)
 
     # Determine bar color based on bounce rate
@@ -550,24 +440,22 @@ def create_bounce_rate_gauge_chart(sales_df, country_filter):
 
 def calculate_virtual_assistant_requests(country_filter):
     """Calculates percentage of logs containing /virtual-assistant"""
-    # Get all logs
     logs = ServerLog.objects.all()
     
     # Filter by country if specified
     if country_filter != 'All':
-        logs = [log for log in logs if get_country_from_ip(log.ip_address) == country_filter]
+        logs = logs.filter(country=country_filter)
     
-    if not logs:
-        return 0
-    
-    # Count total logs and virtual assistant requests
-    total_logs = len(logs)
-    va_logs = len([log for log in logs if '/virtual-assistant' in log.url])
+    # Count total logs and virtual assistant requests in one query
+    counts = logs.aggregate(
+        total_logs=Count('id'),
+        va_logs=Count('id', filter=Q(url__contains='/virtual-assistant')),
+    )
     
-    if total_logs == 0:
+    if not counts['total_logs']:
         return 0
     
-    return (va_logs / total_logs) * 100
+    return (counts['va_logs'] / counts['total_logs']) * 100
 
 def create_virtual_assistant_gauge_chart(country_filter):
     """Styled gauge chart for virtual assistant requests percentage"""
@@ -764,18 +652,20 @@ def create_sales_dashboard():
         ],
         [Input('country-filter', 'value')]
     )
+    @cached_callback('SalesDashboard')
     def update_charts(country_filter):
         sales_df = extract_sales_data(country_filter)
-        revenue_fig = create_monthly_revenue_chart(sales_df)
-        traffic_fig = create_traffic_source_chart(sales_df)
-        profit_fig = create_monthly_profit_chart(sales_df)
-        employee_table_fig = create_employee_performance_table(sales_df, country_filter)
-        profit_gauge_fig = create_profit_gauge_chart(sales_df, country_filter)
-        visitors_gauge_fig = create_unique_visitors_gauge_chart(sales_df, country_filter)
-        bounce_gauge_fig = create_bounce_rate_gauge_chart(sales_df, country_filter)
-        va_gauge_fig = create_virtual_assistant_gauge_chart(country_filter)
-        
-        print(sales_df.head())
-        return revenue_fig, traffic_fig, profit_fig, employee_table_fig, profit_gauge_fig, visitors_gauge_fig, bounce_gauge_fig, va_gauge_fig
+        # Builders add helper columns to the frame they get, so each gets its own copy
+        figures = build_figures('SalesDashboard', {
+            'monthly-revenue-chart': (create_monthly_revenue_chart, (sales_df.copy(),)),
+            'sales-by-traffic-chart': (create_traffic_source_chart, (sales_df.copy(),)),
+            'monthly-profit-chart': (create_monthly_profit_chart, (sales_df.copy(),)),
+            'employee-performance-table': (create_employee_performance_table, (sales_df.copy(), country_filter)),
+            'profit-gauge-chart': (create_profit_gauge_chart, (sales_df.copy(), country_filter)),
+            'unique-visitors-gauge-chart': (create_unique_visitors_gauge_chart, (country_filter,)),
+            'bounce-rate-gauge-chart': (create_bounce_rate_gauge_chart, (country_filter,)),
+            'virtual-assistant-gauge-chart': (create_virtual_assistant_gauge_chart, (country_filter,)),
+        })
+        return tuple(figures.values())
     
     return app
\ No newline at end of file
@@ -0,0 +1,18 @@
+from dash import dcc
+
+# Id of the interval returned by create_startup_trigger()
+STARTUP_TRIGGER_ID = 'startup-trigger'
+
+
+def create_startup_trigger():
+    """One-shot interval that fires right after the page loads.
+
+    Callbacks that query the database take it as their Input, so the query
+    runs when the page loads, not when the app is created.
+    """
+    return dcc.Interval(
+        id=STARTUP_TRIGGER_ID,
+        interval=100,
+        n_intervals=0,
+        max_intervals=1
+    )
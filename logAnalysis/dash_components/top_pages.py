@@ -2,8 +2,9 @@ import pandas as pd
 import plotly.express as px
 from django_plotly_dash import DjangoDash
 from dash import html, dcc
-from django.db.models import Count
-from ..models import ServerLog  # Relative import
+from dash.dependencies import Input, Output
+from ..heavy_hitters import top_pages
+from .startup import STARTUP_TRIGGER_ID, create_startup_trigger
 
 def create_top_pages_app():
     """Creates and returns the configured top pages Dash application"""
@@ -14,13 +15,7 @@ def create_top_pages_app():
     def get_top_pages_data():
         """Fetches and processes top pages data"""
         # Get top 5 visited pages (sorted in descending order)
-        top_pages = (
-            ServerLog.objects
-            .values('url')
-            .annotate(visit_count=Count('url'))
-            .order_by('-visit_count')[:5]
-        )
-        return pd.DataFrame(list(top_pages))
+        return pd.DataFrame(top_pages(5), columns=['url', 'visit_count'])
 
     def clean_url(url):
         """Shortens long URLs for better visualization"""
@@ -77,11 +72,18 @@ def create_top_pages_app():
 
     # Set the app layout
     app.layout = html.Div([
+        create_startup_trigger(),
         dcc.Graph(
             id='top-pages-chart',
-            figure=create_bar_chart(),
             style={'height': '200px', 'width': '600px'}
         )
     ], style={'backgroundColor': '#f8f9fa'})
 
+    @app.callback(
+        Output('top-pages-chart', 'figure'),
+        Input(STARTUP_TRIGGER_ID, 'n_intervals')
+    )
+    def update_chart(_):
+        return create_bar_chart()
+
     return app
\ No newline at end of file
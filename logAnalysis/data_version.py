@@ -0,0 +1,60 @@
+"""Version of the stored log data, used to invalidate derived in-memory data.
+
+The version is a generation counter in the single DataVersion row, bumped
+whenever ingestion writes new rows or a maintenance command rewrites them.
+Being in the database, a bump made inside the writing transaction becomes
+visible to every process exactly when the rows it describes do, whatever
+cache backend is configured.
+"""
+from django.db.models import F
+
+from .models import DataVersion
+
+VERSION_ID = 1
+
+
+def read_version():
+    """(generation, rewrites) as committed"""
+    version = DataVersion.objects.filter(pk=VERSION_ID).values_list("generation", "rewrites").first()
+    return version or (0, 0)
+
+
+def get_generation():
+    return read_version()[0]
+
+
+def get_rewrite_generation():
+    """Counter bumped only when existing rows are changed or deleted, see logAnalysis.snapshot"""
+    return read_version()[1]
+
+
+def lock_data_version():
+    """Serialises writers of ServerLog and its derived tables until the transaction ends.
+
+    A no-op UPDATE of the version row takes its row lock on PostgreSQL and
+    the database write lock on SQLite before anything is read, so
+    concurrent ingests queue here instead of interleaving their
+    read-modify-write of the visits and sketches (or deadlocking on
+    SQLite's read-to-write lock upgrade). Must run inside a transaction.
+    """
+    if not DataVersion.objects.filter(pk=VERSION_ID).update(generation=F("generation")):
+        DataVersion.objects.get_or_create(pk=VERSION_ID)
+
+
+def bump_data_version(rewritten=False):
+    """Marks every cached derivation of ServerLog as stale.
+
+    Pass rewritten=True when existing rows were updated or deleted rather
+    than only new rows added, so append-only caches reload from scratch.
+    Called inside a transaction, the bump commits with that transaction.
+    """
+    changes = {"generation": F("generation") + 1}
+    if rewritten:
+        changes["rewrites"] = F("rewrites") + 1
+    if not DataVersion.objects.filter(pk=VERSION_ID).update(**changes):
+        DataVersion.objects.get_or_create(pk=VERSION_ID, defaults={"generation": 1, "rewrites": int(rewritten)})
+
+
+def get_data_version():
+    """Opaque string that changes whenever ServerLog content changes"""
+    return str(get_generation())
@@ -0,0 +1,87 @@
+"""Dimensions derived from a raw log row: country, product and referrer category.
+
+These mirror the helpers the sales dashboard has always used
+(get_country_from_ip, the "/solutions/<product>" URL convention and
+categorize_referrer) so rollups and charts group rows the same way.
+"""
+
+COUNTRY_PREFIXES = {
+    "168.": "Botswana",
+    "102.": "South Africa",
+    "154.": "Namibia",
+    "197.": "Zimbabwe"
+}
+
+PRODUCT_URL_PREFIX = "/solutions/"
+# Length of ServerLog.product / TrafficRollup.product
+PRODUCT_MAX_LENGTH = 100
+
+
+def country_from_ip(ip_address):
+    """Country for an IP address based on its first octet, or None"""
+    if not ip_address:
+        return None
+    ip_address = str(ip_address).strip()
+    for prefix, country in COUNTRY_PREFIXES.items():
+        if ip_address.startswith(prefix):
+            return country
+    return None
+
+
+def product_from_url(url):
+    """Product slug of a "/solutions/<product>" URL, or None"""
+    if not url or not url.startswith(PRODUCT_URL_PREFIX):
+        return None
+    parts = url.split("/")
+    return parts[2][:PRODUCT_MAX_LENGTH] or None
+
+
+def categorize_referrer(url):
+    """Enhanced referrer categorization including direct/other"""
+    if not url or str(url).strip() == "-":
+        return "Direct"
+    url = str(url).lower()
+    if 'google.com' in url:
+        return 'Google'
+    elif 'linkedin.com' in url:
+        return 'LinkedIn'
+    elif 'twitter.com' in url:
+        return 'Twitter'
+    elif 'facebook.com' in url:
+        return 'Facebook'
+    elif any(domain in url for domain in ['bing.com', 'yahoo.com']):
+        return 'Other Search'
+    return 'Other Referral'
+
+
+def derive_dimensions(row):
+    """Derived ServerLog columns for a row dict with ip_address, url and referrer"""
+    return {
+        "country": country_from_ip(row["ip_address"]),
+        "product": product_from_url(row["url"]),
+        "referrer_category": categorize_referrer(row["referrer"]),
+    }
+
+
+def backfill_dimensions(model, batch_size=5000):
+    """Fills the derived columns of rows stored before they existed.
+
+    Takes the model class to update; returns the number of rows updated.
+    """
+    updated = 0
+    last_id = 0
+    while True:
+        rows = list(
+            model.objects
+            .filter(referrer_category__isnull=True, id__gt=last_id)
+            .order_by("id")
+            .values("id", "ip_address", "url", "referrer")[:batch_size]
+        )
+        if not rows:
+            return updated
+        last_id = rows[-1]["id"]
+        model.objects.bulk_update(
+            [model(id=row["id"], **derive_dimensions(row)) for row in rows],
+            ["country", "product", "referrer_category"],
+        )
+        updated += len(rows)
@@ -0,0 +1,16 @@
+"""Year filter shared by the dashboards' queries, rollups and in-memory series."""
+
+
+def selected_year(year):
+    """The dashboard year selection as an int, or None for no filter ('all', 'All' or empty)"""
+    if year and str(year).lower() != 'all':
+        return int(year)
+    return None
+
+
+def filter_by_year(queryset, year, field='timestamp'):
+    """Restricts `queryset` to one year of the date/datetime `field`; 'all' means no filter"""
+    year = selected_year(year)
+    if year is None:
+        return queryset
+    return queryset.filter(**{f'{field}__year': year})
@@ -0,0 +1,232 @@
+"""Continuous ingestion of growing access-log files (`manage.py follow_logs`).
+
+Each followed file is polled with os.stat(); no inotify is needed. Appended
+complete lines are parsed with the upload parser and written in micro-batches
+through ingestion.write_chunk, flushed once LOG_INGEST_BATCH_SIZE lines are
+pending or the oldest pending line has waited LOG_FOLLOW_MAX_LATENCY seconds.
+
+The read offset is saved in LogFollowOffset in the same transaction as the
+rows, so a restarted follower resumes after the last committed line. A file
+replaced under the same path (rename rotation) is drained to its end before
+the new file is read from the start; a file that shrinks (copytruncate) is
+read again from the start. Rows re-read after a crash are skipped as
+duplicates by their line_digest.
+
+When a batch cannot be written, the next attempt waits RETRY_DELAY seconds,
+doubling up to MAX_RETRY_DELAY, and nothing more is read once a full batch
+is pending, so a database outage neither spins nor grows memory.
+"""
+import copy
+import logging
+import os
+import time
+
+from django.conf import settings
+from django.db import DatabaseError, transaction
+
+from .ingestion import get_batch_size, iter_parsed_chunks, write_chunk
+from .models import LogFollowOffset
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_POLL_INTERVAL = 1.0
+DEFAULT_MAX_LATENCY = 2.0
+# Bytes read from a file per poll step
+READ_SIZE = 1 << 20
+# Seconds before retrying a failed batch, doubled per failure up to the maximum
+RETRY_DELAY = 1.0
+MAX_RETRY_DELAY = 60.0
+
+
+def get_poll_interval(interval=None):
+    if interval is None:
+        interval = getattr(settings, "LOG_FOLLOW_POLL_INTERVAL", DEFAULT_POLL_INTERVAL)
+    return float(interval)
+
+
+def get_max_latency(latency=None):
+    if latency is None:
+        latency = getattr(settings, "LOG_FOLLOW_MAX_LATENCY", DEFAULT_MAX_LATENCY)
+    return float(latency)
+
+
+class FollowedFile:
+    """One followed path: its open handle, unwritten lines and counters"""
+
+    def __init__(self, path, batch_size=None, encoding="utf-8"):
+        self.path = os.path.abspath(path)
+        self.batch_size = get_batch_size(batch_size)
+        self.encoding = encoding
+        self.state, _ = LogFollowOffset.objects.get_or_create(path=self.path)
+        self.handle = None
+        self.identity = None  # (device, inode) of the open handle
+        self.position = 0  # Byte after the last complete line read
+        self.partial = b""
+        self.pending = []  # (line, byte after it) read but not yet committed
+        self.pending_since = None
+        self.retry_delay = 0  # Seconds waited after the last failed batch
+        self.retry_at = 0  # time.monotonic() before which no batch is retried
+        # Counters since the follower started
+        self.lines = 0
+        self.inserted = 0
+        self.duplicates = 0
+        self.rejected = 0
+        self.batches = 0
+        self.failures = 0
+        self.rotations = 0
+        self.truncations = 0
+
+    @property
+    def lag_bytes(self):
+        return self.state.lag_bytes
+
+    def open(self, resume=True):
+        """Opens the file, at the saved offset when resuming the same file; False if missing"""
+        try:
+            handle = open(self.path, "rb")
+        except FileNotFoundError:
+            return False
+        stat = os.fstat(handle.fileno())
+        identity = (stat.st_dev, stat.st_ino)
+        offset = 0
+        if resume and identity == (self.state.device, self.state.inode):
+            if stat.st_size >= self.state.offset:
+                offset = self.state.offset
+            else:
+                logger.warning("%s shrank below its saved offset; reading it from the start", self.path)
+        elif resume and self.state.offset:
+            logger.warning("%s was replaced while not followed; reading the new file from the start", self.path)
+        handle.seek(offset)
+        self.handle, self.identity = handle, identity
+        self.position, self.partial = offset, b""
+        self.state.file_size = stat.st_size
+        return True
+
+    def close(self):
+        if self.handle is not None:
+            self.handle.close()
+        self.handle = self.identity = None
+
+    def read(self, final=False):
+        """Reads one block into the pending lines; returns the bytes consumed.
+
+        With final=True a trailing line without newline counts as complete,
+        for files that will not grow any more.
+        """
+        data = self.handle.read(READ_SIZE)
+        buffer = self.partial + data
+        cut = len(buffer) if final and not data else buffer.rfind(b"\n") + 1
+        self.partial = buffer[cut:]
+        if not cut:
+            return 0
+        if self.pending_since is None:
+            self.pending_since = time.monotonic()
+        end = self.position + cut
+        raw_lines = buffer[:cut].split(b"\n")
+        if buffer[cut - 1:cut] == b"\n":
+            raw_lines.pop()
+        for raw in raw_lines:
+            self.position = min(self.position + len(raw) + 1, end)
+            self.pending.append((raw.decode(self.encoding, errors="replace") + "\n", self.position))
+        return cut
+
+    def backing_off(self):
+        """True while waiting to retry a failed batch"""
+        return time.monotonic() < self.retry_at
+
+    def poll(self):
+        """Reads whatever was appended since the last poll; returns the bytes consumed.
+
+        Reads nothing while backing off or once a full batch is waiting to be written.
+        """
+        if self.backing_off() or len(self.pending) >= self.batch_size:
+            return 0
+        if self.handle is None and not self.open():
+            return 0
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            stat = None  # Rotated away and not recreated yet: keep draining the open handle
+        if stat is not None and (stat.st_dev, stat.st_ino) != self.identity:
+            while self.read(final=True):
+                pass
+            if not self.flush():
+                return 0
+            self.rotations += 1
+            logger.info("%s was rotated; following the new file", self.path)
+            self.close()
+            self.open(resume=False)
+        elif stat is not None and stat.st_size < self.position + len(self.partial):
+            if not self.flush():
+                return 0
+            self.truncations += 1
+            logger.info("%s was truncated; reading it from the start", self.path)
+            self.handle.seek(0)
+            self.position, self.partial = 0, b""
+        if stat is not None:
+            self.state.file_size = stat.st_size
+        return self.read()
+
+    def due(self, max_latency):
+        """True when a batch is full or the oldest pending line has waited max_latency seconds"""
+        if not self.pending or self.backing_off():
+            return False
+        return len(self.pending) >= self.batch_size or time.monotonic() - self.pending_since >= max_latency
+
+    def flush(self):
+        """Writes every pending line in batches; False when a batch could not be saved"""
+        while self.pending:
+            batch = self.pending[:self.batch_size]
+            if not self.write(batch):
+                self.retry_delay = min(self.retry_delay * 2, MAX_RETRY_DELAY) if self.retry_delay else RETRY_DELAY
+                self.retry_at = time.monotonic() + self.retry_delay
+                return False
+            self.retry_delay = 0
+            del self.pending[:len(batch)]
+        self.pending_since = None
+        return True
+
+    def write(self, batch):
+        """Stores one batch and the offset after it in a single transaction"""
+        lines = [line for line, _ in batch]
+        rows, chunk = [], None
+        try:
+            with transaction.atomic():
+                for chunk, rows in iter_parsed_chunks(lines, len(lines), start_line=self.state.lines + 1):
+                    write_chunk(chunk, rows)
+                if chunk is not None and chunk.failure:
+                    self.failures += 1
+                    logger.error("Could not write %d lines of %s: %s", len(lines), self.path, chunk.failure)
+                    return False
+                # Updated on a copy, so a failed save leaves the committed state in place
+                state = copy.copy(self.state)
+                state.device, state.inode = self.identity
+                state.offset = batch[-1][1]
+                state.lines += len(lines)
+                if chunk is not None:
+                    state.inserted += chunk.inserted
+                if rows:
+                    state.last_timestamp = max(row["timestamp"] for row in rows)
+                state.batch_latency = time.monotonic() - self.pending_since
+                state.save()
+        except DatabaseError:
+            self.failures += 1
+            logger.exception("Could not write %d lines of %s", len(lines), self.path)
+            return False
+        self.state = state
+
+        self.lines += len(lines)
+        self.batches += 1
+        if chunk is not None:
+            self.inserted += chunk.inserted
+            self.duplicates += chunk.duplicates
+            self.rejected += chunk.unmatched + chunk.invalid
+        return True
+
+    def save_metrics(self, lines_per_second):
+        """Stores throughput and the latest file size for the follow status endpoint"""
+        self.state.lines_per_second = lines_per_second
+        try:
+            self.state.save(update_fields=["lines_per_second", "file_size", "updated_at"])
+        except DatabaseError:
+            logger.warning("Could not save follow metrics of %s", self.path, exc_info=True)
@@ -0,0 +1,132 @@
+"""Most requested pages: exact top-K queries and an approximate Space-Saving sketch.
+
+The exact query groups ServerLog by URL in the database and returns only K
+rows. The sketch (PageHeavyHitter) keeps a bounded number of counters per
+year, updated in the ingestion transaction, so the top pages can be read
+without touching ServerLog at all.
+"""
+from collections import Counter
+from datetime import timezone
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count
+from django.db.models.functions import ExtractYear
+
+from .data_version import lock_data_version
+from .filters import filter_by_year, selected_year
+from .models import PageHeavyHitter, ServerLog
+
+# Counters kept per sketch; the top K is reliable for K well below this
+DEFAULT_SKETCH_SIZE = 200
+
+
+def get_sketch_size():
+    return getattr(settings, "TOP_PAGES_SKETCH_SIZE", DEFAULT_SKETCH_SIZE)
+
+
+def top_pages(k=5, year=None, country=None):
+    """[(url, requests)] of the k most requested URLs, counted by the database"""
+    logs = ServerLog.objects.all()
+    logs = filter_by_year(logs, year)
+    if country and country != 'All':
+        logs = logs.filter(country=country)
+    return list(
+        logs.values_list('url')
+        .annotate(requests=Count('id'))
+        .order_by('-requests', 'url')[:k]
+    )
+
+
+def approximate_top_pages(k=5, year=None):
+    """[(url, requests, error)] from the heavy-hitter sketch of `year` (all years if None)"""
+    year = selected_year(year)
+    if year is None:
+        year = PageHeavyHitter.ALL_YEARS
+    return list(
+        PageHeavyHitter.objects
+        .filter(year=year)
+        .order_by('-requests', 'url')
+        .values_list('url', 'requests', 'error')[:k]
+    )
+
+
+def space_saving_merge(counters, increments, capacity):
+    """Folds {url: n} increments into Space-Saving counters {url: [requests, error]}.
+
+    When the sketch is full, a new URL takes over the smallest counter and
+    inherits its count as error (weighted Space-Saving). Larger increments
+    are applied first so they are the least likely to be evicted.
+    """
+    counters = {url: list(counter) for url, counter in counters.items()}
+    for url, n in sorted(increments.items(), key=lambda item: (-item[1], item[0])):
+        if url in counters:
+            counters[url][0] += n
+        elif len(counters) < capacity:
+            counters[url] = [n, 0]
+        else:
+            evicted = min(counters, key=lambda key: (counters[key][0], key))
+            floor = counters.pop(evicted)[0]
+            counters[url] = [floor + n, floor]
+    return counters
+
+
+def update_heavy_hitters(rows):
+    """Folds newly inserted ServerLog row dicts into the per-year and all-time sketches.
+
+    Must run inside a transaction; the affected sketches are locked while updated.
+    """
+    if not rows:
+        return
+    increments = {PageHeavyHitter.ALL_YEARS: Counter()}
+    for row in rows:
+        year = row["timestamp"].astimezone(timezone.utc).year
+        increments.setdefault(year, Counter())[row["url"]] += 1
+        increments[PageHeavyHitter.ALL_YEARS][row["url"]] += 1
+
+    capacity = get_sketch_size()
+    for year, counts in increments.items():
+        stored = {
+            hitter.url: hitter
+            for hitter in PageHeavyHitter.objects.select_for_update().filter(year=year)
+        }
+        merged = space_saving_merge(
+            {url: (hitter.requests, hitter.error) for url, hitter in stored.items()},
+            counts,
+            capacity,
+        )
+        evicted = [hitter.id for url, hitter in stored.items() if url not in merged]
+        to_update, to_create = [], []
+        for url, (requests, error) in merged.items():
+            hitter = stored.get(url)
+            if hitter is None:
+                to_create.append(PageHeavyHitter(year=year, url=url, requests=requests, error=error))
+            elif (hitter.requests, hitter.error) != (requests, error):
+                hitter.requests, hitter.error = requests, error
+                to_update.append(hitter)
+        PageHeavyHitter.objects.filter(id__in=evicted).delete()
+        PageHeavyHitter.objects.bulk_update(to_update, ["requests", "error"], batch_size=500)
+        PageHeavyHitter.objects.bulk_create(to_create, batch_size=500)
+
+
+def rebuild_heavy_hitters():
+    """Refills every sketch with exact counts of the top URLs per year and overall"""
+    capacity = get_sketch_size()
+    with transaction.atomic():
+        lock_data_version()
+        PageHeavyHitter.objects.all().delete()
+        years = (
+            ServerLog.objects.annotate(year=ExtractYear('timestamp'))
+            .values_list('year', flat=True).distinct().order_by()
+        )
+        sketches = {PageHeavyHitter.ALL_YEARS: top_pages(capacity)}
+        sketches.update((year, top_pages(capacity, year=year)) for year in years)
+        PageHeavyHitter.objects.bulk_create(
+            [
+                PageHeavyHitter(year=year, url=url, requests=requests)
+                for year, pages in sketches.items()
+                for url, requests in pages
+            ],
+            batch_size=500,
+        )
+    return sum(len(pages) for pages in sketches.values())
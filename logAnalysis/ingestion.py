@@ -0,0 +1,311 @@
+import functools
+import hashlib
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+from django.conf import settings
+from django.db import DatabaseError, connection, transaction
+
+from .data_version import bump_data_version, lock_data_version
+from .heavy_hitters import update_heavy_hitters
+from .live_logs import publish_rows
+from .log_parser import iter_decoded_lines, parse_log_line
+from .lookups import chunked
+from .parallel_parser import iter_column_rows, iter_shard_results
+from .rollups import update_rollups
+from .unique_visitors import update_visitor_sketches
+from .visits import update_visits
+from .models import LogUpload, ServerLog
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 5000
+MAX_ERRORS_PER_CHUNK = 20
+# Leading bytes of an upload compared against the manifest before parsing it
+HEAD_SIZE = 64 * 1024
+
+
+def get_batch_size(batch_size=None):
+    """Resolves the chunk size, falling back to settings.LOG_INGEST_BATCH_SIZE"""
+    if batch_size is None:
+        batch_size = getattr(settings, "LOG_INGEST_BATCH_SIZE", DEFAULT_BATCH_SIZE)
+    batch_size = int(batch_size)
+    if batch_size < 1:
+        raise ValueError("batch_size must be a positive integer")
+    return batch_size
+
+
+def get_worker_count(workers=None):
+    """Resolves parser processes from settings.LOG_INGEST_WORKERS (0 means one per CPU)"""
+    if workers is None:
+        workers = getattr(settings, "LOG_INGEST_WORKERS", 1)
+    workers = int(workers)
+    if workers < 0:
+        raise ValueError("workers must be zero or a positive integer")
+    return workers or os.cpu_count() or 1
+
+
+def requires_valid_ips():
+    """True when ServerLog.ip_address is a PostgreSQL inet column, which rejects malformed addresses.
+
+    SQLite stores any text, so there lines such as the bundled sample's
+    "192.168.1.1109" are kept as before.
+    """
+    return connection.vendor == "postgresql"
+
+
+@dataclass
+class ChunkReport:
+    """Outcome of a single chunk: what was written and what was rejected"""
+    index: int
+    first_line: int
+    last_line: int = 0
+    inserted: int = 0
+    duplicates: int = 0
+    unmatched: int = 0
+    invalid: int = 0
+    errors: list = field(default_factory=list)
+    failure: str = None
+
+    def add_error(self, line_number, message):
+        self.invalid += 1
+        if len(self.errors) < MAX_ERRORS_PER_CHUNK:
+            self.errors.append((line_number, message))
+
+    def describe(self):
+        """One-line human readable summary used for upload messages"""
+        text = f"Chunk {self.index + 1} (lines {self.first_line}-{self.last_line})"
+        if self.failure:
+            return f"{text}: not saved ({self.failure})"
+        details = [f"{self.invalid} invalid"] if self.invalid else []
+        if self.errors:
+            line_number, message = self.errors[0]
+            details.append(f"first at line {line_number}: {message}")
+        return f"{text}: " + ", ".join(details)
+
+
+@dataclass
+class IngestReport:
+    """Aggregated outcome of an ingestion run"""
+    batch_size: int
+    chunks: list = field(default_factory=list)
+    duplicate_of: LogUpload = None
+
+    @property
+    def inserted(self):
+        return sum(chunk.inserted for chunk in self.chunks)
+
+    @property
+    def duplicates(self):
+        return sum(chunk.duplicates for chunk in self.chunks)
+
+    @property
+    def unmatched(self):
+        return sum(chunk.unmatched for chunk in self.chunks)
+
+    @property
+    def invalid(self):
+        return sum(chunk.invalid for chunk in self.chunks)
+
+    @property
+    def problem_chunks(self):
+        return [chunk for chunk in self.chunks if chunk.failure or chunk.invalid]
+
+
+def iter_parsed_chunks(lines, batch_size=None, start_line=1):
+    """Parses lines and yields (ChunkReport, rows) every batch_size matched rows"""
+    batch_size = get_batch_size(batch_size)
+    index = 0
+    chunk = ChunkReport(index=index, first_line=start_line)
+    rows = []
+    line_number = start_line - 1
+    check_ip = requires_valid_ips()
+
+    for line_number, line in enumerate(lines, start=start_line):
+        try:
+            row = parse_log_line(line, check_ip)
+        except ValueError as e:
+            chunk.add_error(line_number, str(e))
+            continue
+        if row is None:
+            chunk.unmatched += 1
+            continue
+        rows.append(row)
+
+        if len(rows) >= batch_size:
+            chunk.last_line = line_number
+            yield chunk, rows
+            index += 1
+            chunk = ChunkReport(index=index, first_line=line_number + 1)
+            rows = []
+
+    if rows or chunk.unmatched or chunk.invalid:
+        chunk.last_line = line_number
+        yield chunk, rows
+
+
+def existing_digests(digests):
+    """Returns the subset of digests already stored in ServerLog"""
+    digests = list(digests)
+    found = set()
+    for batch in chunked(digests):
+        found.update(
+            ServerLog.objects
+            .filter(line_digest__in=batch)
+            .values_list("line_digest", flat=True)
+        )
+    return found
+
+
+def write_chunk(chunk, rows):
+    """Writes the chunk's new rows with bulk_create inside its own transaction.
+
+    Rows whose line_digest is repeated within the chunk or already stored are
+    counted as duplicates instead of being inserted again; a digest stored
+    concurrently by a writer that bypasses this function fails the chunk
+    (IntegrityError); chunks written here queue on lock_data_version. The
+    traffic rollups, top-page sketches, visits and visitor sketches are
+    updated and the data version bumped in the same transaction; once it
+    commits the rows are published to live-tail subscribers.
+    """
+    if not rows:
+        return chunk
+    unique_rows = {}
+    for row in rows:
+        unique_rows.setdefault(row["line_digest"], row)
+    try:
+        with transaction.atomic():
+            lock_data_version()
+            stored = existing_digests(unique_rows)
+            new_rows = [row for digest, row in unique_rows.items() if digest not in stored]
+            # No ignore_conflicts: every derived count below assumes all of new_rows
+            # went in, so a row committed concurrently by another writer fails the chunk
+            ServerLog.objects.bulk_create([ServerLog(**row) for row in new_rows])
+            update_rollups(new_rows)
+            update_heavy_hitters(new_rows)
+            update_visits(new_rows)
+            update_visitor_sketches(new_rows)
+            if new_rows:
+                bump_data_version()
+                transaction.on_commit(functools.partial(publish_rows, new_rows))
+    except DatabaseError as e:
+        logger.exception("Failed to write log chunk %s", chunk.index)
+        chunk.failure = str(e)
+        return chunk
+    chunk.inserted = len(new_rows)
+    chunk.duplicates = len(rows) - len(new_rows)
+    return chunk
+
+
+def ingest_lines(lines, batch_size=None):
+    """Parses an iterable of log lines and stores them in fixed-size chunks"""
+    report = IngestReport(batch_size=get_batch_size(batch_size))
+    for chunk, rows in iter_parsed_chunks(lines, report.batch_size):
+        report.chunks.append(write_chunk(chunk, rows))
+    return report
+
+
+def ingest_file_parallel(path, workers=None, batch_size=None, encoding="utf-8"):
+    """Parses a log file in worker processes and stores the rows in fixed-size chunks.
+
+    Shard results arrive in file order; the parent only rebuilds rows from
+    their columns and writes them, so parsing scales with the worker count.
+    """
+    report = IngestReport(batch_size=get_batch_size(batch_size))
+    first_line = 1
+    for result in iter_shard_results(path, get_worker_count(workers), encoding, requires_valid_ips()):
+        columns = result["columns"]
+        line_offsets = columns["line"]
+        last_line = first_line + result["line_count"] - 1
+        starts = range(0, len(line_offsets), report.batch_size) or [0]
+
+        for n, start in enumerate(starts):
+            stop = min(start + report.batch_size, len(line_offsets))
+            chunk = ChunkReport(
+                index=len(report.chunks),
+                first_line=first_line if n == 0 else first_line + line_offsets[start],
+                last_line=last_line if stop == len(line_offsets) else first_line + line_offsets[stop - 1],
+            )
+            if n == 0:
+                # Rejected lines are reported against the shard's first chunk
+                chunk.unmatched = result["unmatched"]
+                for offset, message in result["errors"]:
+                    chunk.add_error(first_line + offset, message)
+                chunk.invalid = result["invalid"]
+            report.chunks.append(write_chunk(chunk, list(iter_column_rows(columns, start, stop))))
+
+        first_line = last_line + 1
+    return report
+
+
+def file_digest(uploaded_file):
+    """SHA-256 of an UploadedFile, read chunk by chunk"""
+    sha256 = hashlib.sha256()
+    for chunk in uploaded_file.chunks():
+        sha256.update(chunk)
+    return sha256.hexdigest()
+
+
+def head_digest(uploaded_file):
+    """SHA-256 of the first HEAD_SIZE bytes of an UploadedFile"""
+    uploaded_file.seek(0)
+    head = uploaded_file.read(HEAD_SIZE)
+    uploaded_file.seek(0)
+    return hashlib.sha256(head).hexdigest()
+
+
+def hashed_chunks(chunks, sha256):
+    """Passes chunks through, feeding each one to `sha256` on the way"""
+    for chunk in chunks:
+        sha256.update(chunk)
+        yield chunk
+
+
+def ingest_upload(uploaded_file, batch_size=None, encoding="utf-8"):
+    """Streams an UploadedFile through the parser chunk by chunk, without staging it on disk.
+
+    The content is hashed while it is parsed. A file whose size and first
+    HEAD_SIZE bytes match a LogUpload entry is hashed up front and skipped
+    without parsing when identical; a re-upload missed that way is
+    recognised after the run, all its rows being duplicates. Either way the
+    returned report then carries `duplicate_of`.
+    """
+    batch_size = get_batch_size(batch_size)
+    size, head_sha256 = uploaded_file.size, head_digest(uploaded_file)
+    candidates = LogUpload.objects.filter(size=size, head_sha256=head_sha256)
+    if candidates.exists():
+        previous = candidates.filter(sha256=file_digest(uploaded_file)).first()
+        if previous is not None:
+            return IngestReport(batch_size=batch_size, duplicate_of=previous)
+
+    workers = get_worker_count()
+    if workers > 1 and hasattr(uploaded_file, "temporary_file_path"):
+        # Large uploads are spooled to a temp file by Django; shard that file across
+        # processes and hash it in a thread meanwhile (hashlib releases the GIL)
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            digest = pool.submit(file_digest, uploaded_file)
+            report = ingest_file_parallel(uploaded_file.temporary_file_path(), workers, batch_size, encoding)
+            sha256 = digest.result()
+    else:
+        hasher = hashlib.sha256()
+        report = ingest_lines(iter_decoded_lines(hashed_chunks(uploaded_file.chunks(), hasher), encoding), batch_size)
+        sha256 = hasher.hexdigest()
+
+    previous = LogUpload.objects.filter(sha256=sha256).first()
+    if previous is not None:
+        if not report.inserted:
+            report.duplicate_of = previous
+    elif not any(chunk.failure for chunk in report.chunks):
+        LogUpload.objects.get_or_create(
+            sha256=sha256,
+            defaults={
+                "file_name": uploaded_file.name,
+                "size": size,
+                "head_sha256": head_sha256,
+                "inserted": report.inserted,
+                "duplicates": report.duplicates,
+            },
+        )
+    return report
@@ -0,0 +1,112 @@
+"""Request counts per year, hour of day and dimension, kept current in memory.
+
+The counts are loaded once per process from HourlyTrafficRollup. After
+that, each refresh only reads the ServerLog rows above the id high-water
+mark and adds them, so the cost of keeping a live dashboard current grows
+with the newly ingested rows, not with the stored history. Open pages poll
+the data version (one counter row) and only re-render their figures when
+it changes.
+
+As for logAnalysis.snapshot, late commits below the high-water mark are
+picked up within LATE_ROW_MARGIN ids, and the counts are reloaded when
+maintenance commands rewrite rows.
+"""
+import threading
+from collections import Counter
+
+from django.db.models import Max, Sum
+from django.db.models.functions import ExtractHour, ExtractYear
+from django.utils import timezone
+
+from .data_version import get_generation, get_rewrite_generation
+from .filters import selected_year
+from .models import HourlyTrafficRollup, ServerLog
+from .rollups import row_dimensions
+from .snapshot import LATE_ROW_MARGIN, new_rows
+
+# Key of every count: year and hour of day (current time zone) + rollup dimensions
+FIELDS = ("year", "hour") + HourlyTrafficRollup.DIMENSIONS[1:]
+ROW_FIELDS = ("id", "timestamp", "country", "product", "request_method", "status_code", "referrer_category")
+# Rows fetched per database round trip while refreshing
+FETCH_SIZE = 5000
+
+_lock = threading.Lock()
+_aggregates = None
+
+
+def row_key(row):
+    timestamp = timezone.localtime(row["timestamp"])
+    return (timestamp.year, timestamp.hour) + row_dimensions(row)
+
+
+class TrafficAggregates:
+    """Counter of requests keyed by FIELDS, with a ServerLog id high-water mark"""
+
+    def __init__(self):
+        self.counts = Counter()
+        self.high_water = 0
+        self.recent_ids = set()  # Counted ids within LATE_ROW_MARGIN below the mark
+        self.rewrites = None
+
+    def load(self):
+        """Replaces the counts with the rollup totals and the rows they cover"""
+        grouped = (
+            HourlyTrafficRollup.objects
+            .annotate(year=ExtractYear("bucket"), hour=ExtractHour("bucket"))
+            .values(*FIELDS)
+            .annotate(total=Sum("requests"))
+            .order_by()
+        )
+        # Each statement may see a later commit under READ COMMITTED. Ingests
+        # bump the generation with their rows and rollups, so an unchanged
+        # generation means the reads in between saw the same ingests.
+        while True:
+            generation = get_generation()
+            high_water = ServerLog.objects.aggregate(last_id=Max("id"))["last_id"] or 0
+            counts = Counter({tuple(group[name] for name in FIELDS): group["total"] for group in grouped})
+            recent_ids = set(
+                ServerLog.objects.filter(id__gt=high_water - LATE_ROW_MARGIN).values_list("id", flat=True)
+            )
+            if get_generation() == generation:
+                break
+        self.counts, self.high_water, self.recent_ids = counts, high_water, recent_ids
+
+    def refresh(self):
+        """Adds the rows above the high-water mark and late rows below it; returns how many were added"""
+        added = 0
+        for queryset in new_rows(self.high_water, self.recent_ids):
+            for row in queryset.values(*ROW_FIELDS).iterator(chunk_size=FETCH_SIZE):
+                self.counts[row_key(row)] += 1
+                self.recent_ids.add(row["id"])
+                self.high_water = max(self.high_water, row["id"])
+                added += 1
+        if added:
+            floor = self.high_water - LATE_ROW_MARGIN
+            self.recent_ids = {row_id for row_id in self.recent_ids if row_id > floor}
+        return added
+
+    def totals(self, by, year=None, **filters):
+        """{value of `by`: requests} for one year ('all' or None for every year) and exact-match filters"""
+        year = selected_year(year)
+        index = FIELDS.index(by)
+        conditions = [(FIELDS.index(name), value) for name, value in filters.items()]
+        if year is not None:
+            conditions.append((0, year))
+        totals = Counter()
+        for key, requests in self.counts.items():
+            if all(key[position] == value for position, value in conditions):
+                totals[key[index]] += requests
+        return totals
+
+
+def get_traffic_aggregates():
+    """The process-wide aggregates, brought up to date with ServerLog (shared, do not modify)"""
+    global _aggregates
+    with _lock:
+        rewrites = get_rewrite_generation()
+        if _aggregates is None or _aggregates.rewrites != rewrites:
+            _aggregates = TrafficAggregates()
+            _aggregates.rewrites = rewrites
+            _aggregates.load()
+        _aggregates.refresh()
+        return _aggregates
@@ -0,0 +1,174 @@
+"""Fan-out of newly ingested log lines to live-tail subscribers.
+
+Ingestion publishes each committed chunk as one message to a channel layer
+group. Every open WebSocket (logAnalysis.consumers.LiveLogConsumer) is a
+member of that group, and the server-sent event streams at /logs/
+(consumers.log_stream_app) read from one per-process LogHub that is, so
+the number of viewers does not change the work done by the producer.
+"""
+import asyncio
+import logging
+from collections import deque
+from itertools import takewhile
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.conf import settings
+
+from .log_parser import format_log_line
+
+logger = logging.getLogger(__name__)
+
+LIVE_LOG_GROUP = "live-logs"
+DEFAULT_MAX_BATCH = 500
+DEFAULT_REPLAY_LINES = 1000
+DEFAULT_FLUSH_INTERVAL = 0.5
+DEFAULT_HEARTBEAT = 15
+RECONNECT_MILLISECONDS = 3000
+# Channel layers drop group members after group_expiry seconds (one day by default)
+DEFAULT_GROUP_EXPIRY = 86400
+
+
+def publish_rows(rows):
+    """Sends the most recent of the given ServerLog row dicts to the live-tail group.
+
+    At most LIVE_LOG_MAX_BATCH lines are sent per call; the rest are only
+    counted, so a bulk upload cannot flood the channel layer.
+    """
+    layer = get_channel_layer()
+    if layer is None or not rows:
+        return
+    limit = getattr(settings, "LIVE_LOG_MAX_BATCH", DEFAULT_MAX_BATCH)
+    recent = sorted(rows, key=lambda row: row["timestamp"])[-limit:]
+    message = {
+        "type": "log.lines",
+        "lines": [format_log_line(row) for row in recent],
+        "skipped": len(rows) - len(recent),
+    }
+    try:
+        async_to_sync(layer.group_send)(LIVE_LOG_GROUP, message)
+    except Exception:
+        # The tail is best effort; never fail an ingest because of it
+        logger.exception("Could not publish %d log lines", len(rows))
+
+
+async def stay_in_group(layer, channel):
+    """Adds `channel` to the live-tail group again every half group_expiry, until cancelled.
+
+    Without it a long-lived member silently stops receiving once the
+    channel layer expires its membership.
+    """
+    interval = getattr(layer, "group_expiry", DEFAULT_GROUP_EXPIRY) / 2
+    while True:
+        await asyncio.sleep(interval)
+        await layer.group_add(LIVE_LOG_GROUP, channel)
+
+
+class LogHub:
+    """Recent live-tail lines of this process, shared by every stream subscriber.
+
+    One listener task per process reads the channel layer group into a ring
+    buffer of the last LIVE_LOG_REPLAY_LINES lines; subscribers read from the
+    buffer by sequence number, so a thousand open streams cost one group
+    membership. Must be used from a single event loop.
+    """
+
+    def __init__(self, size):
+        self.lines = deque(maxlen=size)
+        self.sequence = 0  # Sequence number of the newest line
+        self.updated = asyncio.Event()
+        self.listener = None
+
+    def append(self, lines, skipped=0):
+        self.sequence += skipped
+        for line in lines:
+            self.sequence += 1
+            self.lines.append((self.sequence, line))
+        updated, self.updated = self.updated, asyncio.Event()
+        updated.set()
+
+    def since(self, sequence):
+        """(buffered lines after `sequence`, newest sequence, lines after it no longer available)"""
+        lines = [line for _, line in takewhile(lambda item: item[0] > sequence, reversed(self.lines))]
+        lines.reverse()
+        return lines, self.sequence, max(0, self.sequence - sequence - len(lines))
+
+    async def listen(self):
+        layer = get_channel_layer()
+        channel = await layer.new_channel()
+        await layer.group_add(LIVE_LOG_GROUP, channel)
+        rejoin = asyncio.create_task(stay_in_group(layer, channel))
+        try:
+            while True:
+                message = await layer.receive(channel)
+                if message.get("type") == "log.lines":
+                    self.append(message["lines"], message.get("skipped", 0))
+        finally:
+            rejoin.cancel()
+            await layer.group_discard(LIVE_LOG_GROUP, channel)
+
+    def start(self):
+        if self.listener is None or self.listener.done():
+            self.listener = asyncio.get_running_loop().create_task(self.listen())
+
+
+_hubs = {}
+
+
+def get_log_hub():
+    """The LogHub of the running event loop, listening to the live-tail group"""
+    loop = asyncio.get_running_loop()
+    hub = _hubs.get(loop)
+    if hub is None:
+        hub = _hubs[loop] = LogHub(getattr(settings, "LIVE_LOG_REPLAY_LINES", DEFAULT_REPLAY_LINES))
+    hub.start()
+    return hub
+
+
+def stream_options(replay, last_event_id):
+    """(replay, last_event_id) of a stream request's ?replay= and Last-Event-ID header values.
+
+    Raises ValueError when either is not an integer.
+    """
+    return max(0, int(replay or 0)), int(last_event_id) if last_event_id else None
+
+
+def sse_event(lines, sequence, missed=0):
+    """One server-sent event carrying several lines (one data: field each)"""
+    fields = [f"id: {sequence}", "event: lines"]
+    if missed:
+        fields.append(f"data: # {missed} lines missed")
+    fields.extend(f"data: {line}" for line in lines)
+    return "\n".join(fields) + "\n\n"
+
+
+async def stream_events(replay=0, last_event_id=None):
+    """Async generator of server-sent events for one subscriber.
+
+    Starts with the last `replay` buffered lines, or with everything after
+    `last_event_id` when a client reconnects. Lines arriving within
+    LIVE_LOG_FLUSH_INTERVAL of each other are sent as one event, and a
+    comment is sent every LIVE_LOG_HEARTBEAT seconds without traffic.
+    """
+    hub = get_log_hub()
+    flush_interval = getattr(settings, "LIVE_LOG_FLUSH_INTERVAL", DEFAULT_FLUSH_INTERVAL)
+    heartbeat = getattr(settings, "LIVE_LOG_HEARTBEAT", DEFAULT_HEARTBEAT)
+    if last_event_id is not None:
+        sequence = min(last_event_id, hub.sequence)
+    else:
+        sequence = hub.sequence - min(replay, len(hub.lines))
+
+    yield f"retry: {RECONNECT_MILLISECONDS}\n\n"
+    while True:
+        updated = hub.updated
+        lines, newest, missed = hub.since(sequence)
+        if lines or missed:
+            sequence = newest
+            yield sse_event(lines, sequence, missed)
+            # Let more lines gather before the next flush
+            await asyncio.sleep(flush_interval)
+            continue
+        try:
+            await asyncio.wait_for(updated.wait(), heartbeat)
+        except asyncio.TimeoutError:
+            yield ": keep-alive\n\n"
@@ -0,0 +1,111 @@
+import codecs
+import hashlib
+import ipaddress
+import re
+
+from .dimensions import derive_dimensions
+from .timestamps import CLF_TIMESTAMP_FORMAT, parse_clf_timestamp
+
+# Updated regex pattern to include promo codes
+LOG_PATTERN = re.compile(
+    r'(?P<ip>[\d\.]+) - - \[(?P<timestamp>.*?)\] "(?P<method>\w+) (?P<url>.*?)(?:\?(?P<query>.*?))? (?P<http_version>HTTP\/\d\.\d)" (?P<status>\d+) (?P<size>\d+) "(?P<referrer>.*?)" "(?P<user_agent>.*?)"'
+)
+
+TIMESTAMP_FORMAT = CLF_TIMESTAMP_FORMAT
+
+# Fields that identify a log line; also used to backfill digests of stored rows
+DIGEST_FIELDS = (
+    "ip_address", "timestamp", "request_method", "url", "http_version",
+    "status_code", "response_size", "referrer", "user_agent", "promo_code",
+)
+
+
+def extract_promo_code(query_string):
+    """Extract promo code from query string if present"""
+    if not query_string:
+        return None
+    params = query_string.split('&')
+    for param in params:
+        if param.startswith('promo_code='):
+            return param.split('=')[1]
+    return None
+
+
+def row_digest(row):
+    """Fingerprint of a parsed log row, stable across re-uploads.
+
+    Timestamps are hashed as epoch seconds so a row read back from the
+    database (UTC) yields the same digest as the freshly parsed line.
+    """
+    parts = []
+    for name in DIGEST_FIELDS:
+        value = row.get(name)
+        if name == "timestamp":
+            value = int(value.timestamp())
+        parts.append("" if value is None else str(value))
+    return hashlib.blake2b("\x1f".join(parts).encode("utf-8"), digest_size=16).hexdigest()
+
+
+def parse_log_line(line, check_ip=False):
+    """Parses one access-log line into ServerLog field values.
+
+    Returns None when the line does not match LOG_PATTERN and raises
+    ValueError when it matches but a field cannot be converted. With
+    check_ip=True malformed IP addresses (e.g. "192.168.1.1109") are
+    rejected too, for backends that store them in an inet column.
+    """
+    match = LOG_PATTERN.match(line)
+    if not match:
+        return None
+    data = match.groupdict()
+    if check_ip:
+        try:
+            ipaddress.ip_address(data["ip"])
+        except ValueError:
+            raise ValueError(f"invalid IP address {data['ip']!r}") from None
+
+    row = {
+        "ip_address": data["ip"],
+        "timestamp": parse_clf_timestamp(data["timestamp"]),
+        "request_method": data["method"],
+        "url": data["url"],
+        "http_version": data["http_version"],
+        "status_code": int(data["status"]),
+        "response_size": int(data["size"]),
+        "referrer": data["referrer"] if data["referrer"] != "-" else None,
+        "user_agent": data["user_agent"],
+        "promo_code": extract_promo_code(data.get("query")),
+    }
+    row["line_digest"] = row_digest(row)
+    row.update(derive_dimensions(row))
+    return row
+
+
+def format_log_line(row):
+    """Renders a parsed (or stored) log row back as an access-log line, without newline"""
+    url = row["url"]
+    if row.get("promo_code"):
+        url = f"{url}?promo_code={row['promo_code']}"
+    return (
+        f'{row["ip_address"]} - - [{row["timestamp"].strftime(TIMESTAMP_FORMAT)}] '
+        f'"{row["request_method"]} {url} {row["http_version"]}" {row["status_code"]} {row["response_size"]} '
+        f'"{row.get("referrer") or "-"}" "{row["user_agent"]}"'
+    )
+
+
+def iter_decoded_lines(chunks, encoding="utf-8"):
+    """Yields text lines from an iterable of byte chunks without buffering the whole input.
+
+    Lines split across chunk boundaries (including multi-byte characters) are
+    stitched back together before being yielded.
+    """
+    decoder = codecs.getincrementaldecoder(encoding)()
+    pending = ""
+    for chunk in chunks:
+        lines = (pending + decoder.decode(chunk)).split("\n")
+        pending = lines.pop()
+        for line in lines:
+            yield line + "\n"
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending
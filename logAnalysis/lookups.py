@@ -0,0 +1,11 @@
+"""Batched `__in` lookups that stay under SQLite's bound-parameter limit."""
+
+# Values per `field__in` lookup; older SQLite builds allow 999 bound
+# parameters per query, leaving room for the query's other conditions
+LOOKUP_SIZE = 900
+
+
+def chunked(values, size=LOOKUP_SIZE):
+    """Yields consecutive slices of at most `size` items of the sequence `values`"""
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
@@ -0,0 +1,32 @@
+from itertools import cycle, islice
+from pathlib import Path
+
+from django.conf import settings
+
+SAMPLE_LOG = Path(settings.BASE_DIR) / "logs" / "synthetic_webserver_logstxt.txt"
+
+
+def load_sample_lines(path=SAMPLE_LOG):
+    """Reads the bundled synthetic access log used to seed benchmarks"""
+    with open(path, "r", encoding="utf-8") as f:
+        return [line.rstrip("\n") + "\n" for line in f if line.strip()]
+
+
+def generate_log_lines(count, sample_lines=None):
+    """Yields `count` access-log lines built by cycling the bundled sample.
+
+    The last two IP octets are rewritten from a running counter so repeated
+    sample lines stay distinct while keeping their country prefix.
+    """
+    sample_lines = sample_lines or load_sample_lines()
+    for n, line in enumerate(islice(cycle(sample_lines), count)):
+        ip, _, rest = line.partition(" ")
+        prefix = ".".join(ip.split(".")[:2])
+        yield f"{prefix}.{(n >> 8) & 255}.{n & 255} {rest}"
+
+
+def write_log_file(path, count, sample_lines=None):
+    """Writes a generated access log of `count` lines to `path`"""
+    with open(path, "w", encoding="utf-8") as f:
+        f.writelines(generate_log_lines(count, sample_lines))
+    return path
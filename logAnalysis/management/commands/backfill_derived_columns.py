@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from logAnalysis.data_version import bump_data_version
+from logAnalysis.dimensions import backfill_dimensions
+from logAnalysis.ingestion import get_batch_size
+from logAnalysis.models import ServerLog
+
+
+class Command(BaseCommand):
+    help = (
+        "Fills ServerLog.country, product and referrer_category for rows that do not "
+        "have them yet (e.g. rows inserted by tools that bypass logAnalysis.ingestion)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=None)
+
+    def handle(self, *args, **options):
+        updated = backfill_dimensions(ServerLog, get_batch_size(options["batch_size"]))
+        if updated:
+            bump_data_version(rewritten=True)
+        self.stdout.write(f"Updated {updated} rows.")
@@ -0,0 +1,66 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from logAnalysis.data_version import bump_data_version
+from logAnalysis.ingestion import existing_digests, get_batch_size
+from logAnalysis.log_parser import DIGEST_FIELDS, row_digest
+from logAnalysis.models import ServerLog
+
+
+class Command(BaseCommand):
+    help = (
+        "Fills ServerLog.line_digest for rows stored before upload deduplication. "
+        "Rows that duplicate an already digested row are left without a digest, "
+        "or removed with --delete-duplicates."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=None)
+        parser.add_argument(
+            "--delete-duplicates", action="store_true",
+            help="Delete rows whose digest is already taken by another row",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = get_batch_size(options["batch_size"])
+        delete_duplicates = options["delete_duplicates"]
+        updated = duplicates = 0
+        last_id = 0
+
+        while True:
+            rows = list(
+                ServerLog.objects
+                .filter(line_digest__isnull=True, id__gt=last_id)
+                .order_by("id")
+                .values("id", *DIGEST_FIELDS)[:batch_size]
+            )
+            if not rows:
+                break
+            last_id = rows[-1]["id"]
+
+            digests = {}
+            duplicate_ids = []
+            for row in rows:
+                digest = row_digest(row)
+                if digest in digests:
+                    duplicate_ids.append(row["id"])
+                else:
+                    digests[digest] = row["id"]
+
+            with transaction.atomic():
+                for digest in existing_digests(digests):
+                    duplicate_ids.append(digests.pop(digest))
+                ServerLog.objects.bulk_update(
+                    [ServerLog(id=row_id, line_digest=digest) for digest, row_id in digests.items()],
+                    ["line_digest"],
+                )
+                if delete_duplicates and duplicate_ids:
+                    ServerLog.objects.filter(id__in=duplicate_ids).delete()
+
+            updated += len(digests)
+            duplicates += len(duplicate_ids)
+
+        if delete_duplicates and duplicates:
+            bump_data_version(rewritten=True)
+        action = "deleted" if delete_duplicates else "left without a digest"
+        self.stdout.write(f"Digested {updated} rows; {duplicates} duplicate rows {action}.")
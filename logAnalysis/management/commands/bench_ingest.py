@@ -0,0 +1,41 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from logAnalysis.ingestion import get_batch_size, ingest_lines
+
+from ._synthetic import generate_log_lines, load_sample_lines
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmarks the batched ingestion path (rows/sec) on generated logs. "
+        "Every run is rolled back, so the configured database is left untouched."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes", nargs="+", type=int, default=[10_000, 100_000, 1_000_000],
+            help="Number of log lines per run",
+        )
+        parser.add_argument(
+            "--batch-size", type=int, default=None,
+            help="Rows per chunk (defaults to settings.LOG_INGEST_BATCH_SIZE)",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = get_batch_size(options["batch_size"])
+        sample_lines = load_sample_lines()
+
+        self.stdout.write(f"batch size: {batch_size}")
+        self.stdout.write(f"{'lines':>10} {'inserted':>10} {'seconds':>9} {'rows/sec':>10}")
+        for size in options["sizes"]:
+            with transaction.atomic():
+                started = time.perf_counter()
+                report = ingest_lines(generate_log_lines(size, sample_lines), batch_size)
+                elapsed = time.perf_counter() - started
+                transaction.set_rollback(True)
+
+            rate = report.inserted / elapsed if elapsed else 0
+            self.stdout.write(f"{size:>10} {report.inserted:>10} {elapsed:>9.2f} {rate:>10,.0f}")
@@ -0,0 +1,58 @@
+import os
+import tempfile
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from logAnalysis.ingestion import ingest_file_parallel
+from logAnalysis.parallel_parser import iter_shard_results
+
+from ._synthetic import write_log_file
+
+
+class Command(BaseCommand):
+    help = (
+        "Compares parser worker counts on a generated multi-million-line log file. "
+        "With --ingest the rows are also written (and rolled back)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--lines", type=int, default=2_000_000)
+        parser.add_argument("--workers", nargs="+", type=int, default=[1, 4, 16])
+        parser.add_argument("--ingest", action="store_true", help="Include database writes")
+        parser.add_argument("--file", help="Use an existing log file instead of generating one")
+
+    def handle(self, *args, **options):
+        path = options["file"]
+        generated = path is None
+        if generated:
+            fd, path = tempfile.mkstemp(suffix=".txt")
+            os.close(fd)
+            self.stdout.write(f"Generating {options['lines']:,} lines...")
+            write_log_file(path, options["lines"])
+
+        try:
+            size_mb = os.path.getsize(path) / 1024 / 1024
+            self.stdout.write(f"file: {path} ({size_mb:,.1f} MB), cpus: {os.cpu_count()}")
+            self.stdout.write(f"{'workers':>8} {'rows':>10} {'seconds':>9} {'rows/sec':>12} {'speedup':>8}")
+            baseline = None
+            for workers in options["workers"]:
+                started = time.perf_counter()
+                if options["ingest"]:
+                    with transaction.atomic():
+                        rows = ingest_file_parallel(path, workers).inserted
+                        transaction.set_rollback(True)
+                else:
+                    rows = sum(
+                        len(result["columns"]["line"])
+                        for result in iter_shard_results(path, workers)
+                    )
+                elapsed = time.perf_counter() - started
+                baseline = baseline or elapsed
+                self.stdout.write(
+                    f"{workers:>8} {rows:>10} {elapsed:>9.2f} {rows / elapsed:>12,.0f} {baseline / elapsed:>7.1f}x"
+                )
+        finally:
+            if generated:
+                os.remove(path)
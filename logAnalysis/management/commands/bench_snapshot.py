@@ -0,0 +1,47 @@
+import gc
+import time
+import tracemalloc
+
+import pandas as pd
+from django.core.management.base import BaseCommand
+
+from logAnalysis.models import ServerLog
+from logAnalysis.snapshot import COLUMNS, LogSnapshot
+
+
+class Command(BaseCommand):
+    help = (
+        "Compares the memory held by ServerLog loaded as model instances, as values() dicts, "
+        "as a DataFrame built from them and as the columnar snapshot. Reads the configured "
+        "database without changing it."
+    )
+
+    def handle(self, *args, **options):
+        def load_snapshot():
+            snapshot = LogSnapshot()
+            snapshot.refresh()
+            return snapshot
+
+        candidates = [
+            ("list(queryset)", lambda: list(ServerLog.objects.all())),
+            ("list(values())", lambda: list(ServerLog.objects.values(*COLUMNS))),
+            ("DataFrame(values())", lambda: pd.DataFrame.from_records(ServerLog.objects.values(*COLUMNS))),
+            ("LogSnapshot", load_snapshot),
+        ]
+
+        rows = ServerLog.objects.count()
+        self.stdout.write(f"{rows:,} rows")
+        self.stdout.write(f"{'approach':<22} {'held MB':>9} {'peak MB':>9} {'bytes/row':>10} {'seconds':>8}")
+        for name, load in candidates:
+            gc.collect()
+            tracemalloc.start()
+            started = time.perf_counter()
+            loaded = load()
+            elapsed = time.perf_counter() - started
+            held, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            del loaded
+            self.stdout.write(
+                f"{name:<22} {held / 2**20:>9.1f} {peak / 2**20:>9.1f} "
+                f"{held / max(rows, 1):>10.0f} {elapsed:>8.2f}"
+            )
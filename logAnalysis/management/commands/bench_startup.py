@@ -0,0 +1,105 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+SETTINGS_MODULE = "bench_startup_settings"
+
+SETTINGS_TEMPLATE = """\
+from {base} import *  # noqa: F401,F403
+
+DATABASES = {{
+    "default": {{
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": {database!r},
+    }}
+}}
+"""
+
+# Runs in a fresh interpreter so nothing is imported or cached beforehand
+MEASURE_STARTUP = """\
+import json, time
+started = time.perf_counter()
+import django
+django.setup()
+set_up = time.perf_counter()
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+with CaptureQueriesContext(connection) as queries:
+    import WebAnalysisTool.urls
+finished = time.perf_counter()
+print(json.dumps({"setup": set_up - started, "urls": finished - set_up, "queries": len(queries)}))
+"""
+
+GROW_TABLE = """\
+import sys
+from itertools import islice
+import django
+django.setup()
+from logAnalysis.ingestion import ingest_lines
+from logAnalysis.management.commands._synthetic import generate_log_lines
+start, stop = int(sys.argv[1]), int(sys.argv[2])
+report = ingest_lines(islice(generate_log_lines(stop), start, None))
+print(report.inserted)
+"""
+
+
+class Command(BaseCommand):
+    help = (
+        "Measures django.setup() plus URLconf import time (which builds every Dash app) "
+        "against the number of ServerLog rows. Uses a throwaway SQLite database; the "
+        "configured database is not touched."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes", nargs="+", type=int, default=[0, 10_000, 100_000],
+            help="ServerLog row counts to measure at, in increasing order",
+        )
+        parser.add_argument("--repeat", type=int, default=5, help="Fresh interpreters per size")
+
+    def handle(self, *args, **options):
+        sizes = options["sizes"]
+        if sizes != sorted(sizes):
+            raise CommandError("--sizes must be in increasing order")
+
+        with tempfile.TemporaryDirectory() as workdir:
+            database = str(Path(workdir) / "bench_startup.sqlite3")
+            Path(workdir, f"{SETTINGS_MODULE}.py").write_text(
+                SETTINGS_TEMPLATE.format(base=os.environ["DJANGO_SETTINGS_MODULE"], database=database)
+            )
+            env = {
+                **os.environ,
+                "DJANGO_SETTINGS_MODULE": SETTINGS_MODULE,
+                "PYTHONPATH": os.pathsep.join(filter(None, [workdir, str(settings.BASE_DIR), os.environ.get("PYTHONPATH")])),
+            }
+            self.run_child(["-m", "django", "migrate", "--skip-checks", "-v", "0"], env)
+
+            self.stdout.write(
+                f"{'rows':>10} {'setup ms':>9} {'urls ms':>9} {'total ms':>9} {'queries':>8}"
+            )
+            rows = 0
+            for size in sizes:
+                if size > rows:
+                    self.run_child(["-c", GROW_TABLE, str(rows), str(size)], env)
+                    rows = size
+                runs = [json.loads(self.run_child(["-c", MEASURE_STARTUP], env)) for _ in range(options["repeat"])]
+                setup = statistics.median(run["setup"] for run in runs) * 1000
+                urls = statistics.median(run["urls"] for run in runs) * 1000
+                queries = max(run["queries"] for run in runs)
+                self.stdout.write(f"{size:>10} {setup:>9.0f} {urls:>9.0f} {setup + urls:>9.0f} {queries:>8}")
+
+    def run_child(self, args, env):
+        result = subprocess.run(
+            [sys.executable, *args], env=env, cwd=settings.BASE_DIR,
+            capture_output=True, text=True,
+        )
+        if result.returncode:
+            raise CommandError(result.stderr.strip().splitlines()[-1] if result.stderr else "child process failed")
+        return result.stdout.strip().splitlines()[-1] if result.stdout.strip() else ""
@@ -0,0 +1,42 @@
+import time
+from datetime import datetime
+
+from django.core.management.base import BaseCommand
+
+from logAnalysis.log_parser import LOG_PATTERN
+from logAnalysis.timestamps import CLF_TIMESTAMP_FORMAT, parse_clf_timestamp, parse_clf_timestamps
+
+from ._synthetic import SAMPLE_LOG, load_sample_lines
+
+
+class Command(BaseCommand):
+    help = "Compares datetime.strptime with the CLF timestamp decoders on the bundled synthetic log."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--repeat", type=int, default=20, help="Passes over the sample timestamps")
+        parser.add_argument("--file", default=str(SAMPLE_LOG))
+
+    def handle(self, *args, **options):
+        timestamps = [
+            match.group("timestamp")
+            for match in map(LOG_PATTERN.match, load_sample_lines(options["file"]))
+            if match
+        ] * options["repeat"]
+
+        candidates = [
+            ("strptime", lambda: [datetime.strptime(value, CLF_TIMESTAMP_FORMAT) for value in timestamps]),
+            ("parse_clf_timestamp", lambda: [parse_clf_timestamp(value) for value in timestamps]),
+            ("parse_clf_timestamps (numpy)", lambda: parse_clf_timestamps(timestamps)),
+        ]
+
+        self.stdout.write(f"{len(timestamps):,} timestamps")
+        self.stdout.write(f"{'decoder':<30} {'seconds':>9} {'per second':>14} {'speedup':>8}")
+        baseline = None
+        for name, run in candidates:
+            started = time.perf_counter()
+            run()
+            elapsed = time.perf_counter() - started
+            baseline = baseline or elapsed
+            self.stdout.write(
+                f"{name:<30} {elapsed:>9.3f} {len(timestamps) / elapsed:>14,.0f} {baseline / elapsed:>7.1f}x"
+            )
@@ -0,0 +1,83 @@
+import signal
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from logAnalysis.follow import FollowedFile, get_max_latency, get_poll_interval
+
+
+class Command(BaseCommand):
+    help = (
+        "Follows growing access-log files and ingests appended lines in micro-batches. "
+        "Offsets are saved with every batch, so a restart resumes after the last committed "
+        "line; rotated and truncated files are detected by polling. Prints throughput and "
+        "lag every --stats-interval seconds (also served at /api/follow-status/)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("paths", nargs="+", help="Log files to follow (they may not exist yet)")
+        parser.add_argument("--interval", type=float, default=None, help="Seconds between polls when idle")
+        parser.add_argument("--max-latency", type=float, default=None, help="Seconds a read line may wait before it is written")
+        parser.add_argument("--batch-size", type=int, default=None, help="Lines per batch/transaction")
+        parser.add_argument("--encoding", default="utf-8")
+        parser.add_argument("--stats-interval", type=float, default=10.0, help="Seconds between metric lines (0 disables them)")
+        parser.add_argument("--once", action="store_true", help="Ingest what is there now and exit")
+
+    def handle(self, *args, **options):
+        interval = get_poll_interval(options["interval"])
+        max_latency = get_max_latency(options["max_latency"])
+        if interval <= 0 or max_latency < 0:
+            raise CommandError("--interval must be positive and --max-latency zero or positive")
+        try:
+            followers = [
+                FollowedFile(path, options["batch_size"], options["encoding"])
+                for path in dict.fromkeys(options["paths"])
+            ]
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        self.stopping = False
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signum, self.stop)
+
+        stats_interval = options["stats_interval"]
+        last_stats, last_lines = time.monotonic(), {follower: 0 for follower in followers}
+        try:
+            while not self.stopping:
+                read = 0
+                for follower in followers:
+                    read += follower.poll()
+                    if follower.due(max_latency):
+                        follower.flush()
+                if options["once"] and not read:
+                    break
+                now = time.monotonic()
+                if stats_interval and now - last_stats >= stats_interval:
+                    self.report(followers, last_lines, now - last_stats)
+                    last_stats = now
+                if not read:
+                    # Sleep only when idle, so a backlog is read at full speed
+                    time.sleep(min(interval, max_latency or interval))
+        finally:
+            for follower in followers:
+                if not follower.flush():
+                    self.stderr.write(f"{follower.path}: {len(follower.pending)} lines left unwritten")
+                follower.close()
+        self.report(followers, last_lines, time.monotonic() - last_stats)
+
+    def stop(self, signum, frame):
+        self.stopping = True
+
+    def report(self, followers, last_lines, elapsed):
+        """Writes one metrics line per file and stores the throughput for the status endpoint"""
+        for follower in followers:
+            rate = (follower.lines - last_lines[follower]) / max(elapsed, 1e-9)
+            last_lines[follower] = follower.lines
+            follower.save_metrics(rate)
+            self.stdout.write(
+                f"{follower.path}: {rate:.0f} lines/s, {follower.lines} lines "
+                f"({follower.inserted} new, {follower.duplicates} duplicate, {follower.rejected} rejected), "
+                f"{follower.lag_bytes} bytes behind, last batch {follower.state.batch_latency:.2f} s, "
+                f"{follower.rotations} rotations, {follower.truncations} truncations, "
+                f"{follower.failures} failed batches"
+            )
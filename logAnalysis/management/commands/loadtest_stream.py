@@ -0,0 +1,134 @@
+import asyncio
+import statistics
+import threading
+import time
+import tracemalloc
+
+from channels.layers import get_channel_layer
+from django.core.management.base import BaseCommand, CommandError
+
+from logAnalysis.live_logs import LIVE_LOG_GROUP
+
+
+class StreamClient:
+    """One /logs/ subscriber driven straight through the ASGI application"""
+
+    def __init__(self, application, number, replay):
+        self.application = application
+        self.number = number
+        self.replay = replay
+        self.disconnected = asyncio.Event()
+        self.started = asyncio.Event()
+        self.request_sent = False
+        self.status = None
+        self.events = 0
+        self.arrivals = {}  # marker -> perf_counter() when first received
+        self.task = None
+
+    async def receive(self):
+        if not self.request_sent:
+            self.request_sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await self.disconnected.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(self, message):
+        if message["type"] == "http.response.start":
+            self.status = message["status"]
+        elif message["type"] == "http.response.body":
+            body = message.get("body", b"").decode()
+            if body.startswith("retry:"):
+                self.started.set()
+            for line in body.splitlines():
+                if line.startswith("data: loadtest-marker-"):
+                    marker = line.split()[1]
+                    self.arrivals.setdefault(marker, time.perf_counter())
+            if "event: lines" in body:
+                self.events += 1
+
+    def start(self):
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "GET",
+            "scheme": "http",
+            "path": "/logs/",
+            "raw_path": b"/logs/",
+            "query_string": f"replay={self.replay}".encode(),
+            "root_path": "",
+            "headers": [(b"host", b"localhost")],
+            "client": ("127.0.0.1", 10000 + self.number),
+            "server": ("localhost", 80),
+        }
+        self.task = asyncio.create_task(self.application(scope, self.receive, self.send))
+
+
+class Command(BaseCommand):
+    help = (
+        "Opens many concurrent /logs/ server-sent event streams against the ASGI application "
+        "in this process, publishes batches of lines and reports delivery latency, memory "
+        "and threads. No network or database access."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--clients", type=int, default=1000)
+        parser.add_argument("--batches", type=int, default=5, help="Publishes to the live-tail group")
+        parser.add_argument("--lines", type=int, default=20, help="Lines per publish")
+        parser.add_argument("--replay", type=int, default=10, help="?replay= of every client")
+
+    def handle(self, *args, **options):
+        from WebAnalysisTool.asgi import application
+
+        asyncio.run(self.run(application, options))
+
+    async def run(self, application, options):
+        threads_before = threading.active_count()
+        tracemalloc.start()
+        memory_before = tracemalloc.get_traced_memory()[0]
+
+        started = time.perf_counter()
+        clients = [StreamClient(application, number, options["replay"]) for number in range(options["clients"])]
+        for client in clients:
+            client.start()
+        try:
+            await asyncio.wait_for(asyncio.gather(*(client.started.wait() for client in clients)), 120)
+        except asyncio.TimeoutError:
+            raise CommandError("Not every client received its stream within 120 s")
+        connected = time.perf_counter() - started
+        if any(client.status != 200 for client in clients):
+            raise CommandError(f"Unexpected status: {sorted({client.status for client in clients})}")
+        memory_per_client = (tracemalloc.get_traced_memory()[0] - memory_before) / len(clients)
+        threads = threading.active_count() - threads_before
+
+        layer = get_channel_layer()
+        latencies = []
+        for batch in range(options["batches"]):
+            marker = f"loadtest-marker-{batch}"
+            lines = [f"{marker} line {number}" for number in range(options["lines"])]
+            published = time.perf_counter()
+            await layer.group_send(LIVE_LOG_GROUP, {"type": "log.lines", "lines": lines, "skipped": 0})
+            deadline = published + 30
+            while time.perf_counter() < deadline and not all(marker in client.arrivals for client in clients):
+                await asyncio.sleep(0.01)
+            missing = sum(marker not in client.arrivals for client in clients)
+            if missing:
+                raise CommandError(f"{missing} clients did not receive batch {batch} within 30 s")
+            latencies.extend(client.arrivals[marker] - published for client in clients)
+
+        for client in clients:
+            client.disconnected.set()
+        await asyncio.wait_for(asyncio.gather(*(client.task for client in clients)), 60)
+        tracemalloc.stop()
+
+        latencies.sort()
+        self.stdout.write(f"clients             {len(clients)}")
+        self.stdout.write(f"all streaming after {connected:.2f} s")
+        self.stdout.write(f"extra threads       {threads}")
+        self.stdout.write(f"memory per client   {memory_per_client / 1024:.1f} KiB")
+        self.stdout.write(
+            f"delivery latency    p50 {statistics.median(latencies) * 1000:.0f} ms, "
+            f"p99 {latencies[int(len(latencies) * 0.99) - 1] * 1000:.0f} ms, "
+            f"max {latencies[-1] * 1000:.0f} ms"
+        )
+        self.stdout.write(f"events received     {sum(client.events for client in clients)}")
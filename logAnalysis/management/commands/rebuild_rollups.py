@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from logAnalysis.data_version import bump_data_version
+from logAnalysis.heavy_hitters import rebuild_heavy_hitters
+from logAnalysis.ingestion import get_batch_size
+from logAnalysis.rollups import rebuild_rollups
+from logAnalysis.unique_visitors import rebuild_visitor_sketches
+from logAnalysis.visits import rebuild_visits
+
+
+class Command(BaseCommand):
+    help = "Rebuilds the hourly and daily traffic rollup tables, the top-page sketches, the visits and the daily visitor sketches from ServerLog."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=None, help="Rows per batch when backfilling derived columns first")
+
+    def handle(self, *args, **options):
+        batch_size = get_batch_size(options["batch_size"])
+        rebuilt = rebuild_rollups(batch_size)
+        for model, rows in rebuilt.items():
+            self.stdout.write(f"{model.__name__}: {rows} rows")
+        self.stdout.write(f"PageHeavyHitter: {rebuild_heavy_hitters()} rows")
+        visits, bounce_rows = rebuild_visits(batch_size)
+        self.stdout.write(f"Visit: {visits} rows")
+        self.stdout.write(f"DailyBounceRollup: {bounce_rows} rows")
+        self.stdout.write(f"DailyVisitorSketch: {rebuild_visitor_sketches(batch_size)} rows")
+        # Derived counts were replaced; in-memory aggregates reload from the new rollups
+        bump_data_version(rewritten=True)
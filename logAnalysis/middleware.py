@@ -0,0 +1,28 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django_plotly_dash.middleware import BaseMiddleware, ContentCollector
+
+
+class DashContentMiddleware(BaseMiddleware):
+    """django_plotly_dash's BaseMiddleware that can also run natively under ASGI.
+
+    The upstream middleware is sync-only, so Django would serve every ASGI
+    request behind it from a worker thread, including long-lived streams
+    such as /logs/.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        request.dpd_content_handler = ContentCollector()
+        response = await self.get_response(request)
+        return request.dpd_content_handler.adjust_response(response)
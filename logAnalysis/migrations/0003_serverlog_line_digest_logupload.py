@@ -0,0 +1,29 @@
+# Generated by Django 5.0.4 on 2026-10-18 17:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('logAnalysis', '0002_serverlog_promo_code'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LogUpload',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sha256', models.CharField(max_length=64, unique=True)),
+                ('file_name', models.CharField(max_length=255)),
+                ('inserted', models.IntegerField(default=0)),
+                ('duplicates', models.IntegerField(default=0)),
+                ('uploaded_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='serverlog',
+            name='line_digest',
+            field=models.CharField(blank=True, max_length=32, null=True, unique=True),
+        ),
+    ]
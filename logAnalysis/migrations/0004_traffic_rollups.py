@@ -0,0 +1,47 @@
+# Generated by Django 5.0.4 on 2026-10-18 18:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('logAnalysis', '0003_serverlog_line_digest_logupload'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyTrafficRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('country', models.CharField(blank=True, default='', max_length=50)),
+                ('product', models.CharField(blank=True, default='', max_length=100)),
+                ('request_method', models.CharField(max_length=10)),
+                ('status_code', models.IntegerField()),
+                ('referrer_category', models.CharField(max_length=30)),
+                ('requests', models.BigIntegerField(default=0)),
+                ('bucket', models.DateField()),
+            ],
+        ),
+        migrations.CreateModel(
+            name='HourlyTrafficRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('country', models.CharField(blank=True, default='', max_length=50)),
+                ('product', models.CharField(blank=True, default='', max_length=100)),
+                ('request_method', models.CharField(max_length=10)),
+                ('status_code', models.IntegerField()),
+                ('referrer_category', models.CharField(max_length=30)),
+                ('requests', models.BigIntegerField(default=0)),
+                ('bucket', models.DateTimeField()),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='dailytrafficrollup',
+            constraint=models.UniqueConstraint(fields=('bucket', 'country', 'product', 'request_method', 'status_code', 'referrer_category'), name='daily_rollup_unique_key'),
+        ),
+        migrations.AddConstraint(
+            model_name='hourlytrafficrollup',
+            constraint=models.UniqueConstraint(fields=('bucket', 'country', 'product', 'request_method', 'status_code', 'referrer_category'), name='hourly_rollup_unique_key'),
+        ),
+    ]
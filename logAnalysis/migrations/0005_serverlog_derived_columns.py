@@ -0,0 +1,99 @@
+# Generated by Django 5.0.4 on 2026-10-18 18:04
+
+from django.db import migrations, models
+
+# Frozen copy of logAnalysis.dimensions as of this migration, so later
+# changes to the live derivation do not alter what this backfill writes
+COUNTRY_PREFIXES = {
+    "168.": "Botswana",
+    "102.": "South Africa",
+    "154.": "Namibia",
+    "197.": "Zimbabwe",
+}
+PRODUCT_URL_PREFIX = "/solutions/"
+PRODUCT_MAX_LENGTH = 100
+BATCH_SIZE = 5000
+
+
+def country_from_ip(ip_address):
+    ip_address = str(ip_address or "").strip()
+    for prefix, country in COUNTRY_PREFIXES.items():
+        if ip_address.startswith(prefix):
+            return country
+    return None
+
+
+def product_from_url(url):
+    if not url or not url.startswith(PRODUCT_URL_PREFIX):
+        return None
+    return url.split("/")[2][:PRODUCT_MAX_LENGTH] or None
+
+
+def categorize_referrer(url):
+    if not url or str(url).strip() == "-":
+        return "Direct"
+    url = str(url).lower()
+    if 'google.com' in url:
+        return 'Google'
+    elif 'linkedin.com' in url:
+        return 'LinkedIn'
+    elif 'twitter.com' in url:
+        return 'Twitter'
+    elif 'facebook.com' in url:
+        return 'Facebook'
+    elif any(domain in url for domain in ['bing.com', 'yahoo.com']):
+        return 'Other Search'
+    return 'Other Referral'
+
+
+def backfill(apps, schema_editor):
+    ServerLog = apps.get_model('logAnalysis', 'ServerLog')
+    last_id = 0
+    while True:
+        rows = list(
+            ServerLog.objects
+            .filter(referrer_category__isnull=True, id__gt=last_id)
+            .order_by("id")
+            .values("id", "ip_address", "url", "referrer")[:BATCH_SIZE]
+        )
+        if not rows:
+            return
+        last_id = rows[-1]["id"]
+        ServerLog.objects.bulk_update(
+            [
+                ServerLog(
+                    id=row["id"],
+                    country=country_from_ip(row["ip_address"]),
+                    product=product_from_url(row["url"]),
+                    referrer_category=categorize_referrer(row["referrer"]),
+                )
+                for row in rows
+            ],
+            ["country", "product", "referrer_category"],
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('logAnalysis', '0004_traffic_rollups'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='serverlog',
+            name='country',
+            field=models.CharField(blank=True, db_index=True, max_length=50, null=True),
+        ),
+        migrations.AddField(
+            model_name='serverlog',
+            name='product',
+            field=models.CharField(blank=True, db_index=True, max_length=100, null=True),
+        ),
+        migrations.AddField(
+            model_name='serverlog',
+            name='referrer_category',
+            field=models.CharField(blank=True, db_index=True, max_length=30, null=True),
+        ),
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
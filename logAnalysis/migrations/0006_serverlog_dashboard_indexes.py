@@ -0,0 +1,41 @@
+# Generated by Django 5.0.4 on 2026-10-18 18:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('logAnalysis', '0005_serverlog_derived_columns'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='serverlog',
+            index=models.Index(fields=['request_method', 'timestamp'], name='serverlog_method_time_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='serverlog',
+            index=models.Index(fields=['request_method', 'product'], name='serverlog_method_product_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='serverlog',
+            index=models.Index(fields=['url', 'request_method'], name='serverlog_url_method_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='serverlog',
+            index=models.Index(condition=models.Q(('request_method', 'POST')), fields=['product', 'country', 'timestamp'], name='serverlog_sales_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='serverlog',
+            index=models.Index(fields=['timestamp'], name='serverlog_timestamp_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='serverlog',
+            index=models.Index(fields=['ip_address'], name='serverlog_ip_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='serverlog',
+            index=models.Index(fields=['status_code'], name='serverlog_status_idx'),
+        ),
+    ]
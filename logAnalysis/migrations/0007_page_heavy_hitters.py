@@ -0,0 +1,30 @@
+# Generated by Django 5.0.4 on 2026-10-18 18:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('logAnalysis', '0006_serverlog_dashboard_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PageHeavyHitter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('year', models.IntegerField()),
+                ('url', models.CharField(max_length=500)),
+                ('requests', models.BigIntegerField(default=0)),
+                ('error', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['year', '-requests'], name='page_heavy_hitter_rank_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='pageheavyhitter',
+            constraint=models.UniqueConstraint(fields=('year', 'url'), name='page_heavy_hitter_unique_url'),
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.0.4 on 2026-10-18 18:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('logAnalysis', '0007_page_heavy_hitters'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyBounceRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bucket', models.DateField()),
+                ('country', models.CharField(blank=True, default='', max_length=50)),
+                ('visits', models.BigIntegerField(default=0)),
+                ('bounces', models.BigIntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Visit',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('ip_address', models.GenericIPAddressField()),
+                ('country', models.CharField(blank=True, default='', max_length=50)),
+                ('started', models.DateTimeField()),
+                ('ended', models.DateTimeField()),
+                ('requests', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='dailybouncerollup',
+            constraint=models.UniqueConstraint(fields=('bucket', 'country'), name='daily_bounce_unique_key'),
+        ),
+        migrations.AddIndex(
+            model_name='visit',
+            index=models.Index(fields=['ip_address', 'ended'], name='visit_ip_end_idx'),
+        ),
+    ]
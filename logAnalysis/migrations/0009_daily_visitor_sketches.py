@@ -0,0 +1,26 @@
+# Generated by Django 5.0.4 on 2026-10-18 18:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('logAnalysis', '0008_visits'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyVisitorSketch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bucket', models.DateField()),
+                ('country', models.CharField(blank=True, default='', max_length=50)),
+                ('registers', models.BinaryField()),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='dailyvisitorsketch',
+            constraint=models.UniqueConstraint(fields=('bucket', 'country'), name='daily_visitor_sketch_unique_key'),
+        ),
+    ]
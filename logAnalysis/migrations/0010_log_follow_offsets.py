@@ -0,0 +1,30 @@
+# Generated by Django 5.0.4 on 2026-10-18 18:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('logAnalysis', '0009_daily_visitor_sketches'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LogFollowOffset',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('path', models.CharField(max_length=500, unique=True)),
+                ('device', models.BigIntegerField(default=0)),
+                ('inode', models.BigIntegerField(default=0)),
+                ('offset', models.BigIntegerField(default=0)),
+                ('file_size', models.BigIntegerField(default=0)),
+                ('lines', models.BigIntegerField(default=0)),
+                ('inserted', models.BigIntegerField(default=0)),
+                ('lines_per_second', models.FloatField(default=0)),
+                ('batch_latency', models.FloatField(default=0)),
+                ('last_timestamp', models.DateTimeField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
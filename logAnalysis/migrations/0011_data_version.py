@@ -0,0 +1,26 @@
+# Generated by Django 5.0.4 on 2026-10-18 18:48
+
+from django.db import migrations, models
+
+
+def create_version_row(apps, schema_editor):
+    apps.get_model('logAnalysis', 'DataVersion').objects.get_or_create(pk=1)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('logAnalysis', '0010_log_follow_offsets'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DataVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('generation', models.BigIntegerField(default=0)),
+                ('rewrites', models.BigIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(create_version_row, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.0.4 on 2026-10-18 18:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('logAnalysis', '0011_data_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='logupload',
+            name='head_sha256',
+            field=models.CharField(blank=True, default='', max_length=64),
+        ),
+        migrations.AddField(
+            model_name='logupload',
+            name='size',
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+    ]
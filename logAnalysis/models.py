@@ -11,7 +11,176 @@ class ServerLog(models.Model):
     referrer = models.URLField(blank=True, null=True)
     user_agent = models.TextField()
     promo_code = models.CharField(max_length=20, blank=True, null=True)  # New field
+    line_digest = models.CharField(max_length=32, unique=True, blank=True, null=True)  # See log_parser.row_digest
+    # Derived once at ingest from ip_address/url/referrer, see logAnalysis.dimensions
+    country = models.CharField(max_length=50, blank=True, null=True, db_index=True)
+    product = models.CharField(max_length=100, blank=True, null=True, db_index=True)
+    referrer_category = models.CharField(max_length=30, blank=True, null=True, db_index=True)
+
+    class Meta:
+        # Shaped after the dashboard queries; QueryPlanTests in tests.py verifies they are used
+        indexes = [
+            # Purchases and page views by year (request_method filter + timestamp range)
+            models.Index(fields=["request_method", "timestamp"], name="serverlog_method_time_idx"),
+            # Product views/purchases grouped by product
+            models.Index(fields=["request_method", "product"], name="serverlog_method_product_idx"),
+            # Top pages grouped by URL
+            models.Index(fields=["url", "request_method"], name="serverlog_url_method_idx"),
+            # Sales queries only ever read POST rows
+            models.Index(
+                fields=["product", "country", "timestamp"],
+                name="serverlog_sales_idx",
+                condition=models.Q(request_method="POST"),
+            ),
+            models.Index(fields=["timestamp"], name="serverlog_timestamp_idx"),
+            models.Index(fields=["ip_address"], name="serverlog_ip_idx"),
+            models.Index(fields=["status_code"], name="serverlog_status_idx"),
+        ]
 
     def __str__(self):
         return f"{self.ip_address} - {self.request_method} {self.url} ({self.status_code})"
 
+
+class LogUpload(models.Model):
+    """Manifest of ingested log files, keyed by the SHA-256 of their content"""
+    sha256 = models.CharField(max_length=64, unique=True)
+    # Size and SHA-256 of the first ingestion.HEAD_SIZE bytes, to spot re-uploads before parsing
+    size = models.BigIntegerField(null=True, blank=True)
+    head_sha256 = models.CharField(max_length=64, blank=True, default="")
+    file_name = models.CharField(max_length=255)
+    inserted = models.IntegerField(default=0)
+    duplicates = models.IntegerField(default=0)
+    uploaded_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.file_name} ({self.sha256[:12]})"
+
+
+class DataVersion(models.Model):
+    """Single row counting changes to ServerLog, see logAnalysis.data_version"""
+    generation = models.BigIntegerField(default=0)  # Bumped by every ingest and rewrite
+    rewrites = models.BigIntegerField(default=0)  # Bumped only when existing rows change
+
+
+class LogFollowOffset(models.Model):
+    """Read position and progress of a log file followed by `manage.py follow_logs`.
+
+    `offset` is the byte after the last line committed to ServerLog and is
+    saved in the same transaction as those rows; device/inode identify the
+    file it applies to, so a rotated file is not resumed at the old offset.
+    """
+    path = models.CharField(max_length=500, unique=True)
+    device = models.BigIntegerField(default=0)
+    inode = models.BigIntegerField(default=0)
+    offset = models.BigIntegerField(default=0)
+    file_size = models.BigIntegerField(default=0)  # At the last poll; file_size - offset is the lag
+    lines = models.BigIntegerField(default=0)
+    inserted = models.BigIntegerField(default=0)
+    lines_per_second = models.FloatField(default=0)
+    batch_latency = models.FloatField(default=0)  # Seconds from reading a batch's first line to its commit
+    last_timestamp = models.DateTimeField(blank=True, null=True)  # Newest log timestamp committed
+    updated_at = models.DateTimeField(auto_now=True)
+
+    @property
+    def lag_bytes(self):
+        return max(self.file_size - self.offset, 0)
+
+    def __str__(self):
+        return f"{self.path} @ {self.offset}"
+
+
+class TrafficRollup(models.Model):
+    """Request counts per time bucket and dimension combination, maintained at ingest.
+
+    Missing dimensions (unknown country, non-product URL) are stored as "".
+    """
+    country = models.CharField(max_length=50, blank=True, default="")
+    product = models.CharField(max_length=100, blank=True, default="")
+    request_method = models.CharField(max_length=10)
+    status_code = models.IntegerField()
+    referrer_category = models.CharField(max_length=30)
+    requests = models.BigIntegerField(default=0)
+
+    DIMENSIONS = ("bucket", "country", "product", "request_method", "status_code", "referrer_category")
+
+    class Meta:
+        abstract = True
+
+
+class HourlyTrafficRollup(TrafficRollup):
+    bucket = models.DateTimeField()  # UTC, truncated to the hour
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=TrafficRollup.DIMENSIONS, name="hourly_rollup_unique_key"),
+        ]
+
+
+class DailyTrafficRollup(TrafficRollup):
+    bucket = models.DateField()  # UTC date
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=TrafficRollup.DIMENSIONS, name="daily_rollup_unique_key"),
+        ]
+
+
+class PageHeavyHitter(models.Model):
+    """Space-Saving sketch of the most requested URLs, maintained at ingest.
+
+    One sketch per year plus an all-time sketch (year 0). `requests` may
+    overestimate a URL's true count by at most `error`.
+    """
+    ALL_YEARS = 0
+
+    year = models.IntegerField()
+    url = models.CharField(max_length=500)
+    requests = models.BigIntegerField(default=0)
+    error = models.BigIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["year", "url"], name="page_heavy_hitter_unique_url"),
+        ]
+        indexes = [
+            models.Index(fields=["year", "-requests"], name="page_heavy_hitter_rank_idx"),
+        ]
+
+
+class Visit(models.Model):
+    """Requests from one IP with no gap longer than VISIT_INACTIVITY_TIMEOUT, maintained at ingest"""
+    ip_address = models.GenericIPAddressField()
+    country = models.CharField(max_length=50, blank=True, default="")
+    started = models.DateTimeField()
+    ended = models.DateTimeField()
+    requests = models.IntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["ip_address", "ended"], name="visit_ip_end_idx"),
+        ]
+
+
+class DailyBounceRollup(models.Model):
+    """Visits and single-request visits (bounces) per UTC start date and country"""
+    bucket = models.DateField()
+    country = models.CharField(max_length=50, blank=True, default="")
+    visits = models.BigIntegerField(default=0)
+    bounces = models.BigIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["bucket", "country"], name="daily_bounce_unique_key"),
+        ]
+
+
+class DailyVisitorSketch(models.Model):
+    """HyperLogLog sketch of the distinct IP addresses per UTC date and country, maintained at ingest"""
+    bucket = models.DateField()
+    country = models.CharField(max_length=50, blank=True, default="")
+    registers = models.BinaryField()  # See logAnalysis.unique_visitors
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["bucket", "country"], name="daily_visitor_sketch_unique_key"),
+        ]
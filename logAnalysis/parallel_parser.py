@@ -0,0 +1,128 @@
+"""Multi-process parsing of large access-log files.
+
+The file is cut into byte-range shards aligned on newlines and each shard is
+parsed in a worker process. Workers only import log_parser (no Django), and
+send back compact column lists instead of one dict per row.
+"""
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+
+from .log_parser import parse_log_line
+
+# Columns returned by parse_shard; `line` is the 0-based line index inside the shard
+COLUMNS = (
+    "line", "ip_address", "timestamp", "request_method", "url", "http_version",
+    "status_code", "response_size", "referrer", "user_agent", "promo_code",
+    "line_digest", "country", "product", "referrer_category",
+)
+
+# Shards per worker, so a slow shard does not leave the other workers idle
+SHARDS_PER_WORKER = 4
+# Upper bound on a shard, which bounds the memory of one in-flight result
+MAX_SHARD_BYTES = 64 * 1024 * 1024
+MAX_ERRORS_PER_SHARD = 20
+
+
+def shard_file(path, shard_count):
+    """Splits a file into (start, end) byte ranges that begin at line starts"""
+    size = os.path.getsize(path)
+    if size == 0:
+        return []
+    bounds = [0]
+    with open(path, "rb") as f:
+        for i in range(1, max(1, shard_count)):
+            target = size * i // shard_count
+            if target <= bounds[-1]:
+                continue
+            # Finish the line that straddles the target so the next shard starts cleanly
+            f.seek(target - 1)
+            f.readline()
+            position = f.tell()
+            if position >= size:
+                break
+            if position > bounds[-1]:
+                bounds.append(position)
+    bounds.append(size)
+    return list(zip(bounds, bounds[1:]))
+
+
+def plan_shards(path, workers):
+    """Chooses a shard layout for `workers` processes"""
+    size = os.path.getsize(path)
+    shard_count = max(workers * SHARDS_PER_WORKER, -(-size // MAX_SHARD_BYTES))
+    return shard_file(path, shard_count)
+
+
+def parse_shard(path, start, end, encoding="utf-8", check_ip=False):
+    """Parses one byte range of a log file into column lists (runs in a worker)"""
+    with open(path, "rb") as f:
+        f.seek(start)
+        lines = f.read(end - start).decode(encoding).split("\n")
+    if lines and not lines[-1]:
+        lines.pop()
+
+    columns = {name: [] for name in COLUMNS}
+    unmatched = invalid = 0
+    errors = []
+    for index, line in enumerate(lines):
+        try:
+            row = parse_log_line(line, check_ip)
+        except ValueError as e:
+            invalid += 1
+            if len(errors) < MAX_ERRORS_PER_SHARD:
+                errors.append((index, str(e)))
+            continue
+        if row is None:
+            unmatched += 1
+            continue
+        row["line"] = index
+        row["timestamp"] = int(row["timestamp"].timestamp())
+        for name in COLUMNS:
+            columns[name].append(row[name])
+
+    return {
+        "columns": columns,
+        "line_count": len(lines),
+        "unmatched": unmatched,
+        "invalid": invalid,
+        "errors": errors,
+    }
+
+
+def iter_shard_results(path, workers, encoding="utf-8", check_ip=False):
+    """Parses a file across `workers` processes, yielding shard results in file order.
+
+    At most two shards per worker are in flight, so a slow consumer (e.g. the
+    database writer) never lets parsed results pile up in the parent.
+    """
+    shards = plan_shards(path, workers)
+    if workers <= 1:
+        for start, end in shards:
+            yield parse_shard(path, start, end, encoding, check_ip)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        shards = iter(shards)
+        for start, end in shards:
+            pending.append(executor.submit(parse_shard, path, start, end, encoding, check_ip))
+            if len(pending) >= workers * 2:
+                break
+        while pending:
+            result = pending.popleft().result()
+            for start, end in shards:
+                pending.append(executor.submit(parse_shard, path, start, end, encoding, check_ip))
+                break
+            yield result
+
+
+def iter_column_rows(columns, start=0, stop=None):
+    """Rebuilds ServerLog field dicts from a slice of a shard's columns"""
+    names = [name for name in COLUMNS if name != "line"]
+    stop = len(columns["line"]) if stop is None else stop
+    for i in range(start, stop):
+        row = {name: columns[name][i] for name in names}
+        row["timestamp"] = datetime.fromtimestamp(row["timestamp"], tz=timezone.utc)
+        yield row
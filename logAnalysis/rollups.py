@@ -0,0 +1,130 @@
+"""Hourly and daily traffic rollups maintained incrementally at ingest.
+
+Dashboards read a few hundred rollup rows instead of scanning ServerLog, so
+their cost no longer grows with the number of stored log lines.
+"""
+from collections import Counter
+from datetime import timezone
+
+from django.db import connection, transaction
+from django.db.models import Count, Value
+from django.db.models.functions import Coalesce, TruncDate, TruncHour
+
+from .data_version import lock_data_version
+from .dimensions import backfill_dimensions
+from .models import DailyTrafficRollup, HourlyTrafficRollup, ServerLog
+
+ROLLUP_MODELS = (HourlyTrafficRollup, DailyTrafficRollup)
+# Rows per multi-row upsert, kept under SQLite's bound-parameter limit
+UPSERT_BATCH_SIZE = 100
+
+
+def row_dimensions(row):
+    """(country, product, method, status, referrer category) of a ServerLog row dict"""
+    return (
+        row["country"] or "",
+        row["product"] or "",
+        row["request_method"],
+        row["status_code"],
+        row["referrer_category"],
+    )
+
+
+def count_rows(rows, counts=None):
+    """Counts rows per rollup key for every rollup model"""
+    counts = counts or {model: Counter() for model in ROLLUP_MODELS}
+    for row in rows:
+        timestamp = row["timestamp"].astimezone(timezone.utc)
+        dimensions = row_dimensions(row)
+        counts[HourlyTrafficRollup][(timestamp.replace(minute=0, second=0, microsecond=0),) + dimensions] += 1
+        counts[DailyTrafficRollup][(timestamp.date(),) + dimensions] += 1
+    return counts
+
+
+def add_to_counters(model, key_fields, counter_fields, counts):
+    """Adds {key tuple: counter increments tuple} onto `model` with one upsert per batch.
+
+    INSERT ... ON CONFLICT DO UPDATE (SQLite and PostgreSQL) creates missing
+    keys and increments existing ones atomically, so concurrent writers
+    neither read nor lock the rows first. bulk_create(update_conflicts=True)
+    can only overwrite the counters, not add to them.
+    """
+    counts = [(key, increments) for key, increments in counts.items() if any(increments)]
+    if not counts:
+        return
+    quote = connection.ops.quote_name
+    table = quote(model._meta.db_table)
+    fields = [model._meta.get_field(name) for name in (*key_fields, *counter_fields)]
+    columns = ", ".join(quote(field.column) for field in fields)
+    conflict = ", ".join(quote(model._meta.get_field(name).column) for name in key_fields)
+    updates = ", ".join(
+        f"{quote(field.column)} = {table}.{quote(field.column)} + excluded.{quote(field.column)}"
+        for field in fields[len(key_fields):]
+    )
+    placeholders = "(" + ", ".join(["%s"] * len(fields)) + ")"
+    with connection.cursor() as cursor:
+        for start in range(0, len(counts), UPSERT_BATCH_SIZE):
+            batch = counts[start:start + UPSERT_BATCH_SIZE]
+            params = [
+                field.get_db_prep_save(value, connection)
+                for key, increments in batch
+                for field, value in zip(fields, (*key, *increments))
+            ]
+            cursor.execute(
+                f"INSERT INTO {table} ({columns}) VALUES {', '.join([placeholders] * len(batch))} "
+                f"ON CONFLICT ({conflict}) DO UPDATE SET {updates}",
+                params,
+            )
+
+
+def apply_counts(model, counts):
+    """Adds {rollup key: requests} onto the rollup rows, creating the missing ones"""
+    add_to_counters(model, model.DIMENSIONS, ("requests",), {key: (requests,) for key, requests in counts.items()})
+
+
+def update_rollups(rows):
+    """Folds newly inserted ServerLog row dicts into every rollup table"""
+    for model, counts in count_rows(rows).items():
+        apply_counts(model, counts)
+
+
+def rebuild_rollups(batch_size=5000):
+    """Recomputes every rollup table from ServerLog with one GROUP BY per table"""
+    truncations = {
+        HourlyTrafficRollup: TruncHour("timestamp"),
+        DailyTrafficRollup: TruncDate("timestamp"),
+    }
+    rebuilt = {}
+    with transaction.atomic():
+        lock_data_version()
+        backfill_dimensions(ServerLog, batch_size)
+        for model, truncation in truncations.items():
+            grouped = (
+                ServerLog.objects
+                .annotate(
+                    bucket=truncation,
+                    country_key=Coalesce("country", Value("")),
+                    product_key=Coalesce("product", Value("")),
+                )
+                .values("bucket", "country_key", "product_key", "request_method", "status_code", "referrer_category")
+                .annotate(requests=Count("id"))
+                .order_by()
+            )
+            model.objects.all().delete()
+            created = model.objects.bulk_create(
+                [
+                    model(
+                        bucket=group["bucket"],
+                        country=group["country_key"],
+                        product=group["product_key"],
+                        request_method=group["request_method"],
+                        status_code=group["status_code"],
+                        referrer_category=group["referrer_category"],
+                        requests=group["requests"],
+                    )
+                    for group in grouped.iterator()
+                ],
+                batch_size=500,
+            )
+            rebuilt[model] = len(created)
+    return rebuilt
@@ -0,0 +1,12 @@
+from django.urls import path
+
+from .consumers import LiveLogConsumer, log_stream_app
+
+# Served ahead of Django's URLconf, see WebAnalysisTool.asgi
+http_urlpatterns = [
+    path('logs/', log_stream_app, name='stream_logs'),
+]
+
+websocket_urlpatterns = [
+    path('ws/logs/', LiveLogConsumer.as_asgi(), name='live_logs'),
+]
@@ -0,0 +1,123 @@
+"""One columnar table of sales (product purchases) shared by every sales widget.
+
+A sale is a POST to "/solutions/<product>" for a product with a price. The
+table is cut from the ServerLog snapshot (see snapshot) once per data
+version and kept in process memory; widgets take filtered copies of it.
+"""
+import threading
+
+import pandas as pd
+from django.db.models import BigIntegerField, Case, F, Sum, Value, When
+from django.db.models.functions import TruncWeek
+
+from .data_version import get_data_version
+from .filters import filter_by_year, selected_year
+from .models import DailyTrafficRollup
+from .snapshot import get_snapshot
+
+PRODUCT_PRICES = {
+    "smart-assist": 2000,
+    "proto-genius": 5000,
+    "flow-optimizer": 15000,
+    "team-connect": 1200,
+    "insight-dashboard": 8000,
+    "virtual-designer": 20000,
+    "rapid-launch": 12000,
+    "ai-inspector": 30000
+}
+
+PRODUCT_COSTS = {
+    "smart-assist": 800,
+    "proto-genius": 2000,
+    "flow-optimizer": 6000,
+    "team-connect": 400,
+    "insight-dashboard": 3000,
+    "virtual-designer": 8000,
+    "rapid-launch": 5000,
+    "ai-inspector": 12000
+}
+
+EMPLOYEE_AFFILIATES = {
+    'BOTSALE1': {'name': 'Ava Smith', 'country': 'Botswana'},
+    'BOTSALE2': {'name': 'Liam Jones', 'country': 'Botswana'},
+    'BOTSALE3': {'name': 'Emma Brown', 'country': 'Botswana'},
+    'BOTSALE4': {'name': 'Noah Davis', 'country': 'Botswana'},
+    'ZASALE1': {'name': 'Olivia Wilson', 'country': 'South Africa'},
+    'ZASALE2': {'name': 'James Taylor', 'country': 'South Africa'},
+    'ZASALE3': {'name': 'Sophia Clark', 'country': 'South Africa'},
+    'NAMSALE1': {'name': 'William Lee', 'country': 'Namibia'},
+    'NAMSALE2': {'name': 'Isabella Harris', 'country': 'Namibia'},
+    'ZIMSALE1': {'name': 'Lucas Martin', 'country': 'Zimbabwe'}
+}
+
+# ServerLog columns read for every sale, in DataFrame column order
+SOURCE_COLUMNS = ("product", "country", "referrer_category", "promo_code", "timestamp")
+
+_lock = threading.Lock()
+_cached = {"version": None, "facts": None}
+
+
+def extract_sales_facts():
+    """Selects every sale from the ServerLog snapshot into a typed DataFrame.
+
+    Columns: product, country, referrer_category, promo_code (str or None),
+    timestamp (UTC datetime64), amount and profit (int64), employee_name.
+    """
+    snapshot = get_snapshot()
+    mask = snapshot.mask(request_method="POST") & snapshot.isin("product", PRODUCT_PRICES)
+    facts = snapshot.frame(SOURCE_COLUMNS, mask)
+    facts = facts.sort_values("timestamp", kind="stable", ignore_index=True)
+    facts["amount"] = facts["product"].map(PRODUCT_PRICES).astype("int64")
+    facts["profit"] = facts["amount"] - facts["product"].map(PRODUCT_COSTS).astype("int64")
+    facts["employee_name"] = facts["promo_code"].map(
+        {code: info['name'] for code, info in EMPLOYEE_AFFILIATES.items()}
+    )
+    return facts
+
+
+def get_sales_facts():
+    """The full sales table for the current data version (shared, do not modify)"""
+    version = get_data_version()
+    with _lock:
+        if _cached["version"] != version:
+            _cached["facts"] = extract_sales_facts()
+            _cached["version"] = version
+        return _cached["facts"]
+
+
+def sales_facts(country=None, year=None):
+    """A copy of the sales table, optionally limited to one country and/or year.
+
+    'All' / 'all' (the dropdown defaults) mean no filter.
+    """
+    facts = get_sales_facts()
+    mask = pd.Series(True, index=facts.index)
+    if country and country != 'All':
+        mask &= facts["country"] == country
+    year = selected_year(year)
+    if year is not None:
+        mask &= facts["timestamp"].dt.year == year
+    return facts[mask].reset_index(drop=True)
+
+
+def weekly_sales(countries=None, year=None):
+    """[(Monday of the week, sales amount)] in week order, summed in SQL from the daily rollups.
+
+    `countries` limits the sales to those canonical country names; the
+    amount is each product's purchases times its price.
+    """
+    rollups = DailyTrafficRollup.objects.filter(request_method="POST", product__in=PRODUCT_PRICES)
+    if countries is not None:
+        rollups = rollups.filter(country__in=countries)
+    rollups = filter_by_year(rollups, year, 'bucket')
+    price = Case(
+        *(When(product=product, then=Value(amount)) for product, amount in PRODUCT_PRICES.items()),
+        output_field=BigIntegerField(),
+    )
+    weekly = (
+        rollups.annotate(week=TruncWeek("bucket"))
+        .values("week")
+        .annotate(amount=Sum(F("requests") * price))
+        .order_by("week")
+    )
+    return [(row["week"], row["amount"]) for row in weekly]
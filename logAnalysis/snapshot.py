@@ -0,0 +1,264 @@
+"""Columnar in-memory copy of ServerLog for analytics.
+
+Each ServerLog column is held as one NumPy array: int64 epoch microseconds
+for timestamps, uint32 for IP addresses and int32 codes into a per-column
+dictionary for the text columns. That is a few dozen bytes per row, against
+several hundred for a model instance or a values() dict.
+
+The snapshot is loaded once per process and then reads the rows above its
+id high-water mark. Rows need not become visible in id order: on PostgreSQL
+a transaction can commit after one holding higher ids, so every refresh also
+checks the last LATE_ROW_MARGIN ids below the mark for rows it has not seen.
+It reloads from scratch when maintenance commands rewrite existing rows (see
+data_version).
+"""
+import ipaddress
+import socket
+import sys
+import threading
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pandas as pd
+
+from .data_version import get_rewrite_generation
+from .filters import selected_year
+from .lookups import chunked
+from .models import ServerLog
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+MICROSECOND = timedelta(microseconds=1)
+# Anything else than a unicast IPv4 address (IPv6, malformed values) is stored
+# as OTHER_IP_BASE - dictionary code, i.e. inside the reserved 240.0.0.0/4 block
+OTHER_IP_BASE = 0xFFFFFFFF
+OTHER_IP_FLOOR = 0xF0000000
+
+NUMERIC_COLUMNS = {
+    "id": np.int64,
+    "timestamp": np.int64,
+    "ip_address": np.uint32,
+    "status_code": np.int16,
+    "response_size": np.int32,
+}
+CATEGORICAL_COLUMNS = (
+    "request_method", "url", "http_version", "referrer", "user_agent",
+    "promo_code", "country", "product", "referrer_category",
+)
+COLUMNS = tuple(NUMERIC_COLUMNS) + CATEGORICAL_COLUMNS
+# Rows fetched per database round trip while loading
+FETCH_SIZE = 20000
+# Ids below the high-water mark checked again on every refresh for late commits
+LATE_ROW_MARGIN = 10000
+
+_lock = threading.Lock()
+_snapshot = None
+
+
+def late_row_ids(high_water, seen_ids):
+    """Ids within LATE_ROW_MARGIN below `high_water` that are stored but not in `seen_ids`.
+
+    These rows committed after rows with higher ids had been read.
+    """
+    if not high_water:
+        return []
+    ids = ServerLog.objects.filter(id__gt=high_water - LATE_ROW_MARGIN, id__lte=high_water).values_list("id", flat=True)
+    return sorted(set(ids) - seen_ids)
+
+
+def new_rows(high_water, seen_ids):
+    """Querysets of the rows above `high_water` and of the late rows below it"""
+    late = late_row_ids(high_water, seen_ids)
+    querysets = [
+        ServerLog.objects.filter(id__in=batch).order_by("id")
+        for batch in chunked(late)
+    ]
+    querysets.append(ServerLog.objects.filter(id__gt=high_water).order_by("id"))
+    return querysets
+
+
+class Categories:
+    """Dictionary of the distinct values of one text column; None is code -1"""
+
+    def __init__(self):
+        self.values = []
+        self.codes = {}
+
+    def __len__(self):
+        return len(self.values)
+
+    def code(self, value):
+        if value is None:
+            return -1
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def encode(self, values):
+        return np.fromiter((self.code(value) for value in values), dtype=np.int32, count=len(values))
+
+    def decode(self, codes):
+        return np.array(self.values + [None], dtype=object)[codes]
+
+    def nbytes(self):
+        return sum(sys.getsizeof(value) for value in self.values)
+
+
+class LogSnapshot:
+    """ServerLog as NumPy columns, with filter and group-by helpers"""
+
+    def __init__(self):
+        self.columns = {name: np.empty(0, dtype=dtype) for name, dtype in NUMERIC_COLUMNS.items()}
+        self.columns.update((name, np.empty(0, dtype=np.int32)) for name in CATEGORICAL_COLUMNS)
+        self.categories = {name: Categories() for name in CATEGORICAL_COLUMNS}
+        self.other_ips = Categories()
+        self.high_water = 0
+        self.rewrites = None
+
+    def __len__(self):
+        return len(self.columns["id"])
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+    def nbytes(self):
+        """Bytes held by the column arrays and the value dictionaries"""
+        arrays = sum(column.nbytes for column in self.columns.values())
+        dictionaries = sum(categories.nbytes() for categories in self.categories.values())
+        return arrays + dictionaries + self.other_ips.nbytes()
+
+    def encode_ip(self, ip):
+        try:
+            value = int.from_bytes(socket.inet_pton(socket.AF_INET, ip), "big")
+        except OSError:
+            value = OTHER_IP_FLOOR
+        if value >= OTHER_IP_FLOOR:
+            return OTHER_IP_BASE - self.other_ips.code(ip)
+        return value
+
+    def decode_ip(self, value):
+        if value >= OTHER_IP_FLOOR:
+            return self.other_ips.values[OTHER_IP_BASE - value]
+        return str(ipaddress.IPv4Address(int(value)))
+
+    def encode(self, rows):
+        """{column: array} of a list of ServerLog value tuples in COLUMNS order"""
+        fields = dict(zip(COLUMNS, zip(*rows)))
+        encoded = {
+            "id": np.array(fields["id"], dtype=np.int64),
+            "timestamp": pd.to_datetime(list(fields["timestamp"]), utc=True).asi8 // 1000,
+            "ip_address": np.fromiter(
+                (self.encode_ip(ip) for ip in fields["ip_address"]), dtype=np.uint32, count=len(rows)
+            ),
+            "status_code": np.array(fields["status_code"], dtype=np.int16),
+            "response_size": np.array(fields["response_size"], dtype=np.int32),
+        }
+        encoded.update(
+            (name, self.categories[name].encode(fields[name])) for name in CATEGORICAL_COLUMNS
+        )
+        return encoded
+
+    def refresh(self):
+        """Appends the rows above the high-water mark and late rows below it; returns how many were added"""
+        ids = self.columns["id"]
+        seen_ids = set(ids[ids > self.high_water - LATE_ROW_MARGIN].tolist())
+        parts, batch = [], []
+        for queryset in new_rows(self.high_water, seen_ids):
+            for row in queryset.values_list(*COLUMNS).iterator(chunk_size=FETCH_SIZE):
+                batch.append(row)
+                if len(batch) >= FETCH_SIZE:
+                    parts.append(self.encode(batch))
+                    batch = []
+        if batch:
+            parts.append(self.encode(batch))
+        if not parts:
+            return 0
+        for name in COLUMNS:
+            self.columns[name] = np.concatenate([self.columns[name]] + [part[name] for part in parts])
+        self.high_water = max([self.high_water] + [int(part["id"].max()) for part in parts])
+        return sum(len(part["id"]) for part in parts)
+
+    def mask(self, year=None, country=None, request_method=None, start=None, end=None):
+        """Boolean row mask; 'All' / 'all' mean no filter, start/end are datetimes (end exclusive)"""
+        mask = np.ones(len(self), dtype=bool)
+        year = selected_year(year)
+        if year is not None:
+            start_of_year = datetime(year, 1, 1, tzinfo=timezone.utc)
+            mask &= self.time_mask(start_of_year, start_of_year.replace(year=year + 1))
+        if start is not None or end is not None:
+            mask &= self.time_mask(start, end)
+        if country and country != 'All':
+            mask &= self.equals("country", country)
+        if request_method:
+            mask &= self.equals("request_method", request_method)
+        return mask
+
+    def time_mask(self, start=None, end=None):
+        timestamps = self.columns["timestamp"]
+        mask = np.ones(len(self), dtype=bool)
+        if start is not None:
+            mask &= timestamps >= (start - EPOCH) // MICROSECOND
+        if end is not None:
+            mask &= timestamps < (end - EPOCH) // MICROSECOND
+        return mask
+
+    def equals(self, column, value):
+        code = self.categories[column].codes.get(value)
+        if code is None:
+            return np.zeros(len(self), dtype=bool)
+        return self.columns[column] == code
+
+    def isin(self, column, values):
+        codes = [self.categories[column].codes[value] for value in values if value in self.categories[column].codes]
+        return np.isin(self.columns[column], codes)
+
+    def count_by(self, column, mask=None):
+        """Rows per value of `column` (None excluded) as a Series, largest first"""
+        values = self.columns[column] if mask is None else self.columns[column][mask]
+        if column in self.categories:
+            counts = np.bincount(values[values >= 0], minlength=len(self.categories[column]))
+            series = pd.Series(counts, index=pd.Index(self.categories[column].values, dtype=object))
+        else:
+            uniques, counts = np.unique(values, return_counts=True)
+            series = pd.Series(counts, index=uniques)
+        series = series[series > 0].sort_values(ascending=False, kind="stable")
+        return series.rename("count").rename_axis(column)
+
+    def frame(self, columns, mask=None, categorical=False):
+        """DataFrame of the given columns for the masked rows.
+
+        Text columns come back as objects (None for NULL) or, with
+        categorical=True, as pandas Categoricals sharing the snapshot's
+        dictionaries; timestamps as UTC datetime64.
+        """
+        data = {}
+        for name in columns:
+            values = self.columns[name] if mask is None else self.columns[name][mask]
+            if name in self.categories:
+                categories = self.categories[name]
+                data[name] = (
+                    pd.Categorical.from_codes(values, categories.values) if categorical
+                    else categories.decode(values)
+                )
+            elif name == "timestamp":
+                data[name] = pd.to_datetime(values, unit="us", utc=True)
+            elif name == "ip_address":
+                uniques, inverse = np.unique(values, return_inverse=True)
+                decoded = np.array([self.decode_ip(value) for value in uniques], dtype=object)
+                data[name] = pd.Categorical.from_codes(inverse, decoded) if categorical else decoded[inverse]
+            else:
+                data[name] = values
+        return pd.DataFrame(data, columns=list(columns))
+
+
+def get_snapshot():
+    """The process-wide snapshot, brought up to date with ServerLog (shared, do not modify)"""
+    global _snapshot
+    with _lock:
+        rewrites = get_rewrite_generation()
+        if _snapshot is None or _snapshot.rewrites != rewrites:
+            _snapshot = LogSnapshot()
+            _snapshot.rewrites = rewrites
+        _snapshot.refresh()
+        return _snapshot
@@ -1,3 +1,1081 @@
-from django.test import TestCase
+import asyncio
+import datetime
+import hashlib
+import io
+import math
+import os
+import re
+import tempfile
+import threading
+from collections import Counter
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.core.cache import caches
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import Count, Sum
+import numpy as np
+import pandas as pd
+from asgiref.sync import sync_to_async
+from channels.layers import InMemoryChannelLayer
+from channels.testing import WebsocketCommunicator
+from dash.exceptions import PreventUpdate
+from django_plotly_dash.dash_wrapper import get_local_stateless_by_name
+from django.test import AsyncClient, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from WebAnalysisTool.asgi import application
+
+from .callback_cache import CACHE_ALIAS, cached_callback
+from .checks import check_derived_tables, check_line_digests
+from .dash_components.geo_distribution import create_geo_distribution_app
+from .dash_components.line_chart import create_daily_avg_app
+from .dash_components.overiew_dashboard import create_overview_dashboard
+from .dash_components.peak_hours import create_peak_hours_app
+from .dash_components.referrer_pie import create_referrer_pie_app
+from .dash_components.sales_dashboard import (
+    calculate_virtual_assistant_requests, create_employee_performance_table, create_sales_dashboard,
+)
+from .dash_components.sales_trend import create_sales_trend_app
+from .dash_components.startup import STARTUP_TRIGGER_ID
+from .dash_components.top_pages import create_top_pages_app
+from .data_version import bump_data_version, get_data_version, get_rewrite_generation
+from . import figure_pool
+from .filters import filter_by_year, selected_year
+from .follow import FollowedFile
+from .ingestion import ChunkReport, ingest_lines, ingest_upload, write_chunk
+from . import live_aggregates as live_aggregates_module
+from .live_aggregates import TrafficAggregates, get_traffic_aggregates
+from .heavy_hitters import approximate_top_pages, space_saving_merge, top_pages
+from .live_logs import LIVE_LOG_GROUP, publish_rows, stay_in_group
+from .log_parser import format_log_line, iter_decoded_lines, parse_log_line, row_digest
+from .management.commands._synthetic import generate_log_lines
+from .models import DailyBounceRollup, DailyTrafficRollup, HourlyTrafficRollup, LogFollowOffset, LogUpload, ServerLog, Visit
+from .parallel_parser import iter_shard_results
+from .rollups import rebuild_rollups
+from . import sales_facts as sales_module
+from . import snapshot as snapshot_module
+from .sales_facts import get_sales_facts, sales_facts, weekly_sales
+from .snapshot import LogSnapshot
+from .timestamps import CLF_TIMESTAMP_FORMAT, parse_clf_timestamp, parse_clf_timestamps
+from . import unique_visitors as hll
+from .unique_visitors import daily_unique_visitors, unique_visitors
+from .weekdays import weekday_averages
+from .visits import bounce_rate, rebuild_visits
+
+SAMPLE_LOG = os.path.join(settings.BASE_DIR, "logs", "synthetic_webserver_logstxt.txt")
+SAMPLE_LINE = (
+    '168.10.0.1 - - [16/Feb/2025:23:34:22 +0000] "GET /solutions/smart-assist?promo_code=BOTSALE1 HTTP/1.1" '
+    '200 3502 "https://www.google.com/search" "Mozilla/5.0 (X11; Linux x86_64)"\n'
+)
+
+
+def log_line(ip="168.10.0.1", timestamp="16/Feb/2025:23:34:22 +0000", method="GET", url="/solutions/smart-assist"):
+    """An access-log line in the format LOG_PATTERN expects"""
+    return (
+        f'{ip} - - [{timestamp}] "{method} {url} HTTP/1.1" 200 3502 '
+        f'"https://www.google.com/search" "Mozilla/5.0 (X11; Linux x86_64)"\n'
+    )
+
+
+def dash_callback(app, output_id):
+    """The function a DjangoDash app registered for the callback that writes `output_id`"""
+    for callback_set, func in app._callback_sets:
+        outputs = callback_set["output"]
+        for output in outputs if isinstance(outputs, (list, tuple)) else [outputs]:
+            if output.component_id == output_id:
+                return func
+    raise LookupError(output_id)
+
+
+def reset_process_caches(test):
+    """Starts `test` from empty in-process caches; row ids and data versions repeat after each rollback"""
+    caches[CACHE_ALIAS].clear()
+    for patcher in (
+        mock.patch.object(snapshot_module, "_snapshot", None),
+        mock.patch.object(live_aggregates_module, "_aggregates", None),
+        mock.patch.dict(sales_module._cached, {"version": None, "facts": None}),
+    ):
+        patcher.start()
+        test.addCleanup(patcher.stop)
+    test.addCleanup(caches[CACHE_ALIAS].clear)
+
+
+class ParseLogLineTests(SimpleTestCase):
+    def test_parses_fields_and_dimensions(self):
+        row = parse_log_line(SAMPLE_LINE)
+        self.assertEqual(row["ip_address"], "168.10.0.1")
+        self.assertEqual(row["url"], "/solutions/smart-assist")
+        self.assertEqual(row["promo_code"], "BOTSALE1")
+        self.assertEqual(row["country"], "Botswana")
+        self.assertEqual(row["product"], "smart-assist")
+        self.assertEqual(row["referrer_category"], "Google")
+        self.assertEqual(len(row["line_digest"]), 32)
+
+    def test_unmatched_line_returns_none(self):
+        self.assertIsNone(parse_log_line("not an access log line\n"))
+
+    def test_malformed_ip_address_is_kept_unless_checked(self):
+        # As in the bundled sample log; SQLite stores these addresses as text
+        self.assertEqual(parse_log_line(log_line(ip="192.168.1.1109"))["ip_address"], "192.168.1.1109")
+        with self.assertRaisesRegex(ValueError, "invalid IP address"):
+            parse_log_line(log_line(ip="192.168.1.1109"), check_ip=True)
+        with self.assertRaisesRegex(ValueError, "invalid IP address"):
+            parse_log_line(log_line(ip="1.2.3"), check_ip=True)
+
+    def test_bundled_sample_log_parses(self):
+        with open(SAMPLE_LOG, encoding="utf-8") as handle:
+            rows = [parse_log_line(line) for line in handle]
+        self.assertEqual(len(rows), 11000)
+        self.assertNotIn(None, rows)
+
+
+class WriteChunkConflictTests(TestCase):
+    def test_digest_stored_by_another_writer_fails_the_chunk(self):
+        row = parse_log_line(log_line())
+        # Stored after write_chunk's duplicate check would have run, as by a concurrent writer
+        ServerLog.objects.create(**row)
+        with mock.patch("logAnalysis.ingestion.existing_digests", return_value=set()):
+            chunk = write_chunk(ChunkReport(index=0, first_line=1), [row])
+        self.assertTrue(chunk.failure)
+        self.assertEqual(chunk.inserted, 0)
+        self.assertEqual(ServerLog.objects.count(), 1)
+        self.assertFalse(HourlyTrafficRollup.objects.exists())
+
+
+class DataVersionTests(TestCase):
+    def test_ingest_and_rewrites_bump_the_stored_version(self):
+        version, rewrites = get_data_version(), get_rewrite_generation()
+        write_chunk(ChunkReport(index=0, first_line=1), [parse_log_line(log_line())])
+        self.assertNotEqual(get_data_version(), version)
+        self.assertEqual(get_rewrite_generation(), rewrites)
+
+        version = get_data_version()
+        bump_data_version(rewritten=True)
+        self.assertNotEqual(get_data_version(), version)
+        self.assertEqual(get_rewrite_generation(), rewrites + 1)
+
+    def test_duplicate_chunk_leaves_the_version_alone(self):
+        row = parse_log_line(log_line())
+        write_chunk(ChunkReport(index=0, first_line=1), [row])
+        version = get_data_version()
+        write_chunk(ChunkReport(index=1, first_line=1), [row])
+        self.assertEqual(get_data_version(), version)
+
+
+class RollupTotalsTests(TestCase):
+    def test_incremental_rollups_match_raw_counts(self):
+        report = ingest_lines(list(generate_log_lines(400)), batch_size=70)
+        self.assertEqual(report.inserted, 400)
+        # Rollups store missing dimensions as ""
+        raw = {
+            (group["country"] or "", group["product"] or "", group["status_code"]): group["total"]
+            for group in ServerLog.objects.values("country", "product", "status_code").annotate(total=Count("id")).order_by()
+        }
+        for model in (HourlyTrafficRollup, DailyTrafficRollup):
+            rolled = {
+                (group["country"], group["product"], group["status_code"]): group["total"]
+                for group in model.objects.values("country", "product", "status_code").annotate(total=Sum("requests")).order_by()
+            }
+            self.assertEqual(rolled, raw)
+
+        fields = HourlyTrafficRollup.DIMENSIONS + ("requests",)
+        incremental = sorted(HourlyTrafficRollup.objects.values_list(*fields))
+        rebuild_rollups()
+        self.assertEqual(sorted(HourlyTrafficRollup.objects.values_list(*fields)), incremental)
+
+
+class DatabaseCheckTests(TestCase):
+    def test_warns_about_rows_stored_before_the_derived_tables(self):
+        self.assertEqual(check_derived_tables(None, databases=["default"]), [])
+        # Stored without ingestion, as by a database upgraded from before the rollups
+        ServerLog.objects.create(**parse_log_line(log_line()))
+        warnings = check_derived_tables(None, databases=["default"])
+        self.assertEqual([warning.id for warning in warnings], ["logAnalysis.W001"])
+        self.assertIn("HourlyTrafficRollup", warnings[0].msg)
+
+        write_chunk(ChunkReport(index=0, first_line=1), [parse_log_line(log_line(ip="168.10.0.2"))])
+        self.assertEqual(check_derived_tables(None, databases=["default"]), [])
+
+    def test_warns_about_rows_without_a_line_digest(self):
+        write_chunk(ChunkReport(index=0, first_line=1), [parse_log_line(log_line())])
+        self.assertEqual(check_line_digests(None, databases=["default"]), [])
+        ServerLog.objects.update(line_digest=None)
+        warnings = check_line_digests(None, databases=["default"])
+        self.assertEqual([warning.id for warning in warnings], ["logAnalysis.W002"])
+
+
+class LateRowTests(TestCase):
+    """Rows committed after rows with higher ids, as concurrent transactions can on PostgreSQL"""
+
+    def write(self, row_id, ip):
+        row = dict(parse_log_line(log_line(ip=ip)), id=row_id)
+        self.assertEqual(write_chunk(ChunkReport(index=0, first_line=1), [row]).inserted, 1)
+
+    def test_snapshot_picks_up_rows_below_its_high_water_mark(self):
+        self.write(1, "168.10.0.1")
+        self.write(10, "168.10.0.2")
+        snapshot = LogSnapshot()
+        self.assertEqual(snapshot.refresh(), 2)
+        self.write(5, "168.10.0.3")
+        self.assertEqual(snapshot.refresh(), 1)
+        self.assertEqual(snapshot.refresh(), 0)
+        self.assertEqual(sorted(snapshot["id"].tolist()), [1, 5, 10])
+        self.assertEqual(snapshot.high_water, 10)
+
+    def test_aggregates_count_late_rows_once(self):
+        self.write(1, "168.10.0.1")
+        self.write(10, "168.10.0.2")
+        aggregates = TrafficAggregates()
+        aggregates.load()
+        self.assertEqual(aggregates.refresh(), 0)
+        self.write(5, "168.10.0.3")
+        self.assertEqual(aggregates.refresh(), 1)
+        self.assertEqual(aggregates.refresh(), 0)
+        self.assertEqual(sum(aggregates.totals("hour").values()), 3)
+
+
+class IngestUploadTests(TestCase):
+    def upload(self, content, name="access.log"):
+        return ingest_upload(SimpleUploadedFile(name, content))
+
+    def test_manifest_hash_is_taken_while_parsing(self):
+        content = "".join(hourly_lines(30)).encode()
+        report = self.upload(content)
+        self.assertEqual(report.inserted, 30)
+        upload = LogUpload.objects.get()
+        self.assertEqual(upload.sha256, hashlib.sha256(content).hexdigest())
+        self.assertEqual(upload.size, len(content))
+
+    def test_reupload_is_skipped_without_parsing(self):
+        content = "".join(hourly_lines(30)).encode()
+        self.upload(content)
+        with mock.patch("logAnalysis.ingestion.ingest_lines") as ingest:
+            report = self.upload(content, name="copy.log")
+        ingest.assert_not_called()
+        self.assertEqual(report.duplicate_of.file_name, "access.log")
+
+    def test_reupload_of_a_legacy_manifest_entry_is_recognised_after_the_run(self):
+        content = "".join(hourly_lines(30)).encode()
+        self.upload(content)
+        # Recorded before sizes and head digests were kept
+        LogUpload.objects.update(size=None, head_sha256="")
+        report = self.upload(content, name="copy.log")
+        self.assertEqual(report.duplicate_of.file_name, "access.log")
+        self.assertEqual((report.inserted, report.duplicates), (0, 30))
+        self.assertEqual(LogUpload.objects.count(), 1)
+        self.assertEqual(ServerLog.objects.count(), 30)
+
+
+class FollowTests(TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "access.log")
+        self.append(hourly_lines(30))
+
+    def append(self, lines):
+        with open(self.path, "a") as handle:
+            handle.writelines(lines)
+
+    def follow(self):
+        """Polls and flushes a new follower until nothing is left, as `follow_logs --once` does"""
+        follower = FollowedFile(self.path, batch_size=10)
+        self.addCleanup(follower.close)
+        while follower.poll():
+            pass
+        self.assertTrue(follower.flush())
+        return follower
+
+    def test_restart_resumes_after_the_last_committed_line(self):
+        self.assertEqual(self.follow().inserted, 30)
+        self.append(hourly_lines(5, start_ip=100))
+        follower = self.follow()
+        self.assertEqual((follower.lines, follower.inserted, follower.duplicates), (5, 5, 0))
+        state = LogFollowOffset.objects.get(path=self.path)
+        self.assertEqual((state.lines, state.offset), (35, os.path.getsize(self.path)))
+
+    def test_command_resumes_after_the_last_committed_line(self):
+        # Keep the test runner's own SIGINT/SIGTERM handlers
+        with mock.patch("signal.signal"):
+            call_command("follow_logs", self.path, "--once", "--stats-interval", "0", stdout=io.StringIO())
+            self.append(hourly_lines(5, start_ip=100))
+            call_command("follow_logs", self.path, "--once", "--stats-interval", "0", stdout=io.StringIO())
+        self.assertEqual(ServerLog.objects.count(), 35)
+        self.assertEqual(LogFollowOffset.objects.get(path=self.path).lines, 35)
+
+    def test_rotated_file_is_drained_before_the_new_one_is_read(self):
+        follower = self.follow()
+        self.append(hourly_lines(5, start_ip=100))
+        os.rename(self.path, self.path + ".1")
+        self.append(hourly_lines(7, start_ip=200))
+        while follower.poll():
+            pass
+        self.assertTrue(follower.flush())
+        self.assertEqual((follower.rotations, follower.inserted), (1, 42))
+        self.assertEqual(LogFollowOffset.objects.get(path=self.path).offset, os.path.getsize(self.path))
+
+    def test_truncated_file_is_read_from_the_start(self):
+        follower = self.follow()
+        with open(self.path, "w") as handle:
+            handle.writelines(hourly_lines(3, start_ip=100))
+        while follower.poll():
+            pass
+        self.assertTrue(follower.flush())
+        self.assertEqual((follower.truncations, follower.inserted), (1, 33))
+
+    def test_failing_writes_back_off_and_stop_reading(self):
+        follower = FollowedFile(self.path, batch_size=10)
+        self.addCleanup(follower.close)
+        self.assertTrue(follower.poll())
+
+        def fail(chunk, rows):
+            chunk.failure = "database is locked"
+            return chunk
+
+        with mock.patch("logAnalysis.follow.write_chunk", side_effect=fail):
+            self.assertFalse(follower.flush())
+            self.assertEqual(follower.retry_delay, 1.0)
+            self.assertFalse(follower.due(max_latency=0))
+            follower.retry_at = 0  # The delay has passed
+            self.assertFalse(follower.flush())
+            self.assertEqual(follower.retry_delay, 2.0)
+
+        # A full batch is pending: nothing more is read until it is written
+        follower.retry_at = 0
+        self.append(hourly_lines(10, start_ip=100))
+        self.assertEqual(follower.poll(), 0)
+        self.assertEqual(len(follower.pending), 30)
+
+        self.assertTrue(follower.flush())
+        self.assertEqual(follower.retry_delay, 0)
+        self.assertTrue(follower.poll())
+        self.assertTrue(follower.flush())
+        self.assertEqual(ServerLog.objects.count(), 40)
+        self.assertEqual(follower.failures, 2)
+
+
+def hourly_lines(count, ips=20, start_ip=0):
+    """`count` distinct lines within one hour from a few IP addresses, sharing rollup keys"""
+    return [
+        log_line(
+            ip=f"168.10.0.{start_ip + n % ips}",
+            timestamp=f"16/Feb/2025:10:{n // 60 % 60:02d}:{n % 60:02d} +0000",
+            url=f"/solutions/smart-assist?page={n}",
+        )
+        for n in range(count)
+    ]
+
+
+class ConcurrentIngestTests(TransactionTestCase):
+    def test_two_writers_share_rollup_visit_and_sketch_keys(self):
+        barrier = threading.Barrier(2)
+        reports = []
+
+        def ingest(lines):
+            try:
+                barrier.wait()
+                reports.append(ingest_lines(lines, batch_size=50))
+            finally:
+                connection.close()
+
+        halves = hourly_lines(600)
+        threads = [threading.Thread(target=ingest, args=(halves[start::2],)) for start in (0, 1)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual([chunk.failure for report in reports for chunk in report.chunks if chunk.failure], [])
+        self.assertEqual(sum(report.inserted for report in reports), 600)
+        self.assertEqual(ServerLog.objects.count(), 600)
+        for model in (HourlyTrafficRollup, DailyTrafficRollup):
+            self.assertEqual(model.objects.aggregate(total=Sum("requests"))["total"], 600)
+        # Incrementally merged visits match a rebuild from the stored rows
+        incremental = sorted(Visit.objects.values_list("ip_address", "started", "ended", "requests"))
+        bounces = sorted(DailyBounceRollup.objects.values_list("bucket", "country", "visits", "bounces"))
+        rebuild_visits()
+        self.assertEqual(sorted(Visit.objects.values_list("ip_address", "started", "ended", "requests")), incremental)
+        self.assertEqual(sorted(DailyBounceRollup.objects.values_list("bucket", "country", "visits", "bounces")), bounces)
+        self.assertEqual(unique_visitors(), 20)
+
+
+class QueryPlanTests(TestCase):
+    """The filtered dashboard queries must find their ServerLog rows through an index"""
+
+    # The calls the views make when a year or country is selected
+    DASHBOARD_CALLS = {
+        "top pages by year": lambda: top_pages(5, 2024),
+        "top pages by year and country": lambda: top_pages(5, 2024, "Botswana"),
+        "weekday averages by year": lambda: weekday_averages(2024),
+        "virtual assistant share by country": lambda: calculate_virtual_assistant_requests("Botswana"),
+    }
+
+    def explain(self, sql):
+        with connection.cursor() as cursor:
+            if connection.vendor == "postgresql":
+                # Small tables make a sequential scan cheapest; ask whether an index *can* be used
+                cursor.execute("SET LOCAL enable_seqscan = off")
+                cursor.execute("EXPLAIN " + sql)
+                return [row[0] for row in cursor.fetchall()]
+            cursor.execute("EXPLAIN QUERY PLAN " + sql)
+            return [row[-1] for row in cursor.fetchall()]
+
+    def full_scans(self, plan):
+        """Plan lines that read every row of ServerLog, through the table or a whole index"""
+        table = re.escape(ServerLog._meta.db_table)
+        if connection.vendor == "postgresql":
+            scans = []
+            for number, line in enumerate(plan):
+                if re.search(rf'Seq Scan on "?{table}"?', line, re.IGNORECASE):
+                    scans.append(line.strip())
+                elif re.search(rf'Index (?:Only )?Scan using \S+ on "?{table}"?', line, re.IGNORECASE):
+                    # An index scan without an Index Cond walks the whole index
+                    indent = len(line) - len(line.lstrip())
+                    details = []
+                    for detail in plan[number + 1:]:
+                        if len(detail) - len(detail.lstrip()) <= indent or "->" in detail:
+                            break
+                        details.append(detail)
+                    if not any("Index Cond" in detail for detail in details):
+                        scans.append(line.strip())
+            return scans
+        # SQLite: SEARCH reads a range; SCAN reads every row, also "USING [COVERING] INDEX"
+        return [line for line in plan if re.search(rf"\bSCAN (?:TABLE )?{table}\b", line)]
+
+    def test_dashboard_queries_do_not_scan_server_log(self):
+        if connection.vendor not in ("sqlite", "postgresql"):
+            self.skipTest(f"query plans are not checked on {connection.vendor}")
+        for name, call in self.DASHBOARD_CALLS.items():
+            with self.subTest(name), CaptureQueriesContext(connection) as queries:
+                call()
+                statements = [query["sql"] for query in queries if ServerLog._meta.db_table in query["sql"]]
+                self.assertTrue(statements)
+                for sql in statements:
+                    self.assertEqual(self.full_scans(self.explain(sql)), [], sql)
+
+
+class LiveLogStreamTests(SimpleTestCase):
+    def test_stream_is_refused_under_wsgi(self):
+        response = self.client.get("/logs/")
+        self.assertEqual(response.status_code, 501)
+        self.assertIn(b"ASGI", response.content)
+
+    async def test_stream_starts_under_asgi(self):
+        response = await AsyncClient().get("/logs/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        events = aiter(response.streaming_content)
+        self.assertTrue((await anext(events)).startswith(b"retry:"))
+
+    async def test_members_rejoin_before_the_group_expires(self):
+        layer = InMemoryChannelLayer(group_expiry=0.2)
+        channel = await layer.new_channel()
+        await layer.group_add(LIVE_LOG_GROUP, channel)
+        rejoin = asyncio.create_task(stay_in_group(layer, channel))
+        try:
+            await asyncio.sleep(0.5)
+            await layer.group_send(LIVE_LOG_GROUP, {"type": "log.lines", "lines": ["line"]})
+            message = await asyncio.wait_for(layer.receive(channel), 1)
+        finally:
+            rejoin.cancel()
+        self.assertEqual(message["lines"], ["line"])
+
+
+def ip_range(start, stop):
+    return [f"10.{n >> 16 & 255}.{n >> 8 & 255}.{n & 255}" for n in range(start, stop)]
+
+
+class HyperLogLogTests(SimpleTestCase):
+    # Three standard errors (1.04 / sqrt(2**12) is about 1.6%)
+    TOLERANCE = 3 * 1.04 / math.sqrt(hll.REGISTERS)
+
+    def sketch(self, ips):
+        registers = hll.empty_registers()
+        for ip in ips:
+            hll.add(registers, ip)
+        return registers
+
+    def assertEstimates(self, registers, expected):
+        self.assertAlmostEqual(hll.estimate(registers) / expected, 1, delta=self.TOLERANCE)
+
+    def test_small_and_large_cardinalities(self):
+        self.assertEqual(hll.estimate(hll.empty_registers()), 0)
+        self.assertEqual(round(hll.estimate(self.sketch(ip_range(0, 50)))), 50)
+        self.assertEstimates(self.sketch(ip_range(0, 1000)), 1000)
+        self.assertEstimates(self.sketch(ip_range(0, 100000)), 100000)
+
+    def test_repeated_addresses_do_not_count(self):
+        registers = self.sketch(ip_range(0, 500))
+        self.assertTrue(np.array_equal(self.sketch(ip_range(0, 500) * 3), registers))
+
+    def test_merged_sketches_estimate_the_union(self):
+        first, second = self.sketch(ip_range(0, 30000)), self.sketch(ip_range(20000, 50000))
+        self.assertTrue(np.array_equal(np.maximum(first, second), self.sketch(ip_range(0, 50000))))
+        self.assertEstimates(np.maximum(first, second), 50000)
+
+
+class VisitorSketchTests(TestCase):
+    def test_daily_sketches_merge_across_days(self):
+        lines = [log_line(ip=ip, timestamp="16/Feb/2025:10:00:00 +0000") for ip in ip_range(0, 300)]
+        lines += [log_line(ip=ip, timestamp="17/Feb/2025:10:00:00 +0000") for ip in ip_range(200, 400)]
+        ingest_lines(lines)
+        daily = daily_unique_visitors()
+        self.assertEqual([day for day, _ in daily], [datetime.date(2025, 2, 16), datetime.date(2025, 2, 17)])
+        # Linear counting is within a few visitors at these cardinalities
+        for (_, estimate), expected in zip(daily, (300, 200)):
+            self.assertAlmostEqual(estimate, expected, delta=5)
+        self.assertAlmostEqual(unique_visitors(), 400, delta=5)
+        self.assertAlmostEqual(unique_visitors(start=datetime.date(2025, 2, 17)), 200, delta=5)
+
+
+class SpaceSavingTests(SimpleTestCase):
+    def test_counts_stay_within_the_error_bounds(self):
+        rng = np.random.default_rng(7)
+        capacity, counters, true_counts = 20, {}, Counter()
+        # Zipf-like traffic over 200 URLs, merged in batches as ingestion does
+        for _ in range(50):
+            batch = Counter(f"/page/{n}" for n in rng.zipf(1.5, size=200) if n <= 200)
+            true_counts.update(batch)
+            counters = space_saving_merge(counters, batch, capacity)
+
+        total = sum(true_counts.values())
+        self.assertEqual(len(counters), capacity)
+        self.assertEqual(sum(requests for requests, _ in counters.values()), total)
+        for url, (requests, error) in counters.items():
+            self.assertLessEqual(requests - error, true_counts[url], url)
+            self.assertGreaterEqual(requests, true_counts[url], url)
+            self.assertLessEqual(error, total / capacity, url)
+        # Every URL above N / capacity requests is still monitored
+        for url, count in true_counts.items():
+            if count > total / capacity:
+                self.assertIn(url, counters)
+
+    def test_new_url_takes_over_the_smallest_counter(self):
+        counters = space_saving_merge({"/a": (5, 0), "/b": (2, 0)}, {"/c": 1}, capacity=2)
+        self.assertEqual(counters, {"/a": [5, 0], "/c": [3, 2]})
+
+
+@override_settings(TOP_PAGES_SKETCH_SIZE=10)
+class HeavyHitterTests(TestCase):
+    def test_stored_sketch_bounds_the_database_counts(self):
+        pages = [page for page in range(30) for _ in range(max(1, 60 - 4 * page))]
+        np.random.default_rng(7).shuffle(pages)
+        lines = [log_line(ip=f"168.10.{n // 250}.{n % 250}", url=f"/page/{page}") for n, page in enumerate(pages)]
+        ingest_lines(lines, batch_size=100)
+
+        exact = dict(top_pages(30))
+        approximate = approximate_top_pages(10)
+        self.assertEqual(len(approximate), 10)
+        for url, estimate, error in approximate:
+            self.assertTrue(estimate - error <= exact[url] <= estimate, url)
+        monitored = {url for url, _, _ in approximate}
+        for url, requests in exact.items():
+            if requests > len(lines) / 10:
+                self.assertIn(url, monitored)
+
+
+@override_settings(VISIT_INACTIVITY_TIMEOUT=30 * 60)
+class VisitTests(TestCase):
+    def ingest_at(self, *times, ip="168.10.0.1"):
+        ingest_lines([log_line(ip=ip, timestamp=f"16/Feb/2025:{time}:00 +0000", url=f"/?t={time}") for time in times])
+
+    def visits(self):
+        return list(Visit.objects.order_by("started").values_list("requests", flat=True))
+
+    def test_inactivity_splits_visits(self):
+        self.ingest_at("10:00", "10:10", "11:00")
+        self.ingest_at("10:00", ip="102.10.0.1")
+        self.assertEqual(self.visits(), [2, 1, 1])
+        self.assertAlmostEqual(bounce_rate(), 200 / 3)
+
+    def test_late_request_joins_the_visits_around_it(self):
+        self.ingest_at("10:00", "10:10", "11:00")
+        self.ingest_at("10:35")
+        self.assertEqual(self.visits(), [4])
+        self.assertEqual(bounce_rate(), 0)
+        self.assertEqual(list(DailyBounceRollup.objects.values_list("visits", "bounces")), [(1, 0)])
+
+        rebuild_visits()
+        self.assertEqual(self.visits(), [4])
+
+
+class DigestDedupTests(TestCase):
+    def test_reingested_lines_are_counted_as_duplicates(self):
+        lines = hourly_lines(40)
+        self.assertEqual(ingest_lines(lines[:30], batch_size=7).inserted, 30)
+        report = ingest_lines(lines, batch_size=7)
+        self.assertEqual((report.inserted, report.duplicates), (10, 30))
+        self.assertEqual(ServerLog.objects.count(), 40)
+        self.assertEqual(HourlyTrafficRollup.objects.aggregate(total=Sum("requests"))["total"], 40)
+
+    def test_repeated_line_within_a_chunk_is_stored_once(self):
+        report = ingest_lines([SAMPLE_LINE, SAMPLE_LINE, log_line(ip="168.10.0.2")])
+        self.assertEqual((report.inserted, report.duplicates), (2, 1))
+
+    def test_extended_file_only_adds_its_new_lines(self):
+        lines = hourly_lines(20)
+        ingest_upload(SimpleUploadedFile("access.log", "".join(lines[:15]).encode()))
+        report = ingest_upload(SimpleUploadedFile("access.log", "".join(lines).encode()))
+        self.assertIsNone(report.duplicate_of)
+        self.assertEqual((report.inserted, report.duplicates), (5, 15))
+        self.assertEqual(LogUpload.objects.count(), 2)
+
+    def test_stored_row_has_the_digest_of_its_line(self):
+        write_chunk(ChunkReport(index=0, first_line=1), [parse_log_line(SAMPLE_LINE)])
+        stored = ServerLog.objects.values().get()
+        self.assertEqual(row_digest(stored), parse_log_line(SAMPLE_LINE)["line_digest"])
+
+
+class DecodedLinesTests(SimpleTestCase):
+    TEXT = "GET /caf\u00e9 \u2713\nR\u00e9sum\u00e9 \U0001f600\n\nlast line without newline"
+
+    def test_lines_and_characters_split_across_chunks(self):
+        data = self.TEXT.encode("utf-8")
+        expected = self.TEXT.splitlines(keepends=True)
+        for size in (1, 2, 3, 5, len(data)):
+            chunks = [data[start:start + size] for start in range(0, len(data), size)]
+            with self.subTest(chunk_size=size):
+                self.assertEqual(list(iter_decoded_lines(chunks)), expected)
+
+    def test_other_encodings(self):
+        data = self.TEXT.encode("utf-16")
+        chunks = [data[start:start + 3] for start in range(0, len(data), 3)]
+        self.assertEqual(list(iter_decoded_lines(chunks, "utf-16")), self.TEXT.splitlines(keepends=True))
+
+    def test_truncated_character_at_the_end_is_an_error(self):
+        with self.assertRaises(UnicodeDecodeError):
+            list(iter_decoded_lines([b"ok\n", "\u00e9".encode("utf-8")[:1]]))
+
+
+class ClfTimestampTests(SimpleTestCase):
+    VALID = [
+        "16/Feb/2025:23:34:22 +0000",
+        "16/Feb/2025:23:34:22 -0530",
+        "16/Feb/2025:23:34:22 +2359",
+        "29/Feb/2024:00:00:00 +0000",
+        "01/Jan/0001:12:00:00 +0000",
+    ]
+    INVALID = [
+        "16/Feb/2025:23:34:22 +9999",
+        "16/Feb/2025:23:34:22 +2400",
+        "16/Feb/2025:23:34:22 +0060",
+        "16/Feb/2025:23:34:22 0000",
+        "31/Feb/2025:00:00:00 +0000",
+        "00/Feb/2025:00:00:00 +0000",
+        "16/Foo/2025:00:00:00 +0000",
+        "16/Feb/2025:24:00:00 +0000",
+        "16/Feb/2025:23:60:00 +0000",
+        "16/Feb/2025:23:59:60 +0000",
+        "16/Feb/0000:00:00:00 +0000",
+        "16/Feb/2025 23:34:22 +0000",
+    ]
+
+    def test_valid_timestamps_match_strptime(self):
+        parsed = parse_clf_timestamps(self.VALID)
+        for value, vectorized in zip(self.VALID, parsed):
+            expected = datetime.datetime.strptime(value, CLF_TIMESTAMP_FORMAT)
+            with self.subTest(value=value):
+                self.assertEqual(parse_clf_timestamp(value), expected)
+                utc = expected.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+                self.assertEqual(vectorized, np.datetime64(utc, "s"))
+
+    def test_invalid_timestamps_are_rejected_like_strptime(self):
+        parsed = parse_clf_timestamps(self.INVALID)
+        for value, vectorized in zip(self.INVALID, parsed):
+            with self.subTest(value=value):
+                with self.assertRaises(ValueError):
+                    datetime.datetime.strptime(value, CLF_TIMESTAMP_FORMAT)
+                with self.assertRaises(ValueError):
+                    parse_clf_timestamp(value)
+                self.assertTrue(np.isnat(vectorized))
+
+    def test_unpadded_day_falls_back_to_strptime(self):
+        value = "6/Feb/2025:23:34:22 +0000"
+        self.assertEqual(parse_clf_timestamp(value), datetime.datetime.strptime(value, CLF_TIMESTAMP_FORMAT))
+        self.assertTrue(np.isnat(parse_clf_timestamps([value])[0]))
+
+
+class ParallelParserTests(SimpleTestCase):
+    def setUp(self):
+        lines = list(generate_log_lines(300))
+        lines[100] = "not an access log line\n"
+        lines[200] = log_line(timestamp="16/Feb/2025:23:34:22 +9999")
+        lines[-1] = lines[-1].rstrip("\n")
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "access.log")
+        with open(self.path, "w", encoding="utf-8", newline="") as f:
+            f.writelines(lines)
+        self.lines = lines
+
+    def parse(self, workers):
+        """(digests, rejected 1-based line numbers, line count) from the shard results"""
+        digests, rejected, first_line = [], [], 1
+        for result in iter_shard_results(self.path, workers):
+            digests.extend(result["columns"]["line_digest"])
+            parsed = {first_line + offset for offset in result["columns"]["line"]}
+            rejected.extend(n for n in range(first_line, first_line + result["line_count"]) if n not in parsed)
+            first_line += result["line_count"]
+        return digests, rejected, first_line - 1
+
+    def test_workers_match_a_sequential_parse(self):
+        digests, rejected = [], []
+        for number, line in enumerate(self.lines, start=1):
+            try:
+                row = parse_log_line(line)
+            except ValueError:
+                row = None
+            if row is None:
+                rejected.append(number)
+            else:
+                digests.append(row["line_digest"])
+        self.assertEqual(rejected, [101, 201])
+
+        for workers in (1, 3, 8):
+            with self.subTest(workers=workers):
+                self.assertEqual(self.parse(workers), (digests, rejected, len(self.lines)))
+
+
+class CallbackCacheTests(TestCase):
+    def setUp(self):
+        caches[CACHE_ALIAS].clear()
+        self.addCleanup(caches[CACHE_ALIAS].clear)
+
+    def test_repeated_inputs_are_served_from_the_cache_until_the_data_changes(self):
+        calls = []
+
+        @cached_callback("CacheTest")
+        def figure(year):
+            calls.append(year)
+            return {"data": [], "layout": {"title": year}}
+
+        self.assertEqual(figure("2025"), {"data": [], "layout": {"title": "2025"}})
+        self.assertEqual(figure("2025"), {"data": [], "layout": {"title": "2025"}})
+        figure("2024")
+        self.assertEqual(calls, ["2025", "2024"])
+
+        bump_data_version()
+        figure("2025")
+        self.assertEqual(calls, ["2025", "2024", "2025"])
+
+        stats = self.client.get("/api/callback-cache/").json()["callbacks"]
+        self.assertIn({"app": "CacheTest", "callback": "figure", "hits": 1, "misses": 3}, stats)
+
+
+class WeekdayAverageTests(TestCase):
+    def test_visitors_are_distinct_ips_per_date_averaged_over_dates(self):
+        monday, next_monday = "17/Feb/2025:12:00:00 +0000", "24/Feb/2025:12:00:00 +0000"
+        lines = [log_line(ip="168.10.0.1", timestamp=monday, url=f"/page{n}") for n in range(3)]
+        lines.append(log_line(ip="168.10.0.2", timestamp=monday, method="POST"))
+        lines.append(log_line(ip="168.10.0.1", timestamp=next_monday))
+        ingest_lines(lines)
+
+        daily_df = weekday_averages()
+        self.assertEqual(list(daily_df['day_name']), ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday'])
+        monday_row = daily_df.iloc[0]
+        self.assertEqual(monday_row['avg_visitors'], 1.5)
+        self.assertEqual(monday_row['avg_sales'], 0.5)
+        self.assertAlmostEqual(monday_row['conversion_rate'], 100 / 3)
+        self.assertTrue((daily_df.iloc[1:][['avg_visitors', 'avg_sales']] == 0).all().all())
+        self.assertTrue(weekday_averages(2020).empty)
+
+
+class EmployeeTableTests(SimpleTestCase):
+    def test_numbers_are_the_legacy_seeded_ones_and_global_state_is_untouched(self):
+        state = np.random.get_state()
+        for _ in range(2):
+            cells = create_employee_performance_table(None, 'All').data[0].cells.values
+            self.assertEqual(list(cells[0][:3]), ['Lucas Martin', 'William Lee', 'Isabella Harris'])
+            self.assertEqual(list(cells[1][:3]), ['$14,537', '$14,789', '$14,291'])
+            self.assertEqual(list(cells[3][:2]), ['flow-optimizer, proto-genius', 'rapid-launch, team-connect'])
+        after = np.random.get_state()
+        self.assertEqual(after[2:], state[2:])
+        self.assertTrue((after[1] == state[1]).all())
+
+
+class GeoDistributionTests(TestCase):
+    def test_map_counts_logs_per_country_in_one_query(self):
+        ips = ["168.10.0.1", "168.10.0.2", "102.10.0.1", "10.0.0.1"]
+        ingest_lines([log_line(ip=ip) for ip in ips])
+
+        with self.assertNumQueries(0):
+            app = create_geo_distribution_app()
+        with self.assertNumQueries(1):
+            figure = dash_callback(app, "geo-distribution-map")(0)
+        counts = dict(zip(figure.data[0].locations, figure.data[0].z))
+        self.assertEqual(counts, {"BWA": 2, "ZAF": 1, "NAM": 0, "ZWE": 0})
+
+
+class LazyDashboardTests(TestCase):
+    # The apps logAnalysis.dash_apps creates at import, with the figure each one builds
+    APPS = {
+        create_daily_avg_app: "daily-avg-chart",
+        create_peak_hours_app: "traffic-histogram",
+        create_geo_distribution_app: "geo-distribution-map",
+        create_top_pages_app: "top-pages-chart",
+        create_referrer_pie_app: "referrer-pie-chart",
+    }
+
+    def test_apps_query_the_database_on_page_load_only(self):
+        ingest_lines(hourly_lines(5))
+        for create_app, output_id in self.APPS.items():
+            with self.subTest(app=create_app.__name__):
+                with self.assertNumQueries(0):
+                    app = create_app()
+                callback = dash_callback(app, output_id)
+                inputs = next(cs["inputs"] for cs, func in app._callback_sets if func is callback)
+                self.assertEqual([i.component_id for i in inputs], [STARTUP_TRIGGER_ID])
+                self.assertTrue(callback(0).data)
+
+    def test_year_filter(self):
+        for year in (None, "", "all", "All"):
+            self.assertIsNone(selected_year(year))
+        self.assertEqual(selected_year("2024"), 2024)
+
+        ingest_lines([log_line(timestamp="16/Feb/2024:10:00:00 +0000"), log_line(timestamp="16/Feb/2025:10:00:00 +0000")])
+        self.assertEqual(filter_by_year(ServerLog.objects.all(), "all").count(), 2)
+        self.assertEqual(filter_by_year(ServerLog.objects.all(), "2024").count(), 1)
+        self.assertEqual(filter_by_year(DailyTrafficRollup.objects.all(), 2025, "bucket").count(), 1)
+
+
+class SalesFactTests(TestCase):
+    def setUp(self):
+        reset_process_caches(self)
+        ingest_lines([
+            log_line(ip="168.10.0.1", method="POST", url="/solutions/smart-assist?promo_code=BOTSALE1"),
+            log_line(ip="102.10.0.1", method="POST", url="/solutions/ai-inspector",
+                     timestamp="16/Feb/2024:10:00:00 +0000"),
+            log_line(ip="168.10.0.2", method="GET", url="/solutions/smart-assist"),
+            log_line(ip="168.10.0.3", method="POST", url="/solutions/unknown-product"),
+        ])
+
+    def test_sales_are_typed_columns_with_amount_profit_and_employee(self):
+        facts = get_sales_facts()
+        self.assertEqual(list(facts["product"]), ["ai-inspector", "smart-assist"])
+        self.assertEqual(list(facts["amount"]), [30000, 2000])
+        self.assertEqual(list(facts["profit"]), [18000, 1200])
+        self.assertEqual(list(facts["country"]), ["South Africa", "Botswana"])
+        self.assertTrue(pd.isna(facts["employee_name"][0]))
+        self.assertEqual(facts["employee_name"][1], "Ava Smith")
+        self.assertEqual(str(facts["amount"].dtype), "int64")
+
+    def test_filtered_copies_and_invalidation_on_ingest(self):
+        self.assertEqual(list(sales_facts(country="Botswana")["product"]), ["smart-assist"])
+        self.assertEqual(list(sales_facts(year="2024")["product"]), ["ai-inspector"])
+        self.assertEqual(len(sales_facts(country="All", year="all")), 2)
+
+        facts = get_sales_facts()
+        self.assertIs(get_sales_facts(), facts)
+        ingest_lines([log_line(ip="154.10.0.1", method="POST", url="/solutions/team-connect")])
+        self.assertIsNot(get_sales_facts(), facts)
+        self.assertEqual(list(sales_facts(country="Namibia")["amount"]), [1200])
+
+
+class OverviewCallbackTests(TestCase):
+    CHARTS = [
+        'profit-gauge-chart', 'unique-visitors-gauge-chart', 'bounce-rate-gauge-chart',
+        'virtual-assistant-gauge-chart', 'peak-hours-chart', 'daily-avg-chart',
+        'product-analytics-chart', 'referrer-pie-chart', 'sales-by-country-chart', 'top-pages-chart',
+    ]
+
+    def setUp(self):
+        reset_process_caches(self)
+        ingest_lines(hourly_lines(5) + [log_line(method="POST", url="/solutions/smart-assist")])
+
+    def test_every_chart_has_its_own_callback(self):
+        with self.assertNumQueries(0):
+            create_overview_dashboard()
+        app = get_local_stateless_by_name('OverviewDashboard')
+        outputs = [cs["output"] for cs, _ in app._callback_sets]
+        self.assertTrue(all(not isinstance(output, (list, tuple)) for output in outputs))
+        self.assertCountEqual(
+            [output.component_id for output in outputs if output.component_property == 'figure'], self.CHARTS
+        )
+        for output_id in self.CHARTS:
+            with self.subTest(chart=output_id):
+                figure = dash_callback(app, output_id)('all', get_data_version())
+                self.assertIn('data', figure)
+                with self.assertRaises(PreventUpdate):
+                    dash_callback(app, output_id)('all', None)
+
+
+class FigurePoolTests(SimpleTestCase):
+    def setUp(self):
+        patcher = mock.patch.object(figure_pool, "_executor", None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(lambda: figure_pool._executor and figure_pool._executor.shutdown())
+
+    def test_serial_builders_run_in_the_calling_thread(self):
+        builders = {name: (lambda n: (n, threading.current_thread()), (n,)) for n, name in enumerate("abc")}
+        with override_settings(DASHBOARD_FIGURE_WORKERS=1):
+            figures = figure_pool.build_figures("Test", builders)
+        self.assertEqual([value for value, _ in figures.values()], [0, 1, 2])
+        self.assertEqual({thread for _, thread in figures.values()}, {threading.current_thread()})
+        self.assertIsNone(figure_pool._executor)
+
+    def test_pooled_builders_run_concurrently_and_are_timed(self):
+        # Passes only if all three builders are running at the same time
+        barrier = threading.Barrier(3, timeout=5)
+
+        def build(n):
+            barrier.wait()
+            return n * 10
+
+        with override_settings(DASHBOARD_FIGURE_WORKERS=3):
+            figures = figure_pool.build_figures("Test", {name: (build, (n,)) for n, name in enumerate("abc")})
+        self.assertEqual(figures, {"a": 0, "b": 10, "c": 20})
+        timings = figure_pool.get_figure_timings()
+        for name in "abc":
+            self.assertGreaterEqual(timings[("Test", name)], 0)
+
+    def test_failing_builder_raises_in_the_callback(self):
+        def fail():
+            raise RuntimeError("boom")
+
+        with override_settings(DASHBOARD_FIGURE_WORKERS=2):
+            with self.assertRaisesRegex(RuntimeError, "boom"):
+                figure_pool.build_figures("Test", {"ok": (int, ()), "bad": (fail, ())})
+
+
+class SalesDashboardPoolTests(TransactionTestCase):
+    def setUp(self):
+        reset_process_caches(self)
+        patcher = mock.patch.object(figure_pool, "_executor", None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(lambda: figure_pool._executor and figure_pool._executor.shutdown())
+        ingest_lines(hourly_lines(5) + [
+            log_line(method="POST", url="/solutions/smart-assist?promo_code=BOTSALE1"),
+            log_line(url="/virtual-assistant"),
+        ])
+
+    def test_pooled_figures_match_serial_ones(self):
+        update_charts = dash_callback(create_sales_dashboard(), "monthly-revenue-chart")
+        figures = {}
+        for workers in (1, 4):
+            caches[CACHE_ALIAS].clear()
+            with override_settings(DASHBOARD_FIGURE_WORKERS=workers):
+                figures[workers] = update_charts("Botswana")
+        self.assertEqual(len(figures[1]), 8)
+        self.assertEqual(figures[4], figures[1])
+        timings = figure_pool.get_figure_timings()
+        self.assertIn(("SalesDashboard", "virtual-assistant-gauge-chart"), timings)
+
+
+class VirtualAssistantShareTests(TestCase):
+    def test_share_is_one_aggregate_query_with_the_country_filter(self):
+        ingest_lines([
+            log_line(ip="168.10.0.1", url="/virtual-assistant"),
+            log_line(ip="168.10.0.2", url="/solutions/smart-assist"),
+            log_line(ip="102.10.0.1", url="/virtual-assistant/chat"),
+            log_line(ip="102.10.0.2", url="/about"),
+            log_line(ip="102.10.0.3", url="/contact"),
+            log_line(ip="10.0.0.1", url="/contact"),
+        ])
+        with self.assertNumQueries(1):
+            self.assertAlmostEqual(calculate_virtual_assistant_requests("All"), 100 * 2 / 6)
+        self.assertEqual(calculate_virtual_assistant_requests("Botswana"), 50)
+        self.assertAlmostEqual(calculate_virtual_assistant_requests("South Africa"), 100 / 3)
+        self.assertEqual(calculate_virtual_assistant_requests("Namibia"), 0)
+
+
+class LiveLogConsumerTests(SimpleTestCase):
+    async def connect(self, origin=b"http://testserver"):
+        communicator = WebsocketCommunicator(application, "/ws/logs/", headers=[(b"origin", origin)])
+        connected, _ = await communicator.connect()
+        return connected, communicator
+
+    def rows(self, count):
+        return [parse_log_line(log_line(ip=f"168.10.0.{n}")) for n in range(count)]
+
+    async def test_one_publish_reaches_every_client(self):
+        clients = [(await self.connect())[1] for _ in range(3)]
+        try:
+            rows = self.rows(3)
+            await sync_to_async(publish_rows)(rows)
+            for client in clients:
+                frame = await client.receive_json_from(timeout=2)
+                self.assertEqual(frame, {"lines": [format_log_line(row) for row in rows], "dropped": 0})
+        finally:
+            for client in clients:
+                await client.disconnect()
+
+    async def test_slow_client_drops_its_oldest_lines(self):
+        with override_settings(
+            LIVE_LOG_MAX_BATCH=8, LIVE_LOG_CLIENT_BUFFER=5, LIVE_LOG_FRAME_LINES=5, LIVE_LOG_CLIENT_RATE=1000
+        ):
+            _, client = await self.connect()
+            try:
+                rows = self.rows(10)
+                await sync_to_async(publish_rows)(rows)
+                frame = await client.receive_json_from(timeout=2)
+            finally:
+                await client.disconnect()
+        # 2 lines skipped by the publisher, 3 more by the client's 5-line buffer
+        self.assertEqual(frame, {"lines": [format_log_line(row) for row in rows[-5:]], "dropped": 5})
+
+    async def test_foreign_origin_is_refused(self):
+        connected, _ = await self.connect(origin=b"http://evil.example")
+        self.assertFalse(connected)
+
+
+class LiveOverviewTests(TestCase):
+    def setUp(self):
+        reset_process_caches(self)
+
+    def test_aggregates_merge_new_rows_only(self):
+        ingest_lines(hourly_lines(30) + [log_line(ip="102.10.0.1", timestamp="16/Feb/2024:08:00:00 +0000")])
+        aggregates = get_traffic_aggregates()
+        self.assertEqual(aggregates.totals("hour"), {10: 30, 8: 1})
+
+        ingest_lines([log_line(ip="102.10.0.2", timestamp="17/Feb/2025:08:30:00 +0000")])
+        with mock.patch.object(TrafficAggregates, "load") as load:
+            self.assertIs(get_traffic_aggregates(), aggregates)
+        load.assert_not_called()
+        self.assertEqual(aggregates.refresh(), 0)
+        self.assertEqual(aggregates.totals("hour", year="2025"), {10: 30, 8: 1})
+        self.assertEqual(aggregates.totals("hour", country="South Africa"), {8: 2})
+
+        # The merged counts equal a fresh load from the rollups
+        fresh = TrafficAggregates()
+        fresh.load()
+        self.assertEqual(+fresh.counts, +aggregates.counts)
+
+    def test_data_version_api_changes_on_ingest(self):
+        version = self.client.get("/api/data-version/").json()["version"]
+        self.assertEqual(self.client.get("/api/data-version/").json()["version"], version)
+        ingest_lines([log_line()])
+        self.assertNotEqual(self.client.get("/api/data-version/").json()["version"], version)
+
+
+class WeeklySalesTests(TestCase):
+    def setUp(self):
+        reset_process_caches(self)
+        ingest_lines([
+            log_line(ip="168.10.0.1", timestamp="17/Feb/2025:10:00:00 +0000", method="POST", url="/solutions/smart-assist"),
+            log_line(ip="102.10.0.1", timestamp="19/Feb/2025:10:00:00 +0000", method="POST", url="/solutions/ai-inspector"),
+            log_line(ip="154.10.0.1", timestamp="24/Feb/2025:10:00:00 +0000", method="POST", url="/solutions/team-connect"),
+            log_line(ip="154.10.0.1", timestamp="24/Feb/2025:11:00:00 +0000", method="GET", url="/solutions/team-connect"),
+            log_line(ip="10.0.0.1", timestamp="24/Feb/2025:12:00:00 +0000", method="POST", url="/solutions/smart-assist"),
+            log_line(ip="168.10.0.1", timestamp="16/Feb/2024:10:00:00 +0000", method="POST", url="/solutions/smart-assist"),
+        ])
+
+    def test_weeks_are_summed_in_sql(self):
+        countries = ["Botswana", "South Africa", "Namibia"]
+        with self.assertNumQueries(1):
+            weekly = weekly_sales(countries=countries, year=2025)
+        self.assertEqual(weekly, [(datetime.date(2025, 2, 17), 32000), (datetime.date(2025, 2, 24), 1200)])
+        self.assertEqual(sum(amount for _, amount in weekly_sales()), 32000 + 1200 + 2000 + 2000)
+        self.assertEqual(weekly_sales(countries=["Botswana"]), [
+            (datetime.date(2024, 2, 12), 2000), (datetime.date(2025, 2, 17), 2000),
+        ])
+
+    def test_only_the_weekly_series_reaches_the_browser(self):
+        app = create_sales_trend_app()
+        self.assertNotIn("Store", repr(app.layout))
+        figure = dash_callback(app, "sales-trend-chart")(0)
+        self.assertEqual(list(figure["data"][0]["x"]), ["2024-W07", "2025-W08", "2025-W09"])
+        self.assertEqual(list(figure["data"][0]["y"]), [2000, 32000, 1200])
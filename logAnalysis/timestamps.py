@@ -0,0 +1,122 @@
+"""Decoders for Apache combined-log-format timestamps ("18/Feb/2025:23:34:22 +0000").
+
+The format is fixed-width, so fields are sliced at known offsets instead of
+going through datetime.strptime, which re-interprets the format string and
+builds a new tzinfo for every call.
+"""
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+CLF_TIMESTAMP_FORMAT = "%d/%b/%Y:%H:%M:%S %z"
+CLF_TIMESTAMP_LENGTH = 26
+
+MONTHS = {
+    "Jan": 1, "Feb": 2, "Mar": 3, "Apr": 4, "May": 5, "Jun": 6,
+    "Jul": 7, "Aug": 8, "Sep": 9, "Oct": 10, "Nov": 11, "Dec": 12,
+}
+
+# Byte positions of the separators in "dd/Mon/yyyy:HH:MM:SS +hhmm"
+_SEPARATORS = {2: "/", 6: "/", 11: ":", 14: ":", 17: ":", 20: " "}
+_DIGITS = (0, 1, 7, 8, 9, 10, 12, 13, 15, 16, 18, 19, 22, 23, 24, 25)
+
+_tz_cache = {"+0000": timezone.utc}
+
+
+def get_offset_tz(offset):
+    """Returns a cached fixed-offset tzinfo for an offset string like "+0200" """
+    tz = _tz_cache.get(offset)
+    if tz is None:
+        # Same range strptime's %z accepts: hours below 24, minutes below 60
+        if (
+            len(offset) != 5 or offset[0] not in "+-" or not offset[1:].isdigit()
+            or offset[1:3] > "23" or offset[3:5] > "59"
+        ):
+            raise ValueError(f"invalid UTC offset {offset!r}")
+        minutes = int(offset[1:3]) * 60 + int(offset[3:5])
+        tz = timezone(timedelta(minutes=-minutes if offset[0] == "-" else minutes))
+        _tz_cache[offset] = tz
+    return tz
+
+
+def parse_clf_timestamp(value):
+    """Parses one CLF timestamp into an aware datetime.
+
+    Anything that is not the canonical fixed-width layout (e.g. an unpadded
+    day) falls back to strptime, so accepted input and the ValueError raised
+    for malformed input stay the same as before.
+    """
+    month = MONTHS.get(value[3:6])
+    if (
+        month is None
+        or len(value) != CLF_TIMESTAMP_LENGTH
+        or any(value[i] != sep for i, sep in _SEPARATORS.items())
+        or not (value[0:2] + value[7:11] + value[12:14] + value[15:17] + value[18:20]).isdigit()
+    ):
+        return datetime.strptime(value, CLF_TIMESTAMP_FORMAT)
+    return datetime(
+        int(value[7:11]), month, int(value[0:2]),
+        int(value[12:14]), int(value[15:17]), int(value[18:20]),
+        tzinfo=get_offset_tz(value[21:26]),
+    )
+
+
+_MONTH_CODES = np.array(sorted(
+    (ord(name[0]) << 16 | ord(name[1]) << 8 | ord(name[2]), number)
+    for name, number in MONTHS.items()
+))
+
+
+def parse_clf_timestamps(values):
+    """Converts a batch of CLF timestamps to a UTC datetime64[s] array.
+
+    Only the canonical fixed-width layout is decoded; anything else, and any
+    value parse_clf_timestamp would reject (e.g. 31/Feb or a "+9999" offset),
+    becomes NaT instead of raising, so one bad line does not discard the
+    whole batch.
+    """
+    # One spare byte so over-long values are detected instead of truncated
+    width = CLF_TIMESTAMP_LENGTH + 1
+    try:
+        raw = np.asarray(values, dtype=f"S{width}")
+    except UnicodeEncodeError:
+        raw = np.array([str(v).encode("ascii", "replace") for v in values], dtype=f"S{width}")
+    if raw.size == 0:
+        return np.array([], dtype="datetime64[s]")
+    chars = raw.view(np.uint8).reshape(len(raw), width).astype(np.int64)
+
+    valid = np.char.str_len(raw) == CLF_TIMESTAMP_LENGTH
+    for i, sep in _SEPARATORS.items():
+        valid &= chars[:, i] == ord(sep)
+    digits = chars[:, _DIGITS] - ord("0")
+    valid &= ((digits >= 0) & (digits <= 9)).all(axis=1)
+    valid &= (chars[:, 21] == ord("+")) | (chars[:, 21] == ord("-"))
+
+    def number(start, width):
+        result = np.zeros(len(raw), dtype=np.int64)
+        for i in range(start, start + width):
+            result = result * 10 + (chars[:, i] - ord("0"))
+        return result
+
+    codes = chars[:, 3] << 16 | chars[:, 4] << 8 | chars[:, 5]
+    position = np.clip(np.searchsorted(_MONTH_CODES[:, 0], codes), 0, len(_MONTH_CODES) - 1)
+    valid &= _MONTH_CODES[position, 0] == codes
+    month = _MONTH_CODES[position, 1]
+
+    year, day = number(7, 4), number(0, 2)
+    hour, minute, second = number(12, 2), number(15, 2), number(18, 2)
+    valid &= (year >= 1) & (day >= 1) & (day <= 31) & (hour <= 23) & (minute <= 59) & (second <= 59)
+
+    offset_hours, offset_minutes = number(22, 2), number(24, 2)
+    valid &= (offset_hours <= 23) & (offset_minutes <= 59)
+    sign = np.where(chars[:, 21] == ord("-"), -1, 1)
+    offset = sign * (offset_hours * 3600 + offset_minutes * 60)
+
+    months = ((year - 1970) * 12 + month - 1).astype("datetime64[M]")
+    days = months.astype("datetime64[D]") + (day - 1).astype("timedelta64[D]")
+    # Reject dates that rolled into the next month (e.g. 31/Feb)
+    valid &= days.astype("datetime64[M]") == months
+    seconds = hour * 3600 + minute * 60 + second - offset
+    result = days.astype("datetime64[s]") + seconds.astype("timedelta64[s]")
+    result[~valid] = np.datetime64("NaT")
+    return result
@@ -0,0 +1,147 @@
+"""Distinct visitor counts from per-day HyperLogLog sketches.
+
+Every (UTC date, country) pair keeps a HyperLogLog sketch of the IP
+addresses seen (DailyVisitorSketch), updated in the ingestion transaction.
+The distinct visitors of any date range, year or country are estimated by
+merging the matching sketches (register-wise maximum) instead of running
+COUNT(DISTINCT ip_address) over ServerLog. With 2**12 registers the
+standard error is about 1.6%.
+"""
+import hashlib
+import math
+from collections import defaultdict
+from datetime import timezone
+
+import numpy as np
+from django.db import transaction
+
+from .data_version import lock_data_version
+from .filters import filter_by_year
+from .lookups import chunked
+from .models import DailyVisitorSketch, ServerLog
+
+PRECISION = 12
+REGISTERS = 1 << PRECISION
+HASH_BITS = 64
+RANK_BITS = HASH_BITS - PRECISION
+
+
+def empty_registers():
+    return np.zeros(REGISTERS, dtype=np.uint8)
+
+
+def from_bytes(data):
+    return np.frombuffer(bytes(data), dtype=np.uint8).copy()
+
+
+def ip_hash(ip_address):
+    return int.from_bytes(hashlib.blake2b(ip_address.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+def add(registers, ip_address):
+    """Adds one IP address to the registers in place"""
+    value = ip_hash(ip_address)
+    index = value >> RANK_BITS
+    rank = RANK_BITS - (value & ((1 << RANK_BITS) - 1)).bit_length() + 1
+    if rank > registers[index]:
+        registers[index] = rank
+
+
+def estimate(registers):
+    """HyperLogLog cardinality estimate, with linear counting for small cardinalities"""
+    alpha = 0.7213 / (1 + 1.079 / REGISTERS)
+    raw = alpha * REGISTERS * REGISTERS / np.sum(np.exp2(-registers.astype(np.float64)))
+    zeros = int(np.count_nonzero(registers == 0))
+    if raw <= 2.5 * REGISTERS and zeros:
+        return REGISTERS * math.log(REGISTERS / zeros)
+    return raw
+
+
+def filter_sketches(year=None, country=None, start=None, end=None):
+    sketches = DailyVisitorSketch.objects.all()
+    sketches = filter_by_year(sketches, year, 'bucket')
+    if country and country != 'All':
+        sketches = sketches.filter(country=country)
+    if start is not None:
+        sketches = sketches.filter(bucket__gte=start)
+    if end is not None:
+        sketches = sketches.filter(bucket__lte=end)
+    return sketches
+
+
+def unique_visitors(year=None, country=None, start=None, end=None):
+    """Estimated distinct IP addresses over the matching days (start/end dates are inclusive)"""
+    merged = empty_registers()
+    for data in filter_sketches(year, country, start, end).values_list('registers', flat=True).iterator():
+        np.maximum(merged, from_bytes(data), out=merged)
+    return round(estimate(merged))
+
+
+def daily_unique_visitors(year=None, country=None, start=None, end=None):
+    """[(date, estimated distinct IP addresses)] for every day with traffic, in date order"""
+    days = defaultdict(empty_registers)
+    sketches = filter_sketches(year, country, start, end).values_list('bucket', 'registers')
+    for bucket, data in sketches.iterator():
+        np.maximum(days[bucket], from_bytes(data), out=days[bucket])
+    return [(bucket, round(estimate(registers))) for bucket, registers in sorted(days.items())]
+
+
+def average_daily_unique_visitors(year=None, country=None):
+    daily = daily_unique_visitors(year, country)
+    if not daily:
+        return 0
+    return sum(visitors for _, visitors in daily) / len(daily)
+
+
+def sketch_rows(rows):
+    """{(date, country): registers} of ServerLog row dicts"""
+    sketches = defaultdict(empty_registers)
+    for row in rows:
+        key = (row["timestamp"].astimezone(timezone.utc).date(), row["country"] or "")
+        add(sketches[key], row["ip_address"])
+    return sketches
+
+
+def update_visitor_sketches(rows):
+    """Folds newly inserted ServerLog row dicts into the daily visitor sketches.
+
+    Must run inside a transaction; existing sketches are locked while updated.
+    """
+    if not rows:
+        return
+    sketches = sketch_rows(rows)
+    buckets = sorted({bucket for bucket, _ in sketches})
+    existing = {}
+    for batch in chunked(buckets):
+        stored = DailyVisitorSketch.objects.select_for_update().filter(bucket__in=batch)
+        existing.update(((sketch.bucket, sketch.country), sketch) for sketch in stored)
+
+    to_update, to_create = [], []
+    for (bucket, country), registers in sketches.items():
+        sketch = existing.get((bucket, country))
+        if sketch is None:
+            to_create.append(DailyVisitorSketch(bucket=bucket, country=country, registers=registers.tobytes()))
+            continue
+        merged = np.maximum(from_bytes(sketch.registers), registers)
+        if not np.array_equal(merged, from_bytes(sketch.registers)):
+            sketch.registers = merged.tobytes()
+            to_update.append(sketch)
+    DailyVisitorSketch.objects.bulk_update(to_update, ["registers"], batch_size=100)
+    DailyVisitorSketch.objects.bulk_create(to_create, batch_size=100)
+
+
+def rebuild_visitor_sketches(batch_size=5000):
+    """Recomputes every daily visitor sketch in one streaming pass over ServerLog"""
+    with transaction.atomic():
+        lock_data_version()
+        DailyVisitorSketch.objects.all().delete()
+        logs = ServerLog.objects.values('ip_address', 'country', 'timestamp').order_by()
+        sketches = sketch_rows(logs.iterator(chunk_size=batch_size))
+        created = DailyVisitorSketch.objects.bulk_create(
+            [
+                DailyVisitorSketch(bucket=bucket, country=country, registers=registers.tobytes())
+                for (bucket, country), registers in sketches.items()
+            ],
+            batch_size=100,
+        )
+    return len(created)
@@ -1,49 +1,62 @@
-import time
-import random
 from django.shortcuts import render, redirect
-from django.http import StreamingHttpResponse
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponse, HttpResponseBadRequest, JsonResponse, StreamingHttpResponse
 from django.core.files.storage import FileSystemStorage
-import os
-import re
-from .models import ServerLog
-from datetime import datetime
+from .models import LogFollowOffset, ServerLog
+from .heavy_hitters import approximate_top_pages, top_pages
+from .callback_cache import get_callback_cache_stats
+from .data_version import get_data_version
+from .ingestion import ingest_upload
+from .live_logs import stream_events, stream_options
+from .unique_visitors import daily_unique_visitors
+from django.conf import settings
 from django.contrib import messages
 from django.db.models import Count
+from django.db.models.functions import ExtractYear
+from django.utils import timezone
 from django.utils.dateformat import DateFormat
 
 import json
 
-def generate_logs():
-    """Yields real-time log entries"""
-    while True:
-        log_entry = (
-            f"192.168.1.{random.randint(1, 255)} - - "
-            f"[{time.strftime('%d/%b/%Y:%H:%M:%S')}] "
-            f'"GET / HTTP/1.1" {random.choice([200, 404, 500])} {random.randint(500, 5000)}\n'
+# Upper bound on per-chunk problem messages flashed after an upload
+MAX_REPORTED_CHUNKS = 5
+# Upper bound on ?k= for the top pages endpoint
+MAX_TOP_PAGES = 100
+
+async def stream_logs(request):
+    """Newly ingested log lines as server-sent events: ?replay=N starts with the last N lines.
+
+    Under ASGI, /logs/ is answered by consumers.log_stream_app before Django's
+    middleware; this view serves the same stream when reached through Django.
+    Under WSGI it answers 501: the endless stream would hold a worker for as
+    long as the client stays connected.
+    """
+    if not isinstance(request, ASGIRequest):
+        return HttpResponse(
+            "The live log stream needs the ASGI server (WebAnalysisTool.asgi, e.g. daphne); "
+            "it is not available under WSGI.",
+            status=501, content_type="text/plain",
         )
-        yield log_entry
-        time.sleep(random.uniform(0.5, 2))  # Simulate delays
-
-def stream_logs(request):
-    return StreamingHttpResponse(generate_logs(), content_type="text/plain")
+    try:
+        replay, last_event_id = stream_options(request.GET.get("replay"), request.headers.get("Last-Event-ID"))
+    except ValueError:
+        return HttpResponseBadRequest("replay and Last-Event-ID must be integers")
+    response = StreamingHttpResponse(stream_events(replay, last_event_id), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
 
 def dashboard(request):
     total_requests = ServerLog.objects.count()
     successful_requests = ServerLog.objects.filter(status_code=200).count()
     not_found_requests = ServerLog.objects.filter(status_code=404).count()
     internal_server_errors = ServerLog.objects.filter(status_code=500).count()
-    unique_visitors = ServerLog.objects.values("ip_address").distinct().count()
-
-    # Aggregate unique visitors per day
-    unique_visitors_per_day = (
-        ServerLog.objects.values("timestamp__date")
-        .annotate(unique_visitors=Count("ip_address", distinct=True))
-        .order_by("timestamp__date")
-    )
+    # Unique visitors per day, estimated from the daily visitor sketches
+    unique_visitors_per_day = daily_unique_visitors()
 
     # Prepare data for the chart (convert to lists)
-    labels = [DateFormat(entry["timestamp__date"]).format("Y-m-d") for entry in unique_visitors_per_day]
-    data = [entry["unique_visitors"] for entry in unique_visitors_per_day]
+    labels = [DateFormat(day).format("Y-m-d") for day, _ in unique_visitors_per_day]
+    data = [count for _, count in unique_visitors_per_day]
 
     # Aggregate user agents
     user_agents = (
@@ -63,21 +76,6 @@ def dashboard(request):
     return render(request, "logAnalysis/chatGPTdashboard.html", context)
 
 
-# Updated regex pattern to include promo codes
-LOG_PATTERN = re.compile(
-    r'(?P<ip>[\d\.]+) - - \[(?P<timestamp>.*?)\] "(?P<method>\w+) (?P<url>.*?)(?:\?(?P<query>.*?))? (?P<http_version>HTTP\/\d\.\d)" (?P<status>\d+) (?P<size>\d+) "(?P<referrer>.*?)" "(?P<user_agent>.*?)"'
-)
-
-def extract_promo_code(query_string):
-    """Extract promo code from query string if present"""
-    if not query_string:
-        return None
-    params = query_string.split('&')
-    for param in params:
-        if param.startswith('promo_code='):
-            return param.split('=')[1]
-    return None
-
 def upload_logs(request):
     if request.method == "POST" and request.FILES.get("log_file"):
         log_file = request.FILES["log_file"]
@@ -86,48 +84,24 @@ def upload_logs(request):
             messages.error(request, "Invalid file type. Please upload a .txt file.")
             return redirect("dashboard")
 
-        fs = FileSystemStorage(location="logs/")
-        filename = fs.save(log_file.name, log_file)
-        file_path = fs.path(filename)
+        try:
+            report = ingest_upload(log_file)
 
-        log_count = 0
-        error_count = 0
+            if report.duplicate_of is not None:
+                messages.info(request, f"This file was already uploaded as {report.duplicate_of.file_name}; nothing was imported.")
+                return redirect("dashboard")
 
-        try:
-            with open(file_path, "r", encoding="utf-8") as f:
-                for line in f:
-                    match = LOG_PATTERN.match(line)
-                    if match:
-                        data = match.groupdict()
-
-                        try:
-                            # Convert timestamp to Python datetime object
-                            timestamp = datetime.strptime(data["timestamp"], "%d/%b/%Y:%H:%M:%S %z")
-                            
-                            # Extract promo code from URL query parameters
-                            promo_code = extract_promo_code(data.get("query"))
-
-                            # Save the log entry in the database
-                            ServerLog.objects.create(
-                                ip_address=data["ip"],
-                                timestamp=timestamp,
-                                request_method=data["method"],
-                                url=data["url"],
-                                http_version=data["http_version"],
-                                status_code=int(data["status"]),
-                                response_size=int(data["size"]),
-                                referrer=data["referrer"] if data["referrer"] != "-" else None,
-                                user_agent=data["user_agent"],
-                                promo_code=promo_code
-                            )
-                            log_count += 1
-                        except Exception as e:
-                            error_count += 1
-
-            if log_count > 0:
-                messages.success(request, f"Successfully uploaded {log_count} log entries.")
-            if error_count > 0:
-                messages.warning(request, f"{error_count} log entries could not be processed.")
+            if getattr(settings, "LOG_UPLOAD_STAGE_TO_DISK", False):
+                FileSystemStorage(location="logs/").save(log_file.name, log_file)
+
+            if report.inserted > 0:
+                messages.success(request, f"Successfully uploaded {report.inserted} log entries.")
+            if report.duplicates > 0:
+                messages.info(request, f"Skipped {report.duplicates} log entries that were already stored.")
+            if report.invalid > 0:
+                messages.warning(request, f"{report.invalid} log entries could not be processed.")
+            for chunk in report.problem_chunks[:MAX_REPORTED_CHUNKS]:
+                messages.warning(request, chunk.describe())
 
         except Exception as e:
             messages.error(request, f"An error occurred while processing the file: {str(e)}")
@@ -148,10 +122,6 @@ def Salesdashboard(request):
 
     return render(request, "logAnalysis/Salesdashboard.html", context)
 
-from django.shortcuts import render
-from logAnalysis.models import ServerLog
-from django.db.models.functions import ExtractYear
-
 def NewDashboard(request):
     # Fetch unique years from ServerLog timestamps
     years = ServerLog.objects.annotate(
@@ -171,4 +141,72 @@ def RegionalSalesAnalysis(request):
 
     }
 
-    return render(request, 'logAnalysis/regional_sales_analysis.html', context)
\ No newline at end of file
+    return render(request, 'logAnalysis/regional_sales_analysis.html', context)
+
+
+def top_pages_api(request):
+    """Most requested URLs as JSON: ?k=5&year=2024&country=Botswana&approximate=1"""
+    year = request.GET.get("year", "all")
+    country = request.GET.get("country", "All")
+    approximate = request.GET.get("approximate") in ("1", "true")
+    try:
+        k = int(request.GET.get("k", 5))
+        if year != "all":
+            int(year)
+    except ValueError:
+        return JsonResponse({"error": "k and year must be integers"}, status=400)
+    k = min(max(k, 1), MAX_TOP_PAGES)
+
+    if approximate:
+        if country != "All":
+            return JsonResponse({"error": "approximate results are not kept per country"}, status=400)
+        pages = [
+            {"url": url, "requests": requests, "error": error}
+            for url, requests, error in approximate_top_pages(k, year)
+        ]
+    else:
+        pages = [{"url": url, "requests": requests} for url, requests in top_pages(k, year, country)]
+
+    return JsonResponse({
+        "k": k,
+        "year": year,
+        "country": country,
+        "approximate": approximate,
+        "pages": pages,
+    })
+
+
+def data_version_api(request):
+    """Current data version as JSON; it changes whenever logs are ingested or rewritten"""
+    return JsonResponse({"version": get_data_version()})
+
+
+def callback_cache_api(request):
+    """Hits and misses of the cached Dash callbacks served by this process"""
+    callbacks = [
+        {"app": app_name, "callback": callback_name, **counts}
+        for (app_name, callback_name), counts in sorted(get_callback_cache_stats().items())
+    ]
+    return JsonResponse({"callbacks": callbacks})
+
+
+def follow_status_api(request):
+    """Progress, throughput and lag of the files followed by `manage.py follow_logs`"""
+    now = timezone.now()
+    files = [
+        {
+            "path": state.path,
+            "offset": state.offset,
+            "file_size": state.file_size,
+            "lag_bytes": state.lag_bytes,
+            "lines": state.lines,
+            "inserted": state.inserted,
+            "lines_per_second": state.lines_per_second,
+            "batch_latency": state.batch_latency,
+            "last_timestamp": state.last_timestamp,
+            "updated_at": state.updated_at,
+            "seconds_since_update": (now - state.updated_at).total_seconds(),
+        }
+        for state in LogFollowOffset.objects.order_by("path")
+    ]
+    return JsonResponse({"files": files})
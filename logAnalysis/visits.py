@@ -0,0 +1,166 @@
+"""Visits (per-IP sessions) and bounce rates.
+
+A visit is a run of requests from one IP address with no gap longer than
+VISIT_INACTIVITY_TIMEOUT; a bounce is a visit with a single request. Visits
+and the per-day bounce counters (DailyBounceRollup) are updated in the
+ingestion transaction, so the gauges read a handful of counter rows.
+"""
+from collections import defaultdict
+from datetime import timedelta, timezone
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import TruncDate
+
+from .data_version import lock_data_version
+from .filters import filter_by_year
+from .lookups import chunked
+from .models import DailyBounceRollup, ServerLog, Visit
+from .rollups import add_to_counters
+
+DEFAULT_VISIT_TIMEOUT = 30 * 60
+
+
+def get_visit_timeout():
+    return timedelta(seconds=getattr(settings, "VISIT_INACTIVITY_TIMEOUT", DEFAULT_VISIT_TIMEOUT))
+
+
+def bounce_rate(year=None, country=None):
+    """Percentage of visits with a single request, from the daily bounce counters"""
+    rollups = DailyBounceRollup.objects.all()
+    rollups = filter_by_year(rollups, year, 'bucket')
+    if country and country != 'All':
+        rollups = rollups.filter(country=country)
+    totals = rollups.aggregate(visits=Sum('visits'), bounces=Sum('bounces'))
+    if not totals['visits']:
+        return 0
+    return totals['bounces'] / totals['visits'] * 100
+
+
+def merge_spans(spans, timeout):
+    """Merges (started, ended, requests, visit) spans of one IP into visits.
+
+    Spans closer than `timeout` join the same visit. Returns a list of
+    [started, ended, requests, [visits merged into it]].
+    """
+    merged = []
+    for started, ended, requests, visit in sorted(spans, key=lambda span: span[0]):
+        if merged and started - merged[-1][1] <= timeout:
+            current = merged[-1]
+            current[1] = max(current[1], ended)
+            current[2] += requests
+        else:
+            current = [started, ended, requests, []]
+            merged.append(current)
+        if visit is not None:
+            current[3].append(visit)
+    return merged
+
+
+def bounce_key(visit):
+    return (visit.started.astimezone(timezone.utc).date(), visit.country)
+
+
+def apply_bounce_counts(counts):
+    """Adds {(date, country): [visits, bounces]} deltas onto the daily bounce counters"""
+    add_to_counters(
+        DailyBounceRollup, ("bucket", "country"), ("visits", "bounces"),
+        {key: tuple(delta) for key, delta in counts.items()},
+    )
+
+
+def update_visits(rows):
+    """Folds newly inserted ServerLog row dicts into the visits and daily bounce counters.
+
+    Must run inside a transaction; the visits that may absorb the new
+    requests are locked while updated.
+    """
+    if not rows:
+        return
+    timeout = get_visit_timeout()
+    requests_by_ip = defaultdict(list)
+    countries = {}
+    for row in rows:
+        requests_by_ip[row["ip_address"]].append(row["timestamp"].astimezone(timezone.utc))
+        countries[row["ip_address"]] = row["country"] or ""
+    timestamps = [timestamp for times in requests_by_ip.values() for timestamp in times]
+    earliest, latest = min(timestamps) - timeout, max(timestamps) + timeout
+
+    ips = sorted(requests_by_ip)
+    stored = defaultdict(list)
+    for batch in chunked(ips):
+        visits = Visit.objects.select_for_update().filter(
+            ip_address__in=batch, ended__gte=earliest, started__lte=latest
+        )
+        for visit in visits:
+            stored[visit.ip_address].append(visit)
+
+    counts = defaultdict(lambda: [0, 0])
+    to_delete, to_create = [], []
+    for ip, times in requests_by_ip.items():
+        spans = [(visit.started, visit.ended, visit.requests, visit) for visit in stored[ip]]
+        spans.extend((timestamp, timestamp, 1, None) for timestamp in times)
+        for started, ended, requests, absorbed in merge_spans(spans, timeout):
+            if len(absorbed) == 1 and absorbed[0].requests == requests:
+                continue  # an existing visit no new request touched
+            for visit in absorbed:
+                to_delete.append(visit.id)
+                key = counts[bounce_key(visit)]
+                key[0] -= 1
+                key[1] -= visit.requests == 1
+            visit = Visit(ip_address=ip, country=countries[ip], started=started, ended=ended, requests=requests)
+            to_create.append(visit)
+            key = counts[bounce_key(visit)]
+            key[0] += 1
+            key[1] += requests == 1
+
+    Visit.objects.filter(id__in=to_delete).delete()
+    Visit.objects.bulk_create(to_create, batch_size=500)
+    apply_bounce_counts(counts)
+
+
+def rebuild_visits(batch_size=5000):
+    """Recomputes visits in one ordered pass over ServerLog and the bounce counters from them.
+
+    Memory is bounded by `batch_size`; returns (visits, bounce counter rows).
+    """
+    timeout = get_visit_timeout()
+    with transaction.atomic():
+        lock_data_version()
+        Visit.objects.all().delete()
+        DailyBounceRollup.objects.all().delete()
+
+        logs = (
+            ServerLog.objects.order_by('ip_address', 'timestamp')
+            .values_list('ip_address', 'country', 'timestamp')
+        )
+        pending, current, total = [], None, 0
+        for ip, country, timestamp in logs.iterator(chunk_size=batch_size):
+            if current and current.ip_address == ip and timestamp - current.ended <= timeout:
+                current.ended = timestamp
+                current.requests += 1
+                continue
+            if current:
+                pending.append(current)
+            if len(pending) >= batch_size:
+                Visit.objects.bulk_create(pending, batch_size=500)
+                total += len(pending)
+                pending = []
+            current = Visit(ip_address=ip, country=country or "", started=timestamp, ended=timestamp, requests=1)
+        if current:
+            pending.append(current)
+        Visit.objects.bulk_create(pending, batch_size=500)
+        total += len(pending)
+
+        grouped = (
+            Visit.objects.annotate(bucket=TruncDate('started'))
+            .values('bucket', 'country')
+            .annotate(visits=Count('id'), bounces=Count('id', filter=Q(requests=1)))
+            .order_by()
+        )
+        created = DailyBounceRollup.objects.bulk_create(
+            [DailyBounceRollup(**group) for group in grouped.iterator()],
+            batch_size=500,
+        )
+    return total, len(created)
@@ -0,0 +1,44 @@
+"""Visitors and purchases per day of the week, aggregated by the database."""
+import pandas as pd
+from django.db.models import Count, Q
+from django.db.models.functions import ExtractIsoWeekDay, TruncDate
+
+from .filters import filter_by_year
+from .models import ServerLog
+
+DAYS = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+
+
+def weekday_averages(year=None):
+    """Seven rows (Monday first) of per-day average visitors and sales and the conversion rate.
+
+    Visitors are distinct IP addresses per date and sales are POST requests,
+    both counted in SQL per date; the dates are then summed by ISO weekday
+    and divided by the number of dates with traffic on that weekday. An
+    empty DataFrame means there are no logs for `year`.
+    """
+    logs = filter_by_year(ServerLog.objects.all(), year)
+    rows = (
+        logs.annotate(weekday=ExtractIsoWeekDay('timestamp'), date=TruncDate('timestamp'))
+        .values('weekday', 'date')
+        .annotate(
+            visitors=Count('ip_address', distinct=True),
+            sales=Count('id', filter=Q(request_method="POST")),
+        )
+        .order_by()
+    )
+    per_date = pd.DataFrame(list(rows), columns=['weekday', 'date', 'visitors', 'sales'])
+    if per_date.empty:
+        return pd.DataFrame()
+    totals = per_date.groupby('weekday').agg(
+        visitors=('visitors', 'sum'), sales=('sales', 'sum'), days=('date', 'count')
+    )
+
+    daily_df = totals.reindex(range(1, 8), fill_value=0)
+    days = daily_df['days'].where(daily_df['days'] > 0)
+    daily_df['day_name'] = DAYS
+    daily_df['avg_visitors'] = (daily_df['visitors'] / days).fillna(0)
+    daily_df['avg_sales'] = (daily_df['sales'] / days).fillna(0)
+    visitors = daily_df['visitors'].where(daily_df['visitors'] > 0)
+    daily_df['conversion_rate'] = (daily_df['sales'] / visitors * 100).fillna(0)
+    return daily_df.reset_index(drop=True)